@@ -0,0 +1,186 @@
+"""Пропускная способность страниц через WSGI и через ASGI-мост.
+
+WSGI-путь имитирует многопоточный сервер с ``--threads`` потоками
+и синхронными views, ASGI-путь — цикл событий с ``core.asgi.WsgiBridge``
+и асинхронными вариантами views (``ASYNC_VIEWS``). В обоих случаях
+``--concurrency`` клиентов одновременно шлют запросы к страницам
+со списками постов авторизованного пользователя:
+
+    python benchmarks/asgi_vs_wsgi.py --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import clear_url_caches, reverse
+
+from run_benchmarks import git_commit, sample_kwargs
+
+from core.asgi import WsgiBridge, build_environ
+from core.testing import isolated_caches
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='asgi_vs_wsgi.json')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument(
+        '--threads', type=int, default=8,
+        help='Потоков WSGI-сервера.'
+    )
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def use_views(async_views):
+    """Переключает URLconf на синхронные или асинхронные страницы."""
+    settings.ASYNC_VIEWS = async_views
+    import posts.urls
+    import yatube.urls
+    importlib.reload(posts.urls)
+    importlib.reload(yatube.urls)
+    clear_url_caches()
+
+
+def scopes(urls, cookie):
+    requests = []
+    for url in urls:
+        path, _, query = url.partition('?')
+        requests.append({
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': query.encode(),
+            'server': ('testserver', 80),
+            'headers': [(b'cookie', cookie.encode())],
+        })
+    return requests
+
+
+def summary(latencies, elapsed):
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p99_ms': round(
+            latencies[int(len(latencies) * 0.99) - 1] * 1000, 2
+        ),
+    }
+
+
+def run_wsgi(application, requests, options):
+    """Клиенты ждут свободный поток сервера, как в очереди gunicorn."""
+    latencies = []
+
+    def handle(scope):
+        statuses = []
+        body = application(
+            build_environ(scope, b''),
+            lambda status, headers, exc_info=None: statuses.append(status),
+        )
+        b''.join(body)
+        body.close()
+        assert statuses[0].startswith('200'), statuses[0]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(options.threads) as server:
+        def client(i):
+            queued = time.perf_counter()
+            server.submit(handle, requests[i % len(requests)]).result()
+            latencies.append(time.perf_counter() - queued)
+
+        with ThreadPoolExecutor(options.concurrency) as clients:
+            list(clients.map(client, range(options.requests)))
+    return summary(latencies, time.perf_counter() - started)
+
+
+async def run_asgi(application, requests, options):
+    latencies = []
+    counter = iter(range(options.requests))
+
+    async def client():
+        for i in counter:
+            scope = requests[i % len(requests)]
+            sent = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                sent.append(message)
+
+            queued = time.perf_counter()
+            await application(scope, receive, send)
+            assert sent[0]['status'] == 200, sent[0]['status']
+            latencies.append(time.perf_counter() - queued)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(options.concurrency)))
+    return summary(latencies, time.perf_counter() - started)
+
+
+@isolated_caches()
+def main():
+    options = parse_args()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        call_command(
+            'seed_data', users=options.users, posts=options.posts,
+            comments=options.posts, follows=options.users * 15,
+            seed=options.seed, stdout=open('/dev/null', 'w'),
+        )
+        user, values = sample_kwargs()
+        client = Client()
+        client.force_login(user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}=' + client.cookies[
+            settings.SESSION_COOKIE_NAME
+        ].value
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': values['slug']}),
+            reverse('posts:profile', kwargs={'username': values['username']}),
+            reverse(
+                'posts:post_detail', kwargs={'post_id': values['post_id']}
+            ),
+            reverse('posts:follow_index'),
+        ]
+        # Каждая страница с разными номерами, чтобы кэш фрагментов
+        # не отвечал за все запросы.
+        urls = [f'{url}?page={page}' for url in urls for page in range(1, 6)]
+        requests = scopes(urls, cookie)
+        use_views(async_views=False)
+        wsgi = run_wsgi(get_wsgi_application(), requests, options)
+        print(f'WSGI: {wsgi}')
+        use_views(async_views=True)
+        asgi = asyncio.run(run_asgi(
+            WsgiBridge(get_wsgi_application(), settings.ASGI_THREADS),
+            requests, options,
+        ))
+        print(f'ASGI: {asgi}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    with open(options.output, 'w') as file:
+        json.dump({
+            'meta': {'commit': git_commit(), 'options': vars(options)},
+            'wsgi': wsgi,
+            'asgi': asgi,
+        }, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Сравнение двух прогонов run_benchmarks.py.
+
+    python benchmarks/compare.py before.json after.json --threshold 1.2
+
+Код возврата 1, если медиана хотя бы одной страницы выросла
+больше чем в ``threshold`` раз.
+"""
+import argparse
+import json
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    options = parser.parse_args()
+    with open(options.baseline) as file:
+        baseline = json.load(file)['results']
+    with open(options.candidate) as file:
+        candidate = json.load(file)['results']
+    regressions = []
+    print(f'{"page":<32}{"before":>12}{"after":>12}{"ratio":>8}'
+          f'{"queries":>12}')
+    for name in sorted(set(baseline) | set(candidate)):
+        if name not in baseline or name not in candidate:
+            print(f'{name:<32}{"—":>12}{"—":>12}')
+            continue
+        before = baseline[name]['median_ms']
+        after = candidate[name]['median_ms']
+        ratio = after / before if before else float('inf')
+        queries = f'{baseline[name]["queries"]}→{candidate[name]["queries"]}'
+        print(f'{name:<32}{before:>12.2f}{after:>12.2f}{ratio:>8.2f}'
+              f'{queries:>12}')
+        if ratio > options.threshold:
+            regressions.append(name)
+    if regressions:
+        print(f'Регрессии: {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""Замер времени ответа всех страниц из posts/urls.py и users/urls.py.
+
+Скрипт создаёт тестовую базу, наполняет её командой ``seed_data``,
+открывает каждую страницу тестовым клиентом и пишет JSON с результатами,
+который можно сравнить с прогоном другого коммита (см. compare.py):
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --output after.json
+    python benchmarks/compare.py before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.tokens import default_token_generator  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import (CaptureQueriesContext,  # noqa: E402
+                               setup_test_environment)
+from django.urls import reverse  # noqa: E402
+from django.utils.encoding import force_bytes  # noqa: E402
+from django.utils.http import urlsafe_base64_encode  # noqa: E402
+
+from core.testing import isolated_caches  # noqa: E402
+from posts import urls as posts_urls  # noqa: E402
+from posts.models import Follow, Group, Post, User  # noqa: E402
+from users import urls as users_urls  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument(
+        '--cold', action='store_true',
+        help='Очищать кэш перед каждым запросом.'
+    )
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--groups', type=int, default=10)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--comments', type=int, default=10000)
+    parser.add_argument('--follows', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def sample_kwargs():
+    """Аргументы URL: самый активный автор, его последний пост и т.д."""
+    author = User.objects.order_by('-counters__followers_count').first()
+    follower = Follow.objects.filter(author=author).first().user
+    post = Post.objects.filter(author=author).first()
+    return follower, {
+        'slug': Group.objects.order_by('-posts_count').first().slug,
+        'username': author.username,
+        'post_id': post.pk,
+        'uidb64': urlsafe_base64_encode(force_bytes(follower.pk)),
+        'token': default_token_generator.make_token(follower),
+    }
+
+
+def discover_urls(values):
+    urls = {}
+    for namespace, module in (('posts', posts_urls), ('users', users_urls)):
+        for pattern in module.urlpatterns:
+            name = f'{namespace}:{pattern.name}'
+            kwargs = {
+                key: values[key] for key in pattern.pattern.converters
+            }
+            urls[name] = reverse(name, kwargs=kwargs)
+    return urls
+
+
+def measure(client, user, url, options):
+    timings = []
+    queries = 0
+    status = None
+    for attempt in range(options.warmup + options.repeat):
+        client.force_login(user)
+        if options.cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - started
+        if attempt >= options.warmup:
+            timings.append(elapsed * 1000)
+            queries = len(context.captured_queries)
+            status = response.status_code
+    timings.sort()
+    return {
+        'url': url,
+        'status': status,
+        'queries': queries,
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p90_ms': round(timings[int(len(timings) * 0.9) - 1], 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+    }
+
+
+# Кэш по умолчанию — файл, общий с запущенным сервером: замер пишет
+# фрагменты и чистит кэш во временном каталоге, не трогая его.
+@isolated_caches()
+def main():
+    options = parse_args()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        call_command(
+            'seed_data',
+            users=options.users,
+            groups=options.groups,
+            posts=options.posts,
+            comments=options.comments,
+            follows=options.follows,
+            seed=options.seed,
+            stdout=open(os.devnull, 'w'),
+        )
+        user, values = sample_kwargs()
+        client = Client()
+        results = {}
+        for name, url in discover_urls(values).items():
+            results[name] = measure(client, user, url, options)
+            print(f'{name:<32} {results[name]["median_ms"]:>10.2f} ms')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'options': vars(options),
+        },
+        'results': results,
+    }
+    with open(options.output, 'w') as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""Конкурентные чтение и запись в SQLite с прагмами и без них.
+
+Скрипт создаёт базу в файле (в памяти блокировки выглядят иначе),
+наполняет её командой ``seed_data`` и дважды гоняет одинаковую
+нагрузку: ``--threads`` потоков в течение ``--duration`` секунд
+создают посты и комментарии и читают страницы постов. Первый прогон
+идёт с настройками SQLite по умолчанию (журнал отката, новое
+соединение на запрос), второй — с ``SQLITE_PRAGMAS`` и ``CONN_MAX_AGE``
+из настроек проекта. Каждый прогон начинается с пустого временного
+кэша, так что общий кэш сервера не трогается, а второй прогон
+не получает фрагменты, накопленные первым:
+
+    python benchmarks/sqlite_tuning.py --threads 8 --duration 10
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from run_benchmarks import git_commit
+
+from core.testing import isolated_caches
+from posts.models import Post, User
+
+DEFAULTS = {
+    'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+    'conn_max_age': 0,
+}
+
+# Доля операций каждого вида в нагрузке.
+OPERATIONS = (('comment', 3), ('create', 1), ('read', 6))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='sqlite_tuning.json')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def configure(pragmas, conn_max_age):
+    """Применяет настройки к соединениям, которые откроются дальше."""
+    connections.close_all()
+    settings.SQLITE_PRAGMAS = pragmas
+    connections.databases['default']['CONN_MAX_AGE'] = conn_max_age
+    # Режим журнала хранится в файле: переключаем его сразу.
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA journal_mode = {pragmas["journal_mode"]}')
+    connections.close_all()
+
+
+def worker(users, post_ids, deadline, seed, results):
+    rng = random.Random(seed)
+    client = Client()
+    client.force_login(rng.choice(users))
+    names = [name for name, weight in OPERATIONS for _ in range(weight)]
+    while time.perf_counter() < deadline:
+        name = rng.choice(names)
+        post_id = rng.choice(post_ids)
+        started = time.perf_counter()
+        try:
+            if name == 'comment':
+                response = client.post(
+                    reverse('posts:add_comment', args=[post_id]),
+                    {'text': 'Комментарий под нагрузкой'},
+                )
+            elif name == 'create':
+                response = client.post(
+                    reverse('posts:post_create'),
+                    {'text': 'Пост под нагрузкой'},
+                )
+            else:
+                response = client.get(
+                    reverse('posts:post_detail', args=[post_id])
+                )
+            ok = response.status_code in (200, 302)
+        except DatabaseError:
+            # С журналом отката писатели получают «database is locked».
+            ok = False
+        elapsed = time.perf_counter() - started
+        results[name]['latencies' if ok else 'errors'].append(elapsed)
+    connections.close_all()
+
+
+def run(options, users, post_ids):
+    results = {
+        name: {'latencies': [], 'errors': []} for name, _ in OPERATIONS
+    }
+    deadline = time.perf_counter() + options.duration
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(users, post_ids, deadline, options.seed + i, results),
+        )
+        for i in range(options.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = {}
+    for name, result in results.items():
+        latencies = sorted(result['latencies'])
+        summary[name] = {
+            'ops': len(latencies),
+            'ops_per_sec': round(len(latencies) / options.duration, 1),
+            'errors': len(result['errors']),
+            'p50_ms': round(statistics.median(latencies) * 1000, 2)
+            if latencies else None,
+            'p99_ms': round(
+                latencies[int(len(latencies) * 0.99) - 1] * 1000, 2
+            ) if latencies else None,
+        }
+    return summary
+
+
+@isolated_caches()
+def main():
+    options = parse_args()
+    setup_test_environment()
+    directory = tempfile.mkdtemp()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory, 'benchmark.sqlite3'
+    )
+    tuned = {
+        'pragmas': dict(settings.SQLITE_PRAGMAS),
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+    }
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        call_command(
+            'seed_data', users=options.users, posts=options.posts,
+            comments=options.posts, follows=options.users * 5,
+            seed=options.seed, stdout=open(os.devnull, 'w'),
+        )
+        users = list(User.objects.all()[:options.threads * 4])
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        report = {}
+        for mode, config in (('default', DEFAULTS), ('tuned', tuned)):
+            configure(config['pragmas'], config['conn_max_age'])
+            with isolated_caches():
+                report[mode] = run(options, users, post_ids)
+            print(f'{mode}: {json.dumps(report[mode], ensure_ascii=False)}')
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(directory, ignore_errors=True)
+    with open(options.output, 'w') as file:
+        json.dump({
+            'meta': {'commit': git_commit(), 'options': vars(options)},
+            **report,
+        }, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
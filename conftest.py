@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_caches(django_test_environment):
+    """Тесты pytest работают с отдельным кэшем, как и manage.py test."""
+    from core.testing import isolated_caches
+
+    with isolated_caches():
+        yield
@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture
+def query_budget(settings, django_assert_max_num_queries):
+    """Проверяет число SQL-запросов страницы без кэша фрагментов.
+
+    Первый запрос прогревает кэш миниатюр, второй измеряется.
+    """
+    settings.FRAGMENT_CACHE_TIMEOUT = 0
+
+    def check(client, url, budget):
+        client.get(url)
+        with django_assert_max_num_queries(budget):
+            return client.get(url)
+    return check
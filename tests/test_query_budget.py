@@ -0,0 +1,22 @@
+import pytest
+
+
+class TestQueryBudget:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_listing_pages_query_budget(self, user_client, query_budget,
+                                        few_posts_with_group,
+                                        another_few_posts_with_group_with_follower):
+        post = few_posts_with_group
+        pages = {
+            '/': 4,
+            f'/group/{post.group.slug}/': 5,
+            f'/profile/{post.author.username}/': 7,
+            f'/posts/{post.id}/': 5,
+            '/follow/': 4,
+        }
+        for url, budget in pages.items():
+            response = query_budget(user_client, url, budget)
+            assert response.status_code == 200, (
+                f'Страница `{url}` работает неправильно'
+            )
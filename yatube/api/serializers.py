@@ -0,0 +1,113 @@
+"""Представление моделей в JSON.
+
+Сериализатор — это набор полей, каждое из которых знает, как получить
+значение из объекта, и какие связи для этого нужно подгрузить
+``select_related``. Параметр ``?fields=`` выбирает подмножество полей,
+и связи ненужных полей не подгружаются вовсе.
+"""
+from django.urls import reverse
+
+
+def user_data(user):
+    if user is None:
+        return None
+    return {
+        'id': user.pk,
+        'username': user.username,
+        'full_name': user.get_full_name(),
+    }
+
+
+def group_data(group):
+    if group is None:
+        return None
+    return {'id': group.pk, 'slug': group.slug, 'title': group.title}
+
+
+class Field:
+    def __init__(self, getter, related=()):
+        self.getter = getter
+        self.related = related
+
+
+class Serializer:
+    fields = {}
+    default_fields = None
+
+    def __init__(self, fields=None):
+        """``fields`` — список имён из ``?fields=``; неизвестные имена
+        дают ``ValueError``.
+        """
+        names = fields or self.default_fields or list(self.fields)
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(f'Неизвестные поля: {", ".join(unknown)}')
+        self.names = names
+
+    def related(self):
+        """Связи, которые нужны выбранным полям."""
+        return sorted({
+            relation
+            for name in self.names
+            for relation in self.fields[name].related
+        })
+
+    def prepare(self, queryset):
+        related = self.related()
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset
+
+    def to_dict(self, obj):
+        return {name: self.fields[name].getter(obj) for name in self.names}
+
+
+class PostSerializer(Serializer):
+    fields = {
+        'id': Field(lambda post: post.pk),
+        'text': Field(lambda post: post.text),
+        'pub_date': Field(lambda post: post.pub_date.isoformat()),
+        'author': Field(lambda post: user_data(post.author), ('author',)),
+        'group': Field(lambda post: group_data(post.group), ('group',)),
+        'image': Field(lambda post: post.image.url if post.image else None),
+        'comments_count': Field(lambda post: post.comments_count),
+        'url': Field(lambda post: reverse(
+            'posts:post_detail', kwargs={'post_id': post.pk}
+        )),
+    }
+
+
+class GroupSerializer(Serializer):
+    fields = {
+        'id': Field(lambda group: group.pk),
+        'slug': Field(lambda group: group.slug),
+        'title': Field(lambda group: group.title),
+        'description': Field(lambda group: group.description),
+        'posts_count': Field(lambda group: group.posts_count),
+        'url': Field(lambda group: reverse(
+            'posts:group_list', kwargs={'slug': group.slug}
+        )),
+    }
+
+
+class CommentSerializer(Serializer):
+    fields = {
+        'id': Field(lambda comment: comment.pk),
+        'post': Field(lambda comment: comment.post_id),
+        'author': Field(
+            lambda comment: user_data(comment.author), ('author',)
+        ),
+        'text': Field(lambda comment: comment.text),
+        'created': Field(lambda comment: comment.created.isoformat()),
+    }
+
+
+class FollowSerializer(Serializer):
+    fields = {
+        'id': Field(lambda follow: follow.pk),
+        'user': Field(lambda follow: user_data(follow.user), ('user',)),
+        'author': Field(
+            lambda follow: user_data(follow.author), ('author',)
+        ),
+    }
+    default_fields = ['id', 'author']
@@ -0,0 +1,162 @@
+import json
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import encode_cursor
+from posts.tests.utils import QueryBudgetMixin
+
+
+class ApiTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.reader = User.objects.create_user(username='Krio')
+        cls.group = Group.objects.create(
+            title='test_title',
+            slug='test_group',
+            description='test_description',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Test_text {i}'
+            )
+            for i in range(25)
+        ]
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ApiTests.user)
+        self.reader_client = Client()
+        self.reader_client.force_login(ApiTests.reader)
+
+    def send(self, client, method, url, data):
+        return getattr(client, method)(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    def test_post_list_walks_with_cursor(self):
+        """Курсор ведёт по всем постам без пропусков."""
+        url = reverse('api:post_list')
+        seen = []
+        while url:
+            data = self.guest_client.get(url).json()
+            seen += [post['id'] for post in data['results']]
+            url = data['next']
+        self.assertEqual(seen, [post.pk for post in Post.objects.all()])
+
+    def test_cursor_past_the_end(self):
+        """Курсор за последним объектом даёт пустую страницу."""
+        response = self.guest_client.get(
+            reverse('api:group_list'),
+            {'after': encode_cursor(ApiTests.group, 'id')},
+        )
+        self.assertEqual(
+            response.json(), {'results': [], 'next': None, 'previous': None}
+        )
+
+    def test_batch_by_ids_in_one_query(self):
+        """Пачка постов с авторами и группами отдаётся одним запросом."""
+        ids = [post.pk for post in ApiTests.posts] + [0]
+        url = reverse('api:post_list')
+        with self.assertMaxQueries(1):
+            response = self.guest_client.get(
+                url, {'ids': ','.join(map(str, ids))}
+            )
+        data = response.json()
+        self.assertEqual(
+            [post['id'] for post in data['results']], ids[:-1]
+        )
+        self.assertEqual(data['missing'], [0])
+        self.assertEqual(data['results'][0]['author']['username'], 'Leo_test')
+        self.assertEqual(data['results'][0]['group']['slug'], 'test_group')
+
+    def test_sparse_fields(self):
+        """?fields= оставляет только запрошенные поля."""
+        url = reverse(
+            'api:post_detail', kwargs={'post_id': ApiTests.posts[0].pk}
+        )
+        response = self.guest_client.get(url, {'fields': 'id,text'})
+        self.assertEqual(
+            response.json(),
+            {'id': ApiTests.posts[0].pk, 'text': 'Test_text 0'}
+        )
+        response = self.guest_client.get(url, {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag(self):
+        """Повторный запрос с If-None-Match получает 304."""
+        url = reverse('api:group_list')
+        response = self.guest_client.get(url)
+        etag = response['ETag']
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Group.objects.create(title='Новая', slug='new')
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_post_write_permissions(self):
+        """Создавать посты может пользователь, править — только автор."""
+        url = reverse('api:post_list')
+        response = self.send(self.guest_client, 'post', url, {'text': 'Т'})
+        self.assertEqual(response.status_code, 401)
+        response = self.send(
+            self.authorized_client, 'post', url,
+            {'text': 'Новый', 'group': ApiTests.group.pk}
+        )
+        self.assertEqual(response.status_code, 201)
+        post_url = reverse(
+            'api:post_detail', kwargs={'post_id': response.json()['id']}
+        )
+        response = self.send(
+            self.reader_client, 'patch', post_url, {'text': 'Чужой'}
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.send(
+            self.authorized_client, 'patch', post_url, {'text': 'Правка'}
+        )
+        self.assertEqual(response.json()['text'], 'Правка')
+        self.assertEqual(response.json()['group']['id'], ApiTests.group.pk)
+        response = self.authorized_client.patch(
+            post_url, 'text=Форма',
+            content_type='application/x-www-form-urlencoded',
+        )
+        self.assertEqual(response.status_code, 415)
+        self.assertFalse(Post.objects.filter(text='Форма').exists())
+        response = self.authorized_client.delete(post_url)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Post.objects.filter(text='Правка').exists())
+
+    def test_comments_and_follows(self):
+        """Комментарии и подписки создаются и удаляются через API."""
+        post = ApiTests.posts[0]
+        url = reverse('api:comment_list', kwargs={'post_id': post.pk})
+        response = self.send(
+            self.reader_client, 'post', url, {'text': 'Комментарий'}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            self.guest_client.get(url).json()['results'][0]['text'],
+            'Комментарий'
+        )
+        response = self.authorized_client.delete(reverse(
+            'api:comment_detail',
+            kwargs={'comment_id': response.json()['id']}
+        ))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Comment.objects.count(), 1)
+
+        url = reverse('api:follow_list')
+        response = self.send(
+            self.reader_client, 'post', url, {'author': 'Leo_test'}
+        )
+        self.assertEqual(response.status_code, 201)
+        data = self.reader_client.get(url).json()
+        self.assertEqual(data['results'][0]['author']['username'], 'Leo_test')
+        self.reader_client.delete(
+            reverse('api:follow_detail', kwargs={'username': 'Leo_test'})
+        )
+        self.assertFalse(Follow.objects.exists())
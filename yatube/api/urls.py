@@ -0,0 +1,28 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.post_list, name='post_list'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.comment_list, name='comment_list'),
+    path(
+        'comments/<int:comment_id>/',
+        views.comment_detail, name='comment_detail'),
+    path('groups/', views.group_list, name='group_list'),
+    path('groups/<slug:slug>/', views.group_detail, name='group_detail'),
+    path('follows/', views.follow_list, name='follow_list'),
+    path(
+        'follows/<str:username>/',
+        views.follow_detail, name='follow_detail'),
+    path(
+        'recommendations/',
+        views.recommendation_list, name='recommendations'),
+    path(
+        'users/<str:username>/export/',
+        views.user_export, name='user_export'),
+]
@@ -0,0 +1,350 @@
+"""JSON API для постов, групп, комментариев и подписок.
+
+Все списки листаются курсором (``?after=`` / ``?before=``, размер
+``?limit=``), поддерживают выборку по ``?ids=1,2,3`` одним запросом
+и выбор полей ``?fields=``. Ответы на GET несут ETag, и клиент
+с совпадающим ``If-None-Match`` получает пустой ответ 304.
+"""
+import json
+from functools import wraps
+
+from django.conf import settings as st
+from django.core.exceptions import PermissionDenied
+from django.forms import modelform_factory
+from django.http import (Http404, HttpResponse, JsonResponse,
+                         StreamingHttpResponse)
+from django.shortcuts import get_object_or_404
+from django.utils.cache import (get_conditional_response, patch_vary_headers,
+                                set_response_etag)
+
+from posts import export, recommendations
+from posts.forms import CommentForm, PostForm
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import CursorPaginator
+
+from .serializers import (CommentSerializer, FollowSerializer,
+                          GroupSerializer, PostSerializer)
+
+GroupForm = modelform_factory(Group, fields=('title', 'slug', 'description'))
+
+
+class ApiError(Exception):
+    def __init__(self, status, detail, **extra):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.extra = extra
+
+
+def error_response(status, detail, **extra):
+    return JsonResponse({'detail': detail, **extra}, status=status)
+
+
+def api_view(*methods):
+    """Разрешённые методы, ошибки в JSON и ETag для ответов на GET."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = error_response(405, 'Метод не поддерживается.')
+                response['Allow'] = ', '.join(methods)
+                return response
+            try:
+                response = view(request, *args, **kwargs)
+            except ApiError as exc:
+                return error_response(exc.status, exc.detail, **exc.extra)
+            except Http404:
+                return error_response(404, 'Не найдено.')
+            except PermissionDenied:
+                return error_response(403, 'Недостаточно прав.')
+            patch_vary_headers(response, ['Cookie'])
+            if (
+                request.method == 'GET' and response.status_code == 200
+                and not response.streaming
+            ):
+                set_response_etag(response)
+                return get_conditional_response(
+                    request, etag=response['ETag'], response=response
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def require_login(request):
+    if not request.user.is_authenticated:
+        raise ApiError(401, 'Требуется авторизация.')
+
+
+def request_data(request):
+    """Тело запроса: JSON или обычная форма (для загрузки картинок).
+
+    Django разбирает форму только у POST, поэтому правки через PATCH
+    принимаются лишь в JSON, а не молча пропускаются.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise ApiError(400, 'Некорректный JSON.')
+        if not isinstance(data, dict):
+            raise ApiError(400, 'Ожидается JSON-объект.')
+        return data
+    if request.method != 'POST':
+        raise ApiError(
+            415, f'{request.method} принимает только application/json.'
+        )
+    return request.POST.dict()
+
+
+def get_serializer(request, serializer_class):
+    fields = request.GET.get('fields')
+    names = [name for name in fields.split(',') if name] if fields else None
+    try:
+        return serializer_class(names)
+    except ValueError as exc:
+        raise ApiError(400, str(exc))
+
+
+def parse_ids(value):
+    try:
+        ids = [int(pk) for pk in value.split(',') if pk]
+    except ValueError:
+        raise ApiError(400, 'ids — список чисел через запятую.')
+    if len(ids) > st.API_MAX_PAGE_SIZE:
+        raise ApiError(
+            400, f'Не больше {st.API_MAX_PAGE_SIZE} id за запрос.'
+        )
+    return ids
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', st.API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError(400, 'limit — целое число.')
+    return min(max(limit, 1), st.API_MAX_PAGE_SIZE)
+
+
+def page_link(request, **cursor):
+    token = next(iter(cursor.values()))
+    if token is None:
+        return None
+    query = request.GET.copy()
+    query.pop('after', None)
+    query.pop('before', None)
+    query.update(cursor)
+    return f'{request.path}?{query.urlencode()}'
+
+
+def list_response(request, queryset, serializer_class, ordering=None):
+    """Страница списка или пачка объектов по ``?ids=``."""
+    serializer = get_serializer(request, serializer_class)
+    queryset = serializer.prepare(queryset)
+    if 'ids' in request.GET:
+        ids = parse_ids(request.GET['ids'])
+        objects = queryset.in_bulk(ids)
+        return JsonResponse({
+            'results': [
+                serializer.to_dict(objects[pk])
+                for pk in ids if pk in objects
+            ],
+            'missing': [pk for pk in ids if pk not in objects],
+        })
+    paginator = CursorPaginator(queryset, parse_limit(request), ordering)
+    page = paginator.page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    return JsonResponse({
+        'results': [serializer.to_dict(obj) for obj in page],
+        'next': page_link(request, after=page.next_cursor),
+        'previous': page_link(request, before=page.previous_cursor),
+    })
+
+
+def object_response(request, obj, serializer_class, status=200):
+    serializer = get_serializer(request, serializer_class)
+    return JsonResponse(serializer.to_dict(obj), status=status)
+
+
+def form_errors(form):
+    return ApiError(400, 'Некорректные данные.', errors=form.errors)
+
+
+@api_view('GET', 'POST')
+def post_list(request):
+    if request.method == 'POST':
+        require_login(request)
+        form = PostForm(request_data(request), files=request.FILES or None)
+        if not form.is_valid():
+            raise form_errors(form)
+        post = form.save(commit=False)
+        post.author = request.user
+        form.save()
+        return object_response(request, post, PostSerializer, status=201)
+    posts = Post.objects.all()
+    if 'group' in request.GET:
+        posts = posts.filter(group__slug=request.GET['group'])
+    if 'author' in request.GET:
+        posts = posts.filter(author__username=request.GET['author'])
+    return list_response(request, posts, PostSerializer)
+
+
+@api_view('GET', 'PATCH', 'DELETE')
+def post_detail(request, post_id):
+    if request.method == 'GET':
+        serializer = get_serializer(request, PostSerializer)
+        post = get_object_or_404(
+            serializer.prepare(Post.objects.all()), pk=post_id
+        )
+        return JsonResponse(serializer.to_dict(post))
+    require_login(request)
+    post = get_object_or_404(Post, pk=post_id)
+    if post.author_id != request.user.pk:
+        raise PermissionDenied
+    if request.method == 'DELETE':
+        post.delete()
+        return HttpResponse(status=204)
+    data = {'text': post.text, 'group': post.group_id}
+    data.update(request_data(request))
+    form = PostForm(data, instance=post)
+    if not form.is_valid():
+        raise form_errors(form)
+    form.save()
+    return object_response(request, post, PostSerializer)
+
+
+@api_view('GET', 'POST')
+def group_list(request):
+    if request.method == 'POST':
+        require_login(request)
+        if not request.user.is_staff:
+            raise PermissionDenied
+        form = GroupForm(request_data(request))
+        if not form.is_valid():
+            raise form_errors(form)
+        group = form.save()
+        return object_response(request, group, GroupSerializer, status=201)
+    return list_response(
+        request, Group.objects.all(), GroupSerializer, ordering='id'
+    )
+
+
+@api_view('GET', 'PATCH', 'DELETE')
+def group_detail(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    if request.method == 'GET':
+        return object_response(request, group, GroupSerializer)
+    require_login(request)
+    if not request.user.is_staff:
+        raise PermissionDenied
+    if request.method == 'DELETE':
+        group.delete()
+        return HttpResponse(status=204)
+    data = {
+        'title': group.title,
+        'slug': group.slug,
+        'description': group.description,
+    }
+    data.update(request_data(request))
+    form = GroupForm(data, instance=group)
+    if not form.is_valid():
+        raise form_errors(form)
+    form.save()
+    return object_response(request, group, GroupSerializer)
+
+
+@api_view('GET', 'POST')
+def comment_list(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    if request.method == 'POST':
+        require_login(request)
+        form = CommentForm(request_data(request))
+        if not form.is_valid():
+            raise form_errors(form)
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post = post
+        comment.save()
+        return object_response(
+            request, comment, CommentSerializer, status=201
+        )
+    return list_response(request, post.comments.all(), CommentSerializer)
+
+
+@api_view('GET', 'DELETE')
+def comment_detail(request, comment_id):
+    if request.method == 'GET':
+        serializer = get_serializer(request, CommentSerializer)
+        comment = get_object_or_404(
+            serializer.prepare(Comment.objects.all()), pk=comment_id
+        )
+        return JsonResponse(serializer.to_dict(comment))
+    require_login(request)
+    comment = get_object_or_404(Comment, pk=comment_id)
+    if comment.author_id != request.user.pk:
+        raise PermissionDenied
+    comment.delete()
+    return HttpResponse(status=204)
+
+
+@api_view('GET', 'POST')
+def follow_list(request):
+    """Подписки текущего пользователя."""
+    require_login(request)
+    if request.method == 'POST':
+        username = request_data(request).get('author')
+        author = User.objects.filter(username=username).first()
+        if author is None:
+            raise ApiError(400, 'Автор не найден.')
+        if author == request.user:
+            raise ApiError(400, 'Нельзя подписаться на себя.')
+        follow, created = Follow.objects.get_or_create(
+            user=request.user, author=author
+        )
+        return object_response(
+            request, follow, FollowSerializer,
+            status=201 if created else 200
+        )
+    return list_response(
+        request, Follow.objects.filter(user=request.user),
+        FollowSerializer, ordering='-id'
+    )
+
+
+@api_view('DELETE')
+def follow_detail(request, username):
+    require_login(request)
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return HttpResponse(status=204)
+
+
+@api_view('GET')
+def user_export(request, username):
+    """Все посты и комментарии автора потоком NDJSON или CSV."""
+    require_login(request)
+    author = get_object_or_404(User, username=username)
+    if author != request.user and not request.user.is_staff:
+        raise PermissionDenied
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in export.FORMATS:
+        raise ApiError(400, 'format — ndjson или csv.')
+    response = StreamingHttpResponse(
+        export.export_lines(author, export_format, st.EXPORT_CHUNK_SIZE),
+        content_type=export.CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{author.username}.{export_format}"'
+    )
+    return response
+
+
+@api_view('GET')
+def recommendation_list(request):
+    """Авторы, которых стоит почитать текущему пользователю."""
+    require_login(request)
+    return JsonResponse(
+        {'results': recommendations.for_user(request.user)}
+    )
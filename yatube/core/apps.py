@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .db import configure_connection
+        connection_created.connect(configure_connection)
+        if settings.METRICS_ENABLED:
+            from .middleware import install
+            install()
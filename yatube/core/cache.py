@@ -0,0 +1,271 @@
+"""Кэш, общий для всех процессов хоста, в файле SQLite.
+
+``LocMemCache`` у каждого процесса gunicorn свой: фрагменты считаются
+в каждом процессе заново, а сброс версии области не доходит
+до соседей. Этот бэкенд хранит записи в одном файле SQLite в режиме
+WAL: читатели не блокируют писателя, а внешний сервис не нужен.
+
+Целые числа хранятся как числа SQLite, поэтому ``incr`` — один
+``UPDATE`` и атомарен между процессами. Остальные значения
+сериализуются pickle. При переполнении ``MAX_ENTRIES`` вытесняются
+давно не читанные записи; время чтения обновляется не чаще раза
+в ``ACCESS_RESOLUTION`` секунд, чтобы горячие ключи не превращали
+каждое чтение в запись.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Ограничение SQLite на число параметров запроса — 999.
+CHUNK_SIZE = 500
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+    'expires REAL, accessed REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+    'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)',
+)
+
+ALIVE = '(expires IS NULL OR expires > ?)'
+
+
+def _chunks(items):
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start:start + CHUNK_SIZE]
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = location
+        self.access_resolution = float(
+            options.get('ACCESS_RESOLUTION', 1.0)
+        )
+        self.busy_timeout = float(options.get('BUSY_TIMEOUT', 5.0))
+        self._local = threading.local()
+
+    @property
+    def _connection(self):
+        # После fork соединение родителя использовать нельзя,
+        # поэтому оно привязано и к потоку, и к процессу.
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.connection = self._connect()
+            local.pid = os.getpid()
+        return local.connection
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(
+            self.path, timeout=self.busy_timeout,
+            isolation_level=None, check_same_thread=False,
+        )
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    @contextmanager
+    def _write(self):
+        """Транзакция, которая сразу берёт блокировку на запись."""
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    @staticmethod
+    def _encode(value):
+        # bool — тоже int, но после incr он стал бы числом.
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        # При переполнении в incr SQLite переходит на REAL.
+        if isinstance(value, (int, float)):
+            return value
+        return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _mark_accessed(self, rows, now):
+        """Обновляет время чтения устаревших по нему записей."""
+        stale = [
+            key for key, accessed in rows
+            if accessed < now - self.access_resolution
+        ]
+        if stale:
+            with self._write() as connection:
+                connection.executemany(
+                    'UPDATE cache SET accessed = ? WHERE key = ?',
+                    [(now, key) for key in stale],
+                )
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        row = self._connection.execute(
+            f'SELECT value, accessed FROM cache WHERE key = ? AND {ALIVE}',
+            (key, now),
+        ).fetchone()
+        if row is None:
+            return default
+        self._mark_accessed([(key, row[1])], now)
+        return self._decode(row[0])
+
+    def get_many(self, keys, version=None):
+        originals = {self._key(key, version): key for key in keys}
+        now = time.time()
+        found = {}
+        accessed = []
+        for chunk in _chunks(list(originals)):
+            placeholders = ', '.join('?' * len(chunk))
+            rows = self._connection.execute(
+                'SELECT key, value, accessed FROM cache '
+                f'WHERE key IN ({placeholders}) AND {ALIVE}',
+                (*chunk, now),
+            )
+            for key, value, last_access in rows:
+                found[originals[key]] = self._decode(value)
+                accessed.append((key, last_access))
+        self._mark_accessed(accessed, now)
+        return found
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self._connection.execute(
+            f'SELECT 1 FROM cache WHERE key = ? AND {ALIVE}',
+            (key, time.time()),
+        ).fetchone() is not None
+
+    def _store(self, connection, key, value, expires, now):
+        updated = connection.execute(
+            'UPDATE cache SET value = ?, expires = ?, accessed = ? '
+            'WHERE key = ?',
+            (value, expires, now, key),
+        ).rowcount
+        if not updated:
+            connection.execute(
+                'INSERT INTO cache (key, value, expires, accessed) '
+                'VALUES (?, ?, ?, ?)',
+                (key, value, expires, now),
+            )
+        return not updated
+
+    def _cull(self, connection, now):
+        count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if count[0] <= self._max_entries:
+            return
+        connection.execute('DELETE FROM cache WHERE expires <= ?', (now,))
+        count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if count[0] <= self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            connection.execute('DELETE FROM cache')
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+            'ORDER BY accessed LIMIT ?)',
+            (count[0] // self._cull_frequency,),
+        )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        items = [
+            (self._key(key, version), self._encode(value))
+            for key, value in data.items()
+        ]
+        now = time.time()
+        with self._write() as connection:
+            inserted = False
+            for key, value in items:
+                inserted |= self._store(connection, key, value, expires, now)
+            if inserted:
+                self._cull(connection, now)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expires = self.get_backend_timeout(timeout)
+        value = self._encode(value)
+        now = time.time()
+        with self._write() as connection:
+            exists = connection.execute(
+                f'SELECT 1 FROM cache WHERE key = ? AND {ALIVE}', (key, now)
+            ).fetchone()
+            if exists:
+                return False
+            self._store(connection, key, value, expires, now)
+            self._cull(connection, now)
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        with self._write() as connection:
+            updated = connection.execute(
+                'UPDATE cache SET value = value + ?, accessed = ? '
+                f"WHERE key = ? AND typeof(value) = 'integer' AND {ALIVE}",
+                (delta, now, key, now),
+            ).rowcount
+            row = connection.execute(
+                f'SELECT value FROM cache WHERE key = ? AND {ALIVE}',
+                (key, now),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            if updated:
+                return row[0]
+            # Значение не целое число SQLite (например, Decimal).
+            value = self._decode(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ?, accessed = ? WHERE key = ?',
+                (self._encode(value), now, key),
+            )
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        with self._write() as connection:
+            return bool(connection.execute(
+                f'UPDATE cache SET expires = ? WHERE key = ? AND {ALIVE}',
+                (self.get_backend_timeout(timeout), key, now),
+            ).rowcount)
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        with self._write() as connection:
+            for chunk in _chunks(keys):
+                placeholders = ', '.join('?' * len(chunk))
+                connection.execute(
+                    f'DELETE FROM cache WHERE key IN ({placeholders})', chunk
+                )
+
+    def clear(self):
+        with self._write() as connection:
+            connection.execute('DELETE FROM cache')
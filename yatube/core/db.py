@@ -0,0 +1,34 @@
+"""Настройка соединений SQLite и проверка их исправности.
+
+Django открывает SQLite с настройками по умолчанию: журнал отката,
+при котором писатель блокирует читателей, и ``synchronous=FULL``.
+Обработчик ``connection_created`` выполняет ``SQLITE_PRAGMAS`` для
+каждого нового соединения. Режим WAL сохраняется в самом файле базы,
+остальные прагмы действуют только на соединение, поэтому с
+``CONN_MAX_AGE`` они применяются один раз за жизнь соединения.
+"""
+from django.conf import settings as st
+from django.db import connections
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in st.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def check_database(alias='default'):
+    """Состояние базы для проверки исправности; бросает DatabaseError."""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        state = {'database': 'ok'}
+        if connection.vendor == 'sqlite':
+            for name in st.SQLITE_PRAGMAS:
+                cursor.execute(f'PRAGMA {name}')
+                # Для базы в памяти mmap_size не возвращает строку.
+                row = cursor.fetchone()
+                state[name] = row[0] if row else None
+    return state
@@ -0,0 +1,47 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import metrics
+
+
+class Command(BaseCommand):
+    help = 'Выводит перцентили метрик запросов, собранных всеми процессами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Вывести сводку в формате JSON.'
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Удалить снимки после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        summary = metrics.summarize(
+            metrics.load_snapshots(settings.METRICS_DIR)
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2, sort_keys=True))
+        else:
+            self.write_table(summary)
+        if options['reset']:
+            metrics.remove_snapshots(settings.METRICS_DIR)
+
+    def write_table(self, summary):
+        columns = ['count', 'mean'] + [
+            f'p{percent}' for percent in metrics.PERCENTILES
+        ] + ['max']
+        header = f'{"view / metric":<40}' + ''.join(
+            f'{column:>12}' for column in columns
+        )
+        self.stdout.write(header)
+        for view_name in sorted(summary):
+            self.stdout.write(self.style.MIGRATE_HEADING(view_name))
+            for metric in metrics.METRICS:
+                values = summary[view_name][metric]
+                self.stdout.write(f'  {metric:<38}' + ''.join(
+                    f'{values[column]:>12}' for column in columns
+                ))
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import replicas
+
+
+class Command(BaseCommand):
+    help = (
+        'Пишет отметку времени в основную базу и выводит отставание '
+        'реплик. Страницы не читают из реплик, отставших больше '
+        'REPLICA_MAX_LAG секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch', type=float, metavar='SECONDS',
+            help='Повторять замер с этим интервалом.'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            self.stdout.write('Реплики не настроены (DATABASE_REPLICAS).')
+            return
+        while True:
+            replicas.beat()
+            for alias, lag in replicas.measure_lag().items():
+                if lag == float('inf'):
+                    line = self.style.ERROR(f'{alias}: недоступна')
+                elif lag > settings.REPLICA_MAX_LAG:
+                    line = self.style.WARNING(f'{alias}: {lag:.1f} с')
+                else:
+                    line = f'{alias}: {lag:.1f} с'
+                self.stdout.write(line)
+            if not options['watch']:
+                return
+            time.sleep(options['watch'])
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import replicas
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик. Замена '
+        'репликации для локальной проверки DATABASE_REPLICAS.'
+    )
+
+    def handle(self, *args, **options):
+        for alias in ['default', *settings.DATABASE_REPLICAS]:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f'{alias}: поддерживается только SQLite')
+        replicas.beat()
+        for alias in settings.DATABASE_REPLICAS:
+            replicas.copy_sqlite(alias)
+            self.stdout.write(f'{alias}: скопирована')
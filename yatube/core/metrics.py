@@ -0,0 +1,205 @@
+"""Сбор метрик производительности запросов внутри процесса.
+
+Для каждого имени URL (``posts:index``, ``posts:profile`` и т.д.)
+копятся гистограммы времени ответа, числа и времени SQL-запросов,
+времени рендеринга шаблонов и попаданий/промахов кэша.
+Гистограммы устроены как HDR: значение округляется до
+``PRECISION_BITS`` значащих двоичных разрядов, поэтому память
+не зависит от числа измерений. Округление вниз до 8 разрядов ошибается
+не больше чем на 2⁻⁷ ≈ 0,8% значения, то есть укладывается в 1%.
+"""
+import json
+import os
+import threading
+import time
+
+from django.conf import settings as st
+
+PRECISION_BITS = 8
+
+METRICS = (
+    'wall_us',
+    'sql_count',
+    'sql_us',
+    'template_us',
+    'cache_hits',
+    'cache_misses',
+)
+PERCENTILES = (50, 90, 99)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.count = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(value):
+        shift = max(value.bit_length() - PRECISION_BITS, 0)
+        return (value >> shift) << shift
+
+    def record(self, value):
+        value = max(int(value), 0)
+        bucket = self.bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        if not self.count:
+            return 0
+        threshold = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return bucket
+        return self.max
+
+    def summary(self):
+        result = {
+            'count': self.count,
+            'mean': round(self.total / self.count, 1) if self.count else 0,
+            'max': self.max,
+        }
+        for percent in PERCENTILES:
+            result[f'p{percent}'] = self.percentile(percent)
+        return result
+
+    def to_dict(self):
+        return {
+            'counts': {str(k): v for k, v in self.counts.items()},
+            'total': self.total,
+            'count': self.count,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = {int(k): v for k, v in data['counts'].items()}
+        histogram.total = data['total']
+        histogram.count = data['count']
+        histogram.max = data['max']
+        return histogram
+
+
+class RequestStats:
+    """Счётчики одного запроса, которые пишут перехватчики."""
+
+    def __init__(self):
+        self.values = dict.fromkeys(METRICS, 0)
+
+    def add(self, metric, value=1):
+        self.values[metric] += value
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.last_flush = time.monotonic()
+
+    def record(self, view_name, stats):
+        with self.lock:
+            histograms = self.views.setdefault(
+                view_name, {metric: Histogram() for metric in METRICS}
+            )
+            for metric, value in stats.values.items():
+                histograms[metric].record(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view_name: {
+                    metric: histogram.to_dict()
+                    for metric, histogram in histograms.items()
+                }
+                for view_name, histograms in self.views.items()
+            }
+
+    def summary(self):
+        return summarize(self.snapshot())
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+    def maybe_flush(self):
+        """Сбрасывает снимок на диск не чаще METRICS_FLUSH_INTERVAL."""
+        now = time.monotonic()
+        if now - self.last_flush < st.METRICS_FLUSH_INTERVAL:
+            return
+        self.last_flush = now
+        os.makedirs(st.METRICS_DIR, exist_ok=True)
+        path = os.path.join(st.METRICS_DIR, f'{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(tmp_path, path)
+
+
+def summarize(snapshot):
+    return {
+        view_name: {
+            metric: Histogram.from_dict(data).summary()
+            for metric, data in histograms.items()
+        }
+        for view_name, histograms in snapshot.items()
+    }
+
+
+def load_snapshots(directory):
+    """Объединяет снимки всех процессов из каталога METRICS_DIR."""
+    merged = {}
+    if not os.path.isdir(directory):
+        return merged
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(directory, name)) as file:
+            snapshot = json.load(file)
+        for view_name, histograms in snapshot.items():
+            target = merged.setdefault(view_name, {})
+            for metric, data in histograms.items():
+                histogram = Histogram.from_dict(data)
+                if metric in target:
+                    histogram.merge(Histogram.from_dict(target[metric]))
+                target[metric] = histogram.to_dict()
+    return merged
+
+
+def remove_snapshots(directory):
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith('.json'):
+            os.remove(os.path.join(directory, name))
+
+
+registry = Registry()
+_local = threading.local()
+
+
+def current():
+    """Счётчики текущего запроса в этом потоке или None."""
+    return getattr(_local, 'stats', None)
+
+
+def start():
+    _local.stats = RequestStats()
+    return _local.stats
+
+
+def stop():
+    _local.stats = None
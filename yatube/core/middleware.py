@@ -0,0 +1,109 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings as st
+from django.core.cache.backends.base import BaseCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+from django.utils.module_loading import import_string
+
+from . import metrics
+
+_MISSING = object()
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    stats = metrics.current()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add('sql_count')
+        stats.add('sql_us', (time.perf_counter() - started) * 1e6)
+
+
+def _instrument_templates():
+    if getattr(Template, '_metrics_installed', False):
+        return
+    Template._metrics_installed = True
+    render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        stats = metrics.current()
+        if stats is None:
+            return render(self, context, request)
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            stats.add('template_us', (time.perf_counter() - started) * 1e6)
+
+    Template.render = timed_render
+
+
+def _instrument_cache(backend_class):
+    if getattr(backend_class, '_metrics_installed', False):
+        return
+    backend_class._metrics_installed = True
+    get = backend_class.get
+    get_many = backend_class.get_many
+
+    def counted_get(self, key, default=None, version=None):
+        value = get(self, key, _MISSING, version=version)
+        stats = metrics.current()
+        if stats is not None:
+            stats.add('cache_misses' if value is _MISSING else 'cache_hits')
+        return default if value is _MISSING else value
+
+    def counted_get_many(self, keys, version=None):
+        keys = list(keys)
+        values = get_many(self, keys, version=version)
+        stats = metrics.current()
+        if stats is not None:
+            stats.add('cache_hits', len(values))
+            stats.add('cache_misses', len(keys) - len(values))
+        return values
+
+    backend_class.get = counted_get
+    # Базовый get_many вызывает get, и попадания посчитаются там.
+    if get_many is not BaseCache.get_many:
+        backend_class.get_many = counted_get_many
+
+
+def install():
+    """Подключает перехватчики рендеринга шаблонов и обращений к кэшу."""
+    _instrument_templates()
+    backends = {options['BACKEND'] for options in st.CACHES.values()}
+    for backend in backends:
+        _instrument_cache(import_string(backend))
+
+
+class PerformanceMiddleware:
+    """Замеряет время ответа, SQL, шаблоны и кэш для каждого имени URL."""
+
+    def __init__(self, get_response):
+        if not st.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = metrics.start()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(_sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.stop()
+        stats.add('wall_us', (time.perf_counter() - started) * 1e6)
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else '<unresolved>'
+        metrics.registry.record(view_name, stats)
+        metrics.registry.maybe_flush()
+        return response
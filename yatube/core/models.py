@@ -0,0 +1,12 @@
+from django.db import models
+
+
+class Heartbeat(models.Model):
+    """Отметка времени в основной базе. По её копии на реплике
+    видно, насколько реплика отстаёт.
+    """
+    beat = models.DateTimeField(verbose_name='Отметка')
+
+    class Meta:
+        verbose_name = 'Отметка репликации'
+        verbose_name_plural = 'Отметки репликации'
@@ -0,0 +1,180 @@
+"""Чтение страниц со списками постов с реплик базы.
+
+Страницы, обёрнутые ``read_from_replica``, выбирают одну из реплик
+``DATABASE_REPLICAS``, и ``ReplicaRouter`` направляет в неё все чтения
+до конца запроса. Запись всегда идёт в ``default``. После удачной
+записи (view, обёрнутый ``pin_to_primary``, ответил перенаправлением)
+браузер получает cookie, и ``REPLICA_PIN_SECONDS`` секунд его
+запросы читают из ``default``: автор сразу видит свой пост,
+комментарий или подписку, даже если реплика ещё отстаёт.
+
+Отставание измеряется по отметке ``Heartbeat``: команда
+``replica_lag`` пишет её в ``default`` и сравнивает с копией
+на каждой реплике. Реплики, отставшие больше ``REPLICA_MAX_LAG``
+секунд или недоступные, в выборе не участвуют.
+"""
+import contextvars
+import functools
+import random
+import sqlite3
+
+from django.conf import settings as st
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .models import Heartbeat
+
+PIN_COOKIE = 'read_primary'
+LAG_KEY = 'replica_lag:{}'
+
+_replica = contextvars.ContextVar('replica', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _replica.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, всё равно сохраняется в default.
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *st.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема попадает на реплики вместе с данными.
+        if db in st.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def choose_replica(request):
+    """Реплика для чтения в этом запросе или None, если читать из default.
+    """
+    if not st.DATABASE_REPLICAS or PIN_COOKIE in request.COOKIES:
+        return None
+    lags = cache.get_many(
+        [LAG_KEY.format(alias) for alias in st.DATABASE_REPLICAS]
+    )
+    # Пока отставание не измерено, реплика считается исправной.
+    healthy = [
+        alias for alias in st.DATABASE_REPLICAS
+        if lags.get(LAG_KEY.format(alias), 0) <= st.REPLICA_MAX_LAG
+    ]
+    if not healthy:
+        return None
+    return random.choice(healthy)
+
+
+def read_from_replica(view):
+    """Направляет чтения view в реплику, выбранную для запроса."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = choose_replica(request)
+        if alias is None:
+            return view(request, *args, **kwargs)
+        if hasattr(request, 'user'):
+            # Сессия и пользователь читаются из default: на отстающей
+            # реплике может не оказаться только что созданной сессии.
+            request.user.is_authenticated
+        token = _replica.set(alias)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+    return wrapper
+
+
+def may_be_stale(changed):
+    """Могла ли реплика текущего запроса ещё не получить изменение,
+    сделанное в момент ``changed``.
+
+    Такой ответ нельзя кэшировать: он пережил бы отставание реплики.
+    """
+    if _replica.get() is None or changed is None:
+        return False
+    return timezone.now() - changed < timezone.timedelta(
+        seconds=st.REPLICA_MAX_LAG
+    )
+
+
+def pin_to_primary(view):
+    """После удачной записи читает запросы клиента из default."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if st.DATABASE_REPLICAS and response.status_code in (301, 302):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=st.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+    return wrapper
+
+
+def beat():
+    """Обновляет отметку времени в default."""
+    Heartbeat.objects.update_or_create(
+        pk=1, defaults={'beat': timezone.now()}
+    )
+
+
+def measure_lag():
+    """Отставание реплик в секундах; недоступные — бесконечность.
+
+    Результат сохраняется в кэше, по нему ``choose_replica``
+    пропускает отстающие реплики.
+    """
+    now = timezone.now()
+    lags = {}
+    for alias in st.DATABASE_REPLICAS:
+        try:
+            moment = Heartbeat.objects.using(alias).filter(
+                pk=1
+            ).values_list('beat', flat=True).first()
+        except DatabaseError:
+            moment = None
+        if moment is None:
+            lags[alias] = float('inf')
+        else:
+            lags[alias] = max((now - moment).total_seconds(), 0.0)
+    cache.set_many(
+        {LAG_KEY.format(alias): lag for alias, lag in lags.items()},
+        st.REPLICA_LAG_TIMEOUT,
+    )
+    return lags
+
+
+def lag_report():
+    """Последние измеренные отставания реплик для проверки исправности.
+
+    None — отставание ещё не измерено.
+    """
+    lags = cache.get_many(
+        [LAG_KEY.format(alias) for alias in st.DATABASE_REPLICAS]
+    )
+    report = {}
+    for alias in st.DATABASE_REPLICAS:
+        lag = lags.get(LAG_KEY.format(alias))
+        report[alias] = 'unavailable' if lag == float('inf') else lag
+    return report
+
+
+def copy_sqlite(alias):
+    """Копирует базу default в файл реплики ``alias``.
+
+    Замена настоящей репликации для разработки и тестов, когда
+    реплики — локальные файлы SQLite.
+    """
+    source = connections['default']
+    source.ensure_connection()
+    target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+    connections[alias].close()
@@ -0,0 +1,70 @@
+"""Файловое хранилище с адресацией по содержимому.
+
+Файл сохраняется под SHA-256 своего содержимого:
+``posts/ab/ab12…ef.jpg``. Хэш считается во время записи во временный
+файл в том же каталоге, так что загрузка читается один раз и целиком
+в памяти не держится. Если файл с таким хэшем уже есть, временный
+удаляется и возвращается имя существующего: одинаковая картинка
+хранится и уменьшается в миниатюры один раз, сколько бы авторов её
+ни загрузили. Ссылки на файлы считает ``posts.blobs``.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+BLOB_NAME = re.compile(r'^(?P<digest>[0-9a-f]{64})(\.[0-9a-z]+)?$')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым: одинаковые файлы должны совпасть.
+        return name
+
+    def _save(self, name, content):
+        directory, basename = os.path.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        os.makedirs(self.path(directory), exist_ok=True)
+        digest = hashlib.sha256()
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=self.path(directory), suffix='.part'
+        )
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    file.write(chunk)
+            digest = digest.hexdigest()
+            name = '/'.join(
+                part for part in (directory, digest[:2], digest + extension)
+                if part
+            )
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                # Свежее время изменения защищает файл от сборщика
+                # мусора, пока новая ссылка на него не сохранена.
+                os.utime(full_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                os.replace(temp_path, full_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def blobs(self, directory):
+        """Имена всех файлов хранилища в каталоге ``directory``."""
+        if not self.exists(directory):
+            return
+        for fan_out in self.listdir(directory)[0]:
+            subdirectory = f'{directory}/{fan_out}'
+            for basename in self.listdir(subdirectory)[1]:
+                match = BLOB_NAME.match(basename)
+                if match and match['digest'][:2] == fan_out:
+                    yield f'{subdirectory}/{basename}'
+
+
+blob_storage = ContentAddressedStorage()
@@ -0,0 +1,45 @@
+"""Отдельный кэш для каждого запуска тестов.
+
+Кэш по умолчанию — файл SQLite, общий для всех процессов хоста, и без
+подмены тесты видели бы записи сервера и прошлых запусков.
+``TestRunner`` (``manage.py test``) и фикстура из ``conftest.py``
+(pytest) переносят файлы кэшей ``core.cache.SQLiteCache`` во временный
+каталог и удаляют его после тестов.
+"""
+import os
+import shutil
+import tempfile
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings as st
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+SQLITE_CACHE = 'core.cache.SQLiteCache'
+
+
+@contextmanager
+def isolated_caches():
+    directory = tempfile.mkdtemp(prefix='yatube-tests-')
+    caches = {}
+    for alias, config in st.CACHES.items():
+        config = dict(config)
+        if config['BACKEND'] == SQLITE_CACHE:
+            config['LOCATION'] = os.path.join(directory, f'{alias}.sqlite3')
+        caches[alias] = config
+    try:
+        with override_settings(CACHES=caches):
+            yield directory
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        self._stack = ExitStack()
+        self._stack.enter_context(isolated_caches())
+        super().setup_test_environment(**kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        super().teardown_test_environment(**kwargs)
+        self._stack.close()
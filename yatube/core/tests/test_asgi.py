@@ -0,0 +1,73 @@
+import asyncio
+
+from django.core.wsgi import get_wsgi_application
+from django.test import SimpleTestCase
+
+from ..asgi import WsgiBridge, build_environ
+
+
+def echo_application(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    body = environ['wsgi.input'].read()
+    return [environ['PATH_INFO'].encode('latin-1'), b'|', body]
+
+
+def call(application, scope, body=b''):
+    """Прогоняет один HTTP-запрос через ASGI-приложение."""
+    messages = [
+        {'type': 'http.request', 'body': body[:3], 'more_body': True},
+        {'type': 'http.request', 'body': body[3:]},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    return sent
+
+
+class AsgiBridgeTests(SimpleTestCase):
+    def test_environ_from_scope(self):
+        """Заголовки, путь и строка запроса переносятся в environ."""
+        environ = build_environ({
+            'method': 'GET',
+            'path': '/profile/Лео/',
+            'query_string': b'page=2',
+            'headers': [
+                (b'content-type', b'text/html'),
+                (b'accept', b'text/html'),
+                (b'accept', b'*/*'),
+            ],
+        }, b'')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/html')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/html,*/*')
+        self.assertEqual(environ['QUERY_STRING'], 'page=2')
+        self.assertEqual(
+            environ['PATH_INFO'].encode('latin-1').decode(), '/profile/Лео/'
+        )
+
+    def test_body_and_streamed_response(self):
+        """Тело запроса собирается из частей, ответ отдаётся по частям."""
+        bridge = WsgiBridge(echo_application, threads=2)
+        sent = call(
+            bridge, {'type': 'http', 'method': 'POST', 'path': '/echo/'},
+            body=b'hello',
+        )
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-type', b'text/plain'), sent[0]['headers'])
+        body = b''.join(message.get('body', b'') for message in sent[1:])
+        self.assertEqual(body, b'/echo/|hello')
+        self.assertFalse(sent[-1].get('more_body'))
+
+    def test_django_application(self):
+        """Через мост отвечает приложение Django."""
+        bridge = WsgiBridge(get_wsgi_application(), threads=2)
+        sent = call(bridge, {
+            'type': 'http', 'method': 'GET', 'path': '/about/author/',
+            'server': ('testserver', 80),
+        })
+        self.assertEqual(sent[0]['status'], 200)
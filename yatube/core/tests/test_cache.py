@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings as st
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from ..cache import SQLiteCache
+
+TEMP_CACHE_DIR = tempfile.mkdtemp()
+
+PROCESSES = 4
+ROUNDS = 200
+
+
+def make_cache(name, **options):
+    return SQLiteCache(
+        os.path.join(TEMP_CACHE_DIR, f'{name}.sqlite3'),
+        {'TIMEOUT': None, 'OPTIONS': options},
+    )
+
+
+def stress_cache():
+    return make_cache('stress', MAX_ENTRIES=PROCESSES * ROUNDS * 2)
+
+
+def hammer(number):
+    """Работа одного процесса в нагрузочном тесте."""
+    cache = stress_cache()
+    won = cache.add('winner', number)
+    for i in range(ROUNDS):
+        cache.incr('counter')
+        cache.set_many({f'{number}:{i}': [number, i], 'shared': i})
+        assert cache.get(f'{number}:{i}') == [number, i]
+        cache.get_many([f'{number}:{i}', 'shared', 'counter'])
+    return won
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+
+    def test_values_and_expiry(self):
+        """Значения любых типов хранятся до истечения таймаута."""
+        cache = make_cache('values')
+        cache.clear()
+        values = {'text': 'текст', 'number': 7, 'flag': True, 'none': None}
+        cache.set_many(values)
+        self.assertEqual(cache.get_many([*values, 'missing']), values)
+        self.assertIs(cache.get('flag'), True)
+        cache.set('short', 1, timeout=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('short'))
+        self.assertTrue(cache.add('short', 2))
+        self.assertFalse(cache.add('short', 3))
+        self.assertEqual(cache.incr('number', 3), 10)
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+        cache.delete_many(['text', 'number'])
+        self.assertFalse(cache.has_key('text'))
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняются давно не читанные записи."""
+        cache = make_cache(
+            'lru', MAX_ENTRIES=10, CULL_FREQUENCY=2, ACCESS_RESOLUTION=0
+        )
+        cache.clear()
+        for i in range(10):
+            cache.set(i, i)
+        cache.get(0)
+        cache.set(10, 10)
+        self.assertEqual(cache.get(0), 0)
+        self.assertEqual(cache.get(10), 10)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(len(cache.get_many(range(11))), 6)
+
+    def test_processes_share_cache(self):
+        """Процессы видят записи друг друга, incr и add атомарны."""
+        cache = stress_cache()
+        cache.clear()
+        cache.set('counter', 0)
+        context = multiprocessing.get_context('fork')
+        with context.Pool(PROCESSES) as pool:
+            won = pool.map(hammer, range(PROCESSES))
+        self.assertEqual(won.count(True), 1)
+        self.assertEqual(cache.get('counter'), PROCESSES * ROUNDS)
+        self.assertEqual(cache.get(f'{PROCESSES - 1}:{ROUNDS - 1}'), [
+            PROCESSES - 1, ROUNDS - 1
+        ])
+        self.assertEqual(cache.get('winner'), won.index(True))
+
+    def test_tests_use_isolated_file(self):
+        """Тесты не пишут в файл кэша из настроек."""
+        path = caches['default'].path
+        self.assertNotEqual(path, st.CACHE_LOCATION)
+        self.assertTrue(path.startswith(tempfile.gettempdir()))
@@ -0,0 +1,79 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from ..metrics import Histogram, registry
+
+TEMP_METRICS_DIR = tempfile.mkdtemp()
+
+
+@override_settings(METRICS_DIR=TEMP_METRICS_DIR, METRICS_FLUSH_INTERVAL=0)
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.staff = User.objects.create_user(
+            username='Admin_test', is_staff=True
+        )
+        Post.objects.create(author=cls.user, text='Test_text')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+
+    def setUp(self):
+        registry.reset()
+        cache.clear()
+
+    def test_histogram_percentiles(self):
+        """Перцентили гистограммы точны до 1%."""
+        histogram = Histogram()
+        for value in range(1, 10001):
+            histogram.record(value)
+        self.assertAlmostEqual(histogram.percentile(50), 5000, delta=50)
+        self.assertAlmostEqual(histogram.percentile(99), 9900, delta=99)
+        self.assertEqual(histogram.max, 10000)
+
+    def test_histogram_bucket_error(self):
+        """Округление до корзины ошибается не больше чем на 1%."""
+        for value in range(1, 1 << 16):
+            error = (value - Histogram.bucket(value)) / value
+            self.assertLessEqual(error, 0.01, value)
+
+    def test_middleware_records_view_metrics(self):
+        """Middleware копит метрики по имени URL."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        summary = registry.summary()['posts:index']
+        self.assertEqual(summary['wall_us']['count'], 2)
+        self.assertGreater(summary['sql_count']['max'], 0)
+        self.assertGreater(summary['template_us']['max'], 0)
+        self.assertGreater(summary['cache_hits']['max'], 0)
+        self.assertGreater(summary['cache_misses']['max'], 0)
+
+    def test_metrics_endpoint_for_staff_only(self):
+        """Эндпоинт метрик доступен только персоналу."""
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(MetricsTests.staff)
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('metrics'))
+        self.assertIn('posts:index', response.json())
+
+    def test_dump_metrics_command(self):
+        """Команда dump_metrics читает снимки процессов."""
+        self.client.get(reverse('posts:index'))
+        out = StringIO()
+        call_command('dump_metrics', '--json', stdout=out)
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary['posts:index']['wall_us']['count'], 1)
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post, User
+
+from .. import replicas
+from ..models import Heartbeat
+
+REPLICAS = ['replica_a', 'replica_b']
+
+
+@override_settings(DATABASE_REPLICAS=['replica_a'], REPLICA_MAX_LAG=30)
+class ReplicaRouterTests(TransactionTestCase):
+    """Реплики — два локальных файла SQLite, их «репликация» —
+    копирование основной базы командой ``copy_sqlite``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Псевдонимы добавляются после setUpClass, чтобы тестовый
+        # класс не запретил к ним запросы.
+        cls.directory = tempfile.mkdtemp()
+        for alias in REPLICAS:
+            connections.databases[alias] = {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(cls.directory, f'{alias}.sqlite3'),
+            }
+
+    @classmethod
+    def tearDownClass(cls):
+        for alias in REPLICAS:
+            connections[alias].close()
+            del connections.databases[alias]
+            if hasattr(connections._connections, alias):
+                delattr(connections._connections, alias)
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Leo_test')
+        self.post = Post.objects.create(author=self.author, text='Старый')
+        replicas.copy_sqlite('replica_a')
+        # Пост, который до реплики ещё не дошёл.
+        Post.objects.create(author=self.author, text='Свежий')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_listing_reads_from_replica(self):
+        """Списки постов читаются из реплики, а без реплик — из default."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': 'Leo_test'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                content = self.authorized_client.get(url).content.decode()
+                self.assertIn('Старый', content)
+                self.assertNotIn('Свежий', content)
+        cache.clear()
+        with self.settings(DATABASE_REPLICAS=[]):
+            response = self.authorized_client.get(urls[0])
+        self.assertContains(response, 'Свежий')
+
+    def test_read_your_writes(self):
+        """После комментария автор читает страницу поста из default."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        response = self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'Мой комментарий'},
+        )
+        self.assertIn(replicas.PIN_COOKIE, response.cookies)
+        self.assertContains(self.authorized_client.get(url), 'Мой комментарий')
+        self.assertNotContains(Client().get(url), 'Мой комментарий')
+
+    @override_settings(DATABASE_REPLICAS=REPLICAS)
+    def test_lag_report(self):
+        """Отстающие и недоступные реплики не выбираются для чтения."""
+        replicas.beat()
+        replicas.copy_sqlite('replica_a')
+        lags = replicas.measure_lag()
+        self.assertLess(lags['replica_a'], 5)
+        self.assertEqual(lags['replica_b'], float('inf'))
+        Heartbeat.objects.using('replica_a').update(
+            beat=timezone.now() - timezone.timedelta(seconds=100)
+        )
+        self.assertGreater(replicas.measure_lag()['replica_a'], 30)
+        response = self.client.get(reverse('health'))
+        self.assertEqual(
+            response.json()['replicas']['replica_b'], 'unavailable'
+        )
+        self.assertIsNone(replicas.choose_replica(response.wsgi_request))
+        content = self.client.get(reverse('posts:index')).content.decode()
+        self.assertIn('Свежий', content)
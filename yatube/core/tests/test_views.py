@@ -1,6 +1,10 @@
 from http import HTTPStatus
 
+from unittest import mock
+
+from django.db import OperationalError
 from django.test import TestCase
+from django.urls import reverse
 
 
 class ViewTestClass(TestCase):
@@ -16,3 +20,19 @@ class ViewTestClass(TestCase):
             'Шаблон 404.html не найден.'
         )
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_health(self):
+        """Проверка исправности сообщает прагмы SQLite и сбой базы."""
+        response = self.client.get(reverse('health'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['database'], 'ok')
+        self.assertEqual(response.json()['synchronous'], 1)
+        self.assertEqual(response.json()['busy_timeout'], 5000)
+        with mock.patch(
+            'core.views.check_database',
+            side_effect=OperationalError('database is locked'),
+        ):
+            response = self.client.get(reverse('health'))
+        self.assertEqual(
+            response.status_code, HTTPStatus.SERVICE_UNAVAILABLE
+        )
@@ -1,5 +1,15 @@
+from http import HTTPStatus
+
+from django.conf import settings as st
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import DatabaseError
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from . import metrics
+from .db import check_database
+from .replicas import lag_report
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -15,3 +25,22 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+@staff_member_required
+def metrics_view(request):
+    """Перцентили метрик запросов текущего процесса."""
+    return JsonResponse(metrics.registry.summary())
+
+
+def health(request):
+    """Проверка исправности для балансировщика: база отвечает на запрос."""
+    try:
+        state = check_database()
+    except DatabaseError as error:
+        return JsonResponse(
+            {'database': str(error)}, status=HTTPStatus.SERVICE_UNAVAILABLE
+        )
+    if st.DATABASE_REPLICAS:
+        state['replicas'] = lag_report()
+    return JsonResponse(state)
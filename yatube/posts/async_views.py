@@ -0,0 +1,243 @@
+"""Асинхронные варианты страниц со списками постов.
+
+Django 2.2 вызывает обработчики синхронно и не умеет ``async def``
+views, поэтому каждая страница здесь — корутина, которую декоратор
+``sync_entry`` запускает в собственном цикле событий. Запросы ORM
+блокирующие и выполняются в пуле потоков ``ASYNC_QUERY_WORKERS``,
+а независимые запросы (число постов, строки страницы, счётчики,
+подписка) идут параллельно через ``asyncio.gather``. Сами шаги
+страниц общие с синхронными views и лежат в ``posts.pages``. После
+перехода на Django 3.1+ декоратор можно убрать, и views станут
+нативными.
+
+Варианты включаются настройкой ``ASYNC_VIEWS``; ``variant`` выбирает
+между ними при каждом запросе, так что настройку можно поменять и в
+тестах. При ``ASYNC_QUERY_WORKERS = 0`` пула нет и запросы идут по
+очереди в потоке запроса: так views работают внутри транзакции
+``TestCase``, которую соединения потоков пула не видят.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings as st
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db import close_old_connections
+from django.shortcuts import get_object_or_404, render
+
+from core.replicas import read_from_replica
+
+from . import counters, fragments, pages, timeline
+from .models import Group, Post, User
+from .paginators import paginate
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=st.ASYNC_QUERY_WORKERS,
+            thread_name_prefix='orm',
+        )
+    return _executor
+
+
+def _call_in_thread(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # Соединения живут в потоке пула, а не в потоке запроса,
+        # поэтому request_finished их не закроет.
+        close_old_connections()
+
+
+def run_sync(func, *args):
+    """Awaitable для блокирующего вызова ``func(*args)`` в пуле потоков."""
+    loop = asyncio.get_running_loop()
+    if not st.ASYNC_QUERY_WORKERS:
+        future = loop.create_future()
+        try:
+            future.set_result(func(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+    # Пул не переносит контекст сам, а в нём выбранная реплика.
+    context = contextvars.copy_context()
+    return loop.run_in_executor(
+        _get_executor(),
+        functools.partial(context.run, _call_in_thread, func, *args),
+    )
+
+
+def sync_entry(view):
+    """Позволяет подключить корутину как обычный view Django 2.2."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return asyncio.run(view(request, *args, **kwargs))
+    return wrapper
+
+
+def variant(sync_view):
+    """View, который вызывает асинхронный вариант при ``ASYNC_VIEWS``."""
+    async_view = globals()[sync_view.__name__]
+
+    @functools.wraps(sync_view)
+    def view(request, *args, **kwargs):
+        chosen = async_view if st.ASYNC_VIEWS else sync_view
+        return chosen(request, *args, **kwargs)
+    return view
+
+
+def fragment_cached(request, fragment):
+    """Есть ли в кэше фрагмент со списком постов для этой страницы."""
+    key = make_template_fragment_key(
+        'posts_page', [fragment['fragment_key'], request.GET.urlencode()]
+    )
+    return cache.get(key) is not None
+
+
+async def page_of(request, post_list, fragment, count=None):
+    """Страница постов, строки которой читаются параллельно с ``COUNT``.
+
+    ``count`` — число постов или awaitable, который его вернёт.
+    Если фрагмент уже в кэше, строки страницы шаблону не понадобятся
+    и остаются ленивыми.
+    """
+    cached = fragment_cached(request, fragment)
+    if st.POSTS_PAGINATION == 'cursor' or cached:
+        if inspect.isawaitable(count):
+            count = await count
+        return await run_sync(paginate, request, post_list, count)
+    paginator = Paginator(post_list, st.PАGES)
+    try:
+        number = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        number = 1
+    bottom = (number - 1) * st.PАGES
+    rows = run_sync(list, post_list[bottom:bottom + st.PАGES])
+    if count is None:
+        count = run_sync(post_list.count)
+    if inspect.isawaitable(count):
+        count, rows = await asyncio.gather(count, rows)
+    else:
+        rows = await rows
+    paginator.count = count
+    try:
+        paginator.validate_number(number)
+    except InvalidPage:
+        # Номер за пределами списка: как get_page, отдаём последнюю.
+        return await run_sync(paginate, request, post_list, count)
+    return Page(rows, number, paginator)
+
+
+async def current_user(request):
+    """Загружает пользователя сессии, чтобы потоки пула его не трогали."""
+    await run_sync(lambda: request.user.is_authenticated)
+    return request.user
+
+
+@read_from_replica
+@sync_entry
+async def index(request):
+    post_list = pages.with_relations(Post.objects.all())
+    fragment = fragments.context(fragments.index_scope())
+    page_obj, _ = await asyncio.gather(
+        page_of(request, post_list, fragment), current_user(request)
+    )
+    context = pages.index_context(post_list, page_obj, fragment)
+    return render(request, pages.INDEX_TEMPLATE, context)
+
+
+@read_from_replica
+@sync_entry
+async def group_posts(request, slug):
+    group, _ = await asyncio.gather(
+        run_sync(functools.partial(get_object_or_404, Group, slug=slug)),
+        current_user(request),
+    )
+    validators = await run_sync(pages.group_validators, request, group)
+    not_modified = validators.not_modified(request)
+    if not_modified:
+        return not_modified
+    post_list = pages.with_relations(group.posts.all())
+    fragment = fragments.context(fragments.group_scope(group.pk))
+    page_obj = await page_of(
+        request, post_list, fragment, count=group.posts_count
+    )
+    context = pages.group_context(group, page_obj, fragment)
+    return validators.apply(render(request, pages.GROUP_TEMPLATE, context))
+
+
+async def _posts_count(counters_future):
+    return (await counters_future).posts_count
+
+
+@read_from_replica
+@sync_entry
+async def profile(request, username):
+    author, user = await asyncio.gather(
+        run_sync(functools.partial(
+            get_object_or_404, User, username=username
+        )),
+        current_user(request),
+    )
+    validators = await run_sync(pages.profile_validators, request, author)
+    not_modified = validators.not_modified(request)
+    if not_modified:
+        return not_modified
+    user_posts = pages.with_relations(author.posts.all())
+    fragment = fragments.context(fragments.profile_scope(author.pk))
+    counters_future = asyncio.ensure_future(
+        run_sync(counters.for_user, author)
+    )
+    (
+        author_counters, following, suggestions, page_obj
+    ) = await asyncio.gather(
+        counters_future,
+        run_sync(pages.following, user, author),
+        run_sync(pages.profile_recommendations, user, author),
+        page_of(
+            request, user_posts, fragment,
+            count=_posts_count(counters_future),
+        ),
+    )
+    context = pages.profile_context(
+        author, author_counters, page_obj, following, suggestions, fragment
+    )
+    return validators.apply(render(request, pages.PROFILE_TEMPLATE, context))
+
+
+@read_from_replica
+@sync_entry
+async def post_detail(request, post_id):
+    post, _ = await asyncio.gather(
+        run_sync(pages.get_post, post_id), current_user(request)
+    )
+    validators = pages.post_validators(request, post)
+    not_modified = validators.not_modified(request)
+    if not_modified:
+        return not_modified
+    author_counters, comments = await asyncio.gather(
+        run_sync(counters.for_user, post.author),
+        run_sync(list, pages.post_comments(post)),
+    )
+    context = pages.post_context(post, author_counters, comments)
+    return validators.apply(render(request, pages.POST_TEMPLATE, context))
+
+
+@login_required
+@read_from_replica
+@sync_entry
+async def follow_index(request):
+    news = timeline.posts_for(request.user)
+    fragment = await run_sync(pages.follow_fragment, request.user)
+    page_obj = await page_of(request, news, fragment)
+    context = pages.follow_context(page_obj, fragment)
+    return render(request, pages.FOLLOW_TEMPLATE, context)
@@ -0,0 +1,86 @@
+"""Счётчики ссылок постов на картинки и сборка мусора.
+
+``Post.image`` лежит в ``core.storage.ContentAddressedStorage``, поэтому
+один файл может быть у многих постов. Сигналы (``posts.signals``)
+меняют ``ImageBlob.refs`` атомарными ``UPDATE`` при создании, правке
+и удалении поста, а файлы без ссылок вместе с миниатюрами удаляет
+команда ``collect_blobs``. Она же пересчитывает счётчики после
+массовых операций в обход сигналов.
+"""
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from sorl.thumbnail import delete
+from sorl.thumbnail.images import ImageFile
+
+from .models import ImageBlob, Post
+
+IMAGE_FIELD = Post._meta.get_field('image')
+
+
+def acquire(name):
+    if not name:
+        return
+    updated = ImageBlob.objects.filter(name=name).update(
+        refs=F('refs') + 1
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            ImageBlob.objects.create(name=name, refs=1)
+    except IntegrityError:
+        # Запись успел создать параллельный запрос.
+        acquire(name)
+
+
+def release(name):
+    if name:
+        ImageBlob.objects.filter(name=name, refs__gt=0).update(
+            refs=F('refs') - 1
+        )
+
+
+def recount():
+    """Пересчитывает ссылки по постам; возвращает число строк."""
+    names = (
+        Post.objects.exclude(image='').order_by()
+        .values_list('image', flat=True).distinct()
+    )
+    ImageBlob.objects.bulk_create(
+        (ImageBlob(name=name) for name in names.iterator()),
+        ignore_conflicts=True,
+    )
+    return ImageBlob.objects.update(refs=Coalesce(Subquery(
+        Post.objects.filter(image=OuterRef('name'))
+        .order_by().values('image')
+        .annotate(total=Count('pk')).values('total')
+    ), 0))
+
+
+def collect(grace, dry_run=False):
+    """Удаляет файлы без ссылок, не менявшиеся дольше ``grace`` секунд.
+
+    Возвращает список удалённых (при ``dry_run`` — найденных) имён.
+    """
+    storage = IMAGE_FIELD.storage
+    referenced = set(
+        ImageBlob.objects.filter(refs__gt=0).values_list('name', flat=True)
+    )
+    cutoff = time.time() - grace
+    removed = []
+    for name in storage.blobs(IMAGE_FIELD.upload_to.rstrip('/')):
+        if name in referenced:
+            continue
+        if storage.get_modified_time(name).timestamp() > cutoff:
+            continue
+        # Ссылка могла появиться после выборки referenced.
+        if ImageBlob.objects.filter(name=name, refs__gt=0).exists():
+            continue
+        if not dry_run:
+            delete(ImageFile(name, storage))
+            ImageBlob.objects.filter(name=name, refs=0).delete()
+        removed.append(name)
+    return removed
@@ -0,0 +1,95 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются атомарными ``UPDATE ... SET n = n + 1`` из сигналов
+(см. ``posts.signals``), а страницы читают их за O(1) вместо ``COUNT(*)``.
+Расхождения исправляет команда ``reconcile_counters``.
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Group, Post, User, UserCounters
+
+USER_COUNTERS = {
+    'posts_count': (Post, 'author_id'),
+    'followers_count': (Follow, 'author_id'),
+    'following_count': (Follow, 'user_id'),
+}
+
+
+def _count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field)
+        .annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def reconcile_user(user_id):
+    """Пересчитывает счётчики пользователя по реальным данным."""
+    values = {
+        name: model.objects.filter(**{field: user_id}).count()
+        for name, (model, field) in USER_COUNTERS.items()
+    }
+    counters, _ = UserCounters.objects.update_or_create(
+        user_id=user_id, defaults=values
+    )
+    return counters
+
+
+def for_user(user):
+    """Счётчики пользователя; при первом обращении они вычисляются."""
+    try:
+        return UserCounters.objects.get(user_id=user.pk)
+    except UserCounters.DoesNotExist:
+        return reconcile_user(user.pk)
+
+
+def bump_user(user_id, field, delta):
+    """Меняет счётчик; строку без счётчиков создаёт только прибавление.
+
+    При каскадном удалении пользователя его ``UserCounters`` удаляется
+    раньше постов и подписок, и пересчёт из их сигналов вернул бы
+    строку удаляемого пользователя.
+    """
+    if user_id is None:
+        return
+    updated = UserCounters.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta}
+    )
+    if (not updated and delta > 0
+            and User.objects.filter(pk=user_id).exists()):
+        reconcile_user(user_id)
+
+
+def bump_group(group_id, delta):
+    if group_id is not None:
+        Group.objects.filter(pk=group_id).update(
+            posts_count=F('posts_count') + delta
+        )
+
+
+def bump_post(post_id, delta):
+    if post_id is not None:
+        Post.objects.filter(pk=post_id).update(
+            comments_count=F('comments_count') + delta
+        )
+
+
+def reconcile_all():
+    """Пересчитывает все счётчики; возвращает число обновлённых строк."""
+    updated = Group.objects.update(
+        posts_count=_count_subquery(Post, 'group_id')
+    )
+    updated += Post.objects.update(
+        comments_count=_count_subquery(Comment, 'post_id')
+    )
+    missing = User.objects.filter(counters__isnull=True)
+    UserCounters.objects.bulk_create(
+        UserCounters(user_id=user_id)
+        for user_id in missing.values_list('pk', flat=True)
+    )
+    updated += UserCounters.objects.update(**{
+        name: _count_subquery(model, field)
+        for name, (model, field) in USER_COUNTERS.items()
+    })
+    return updated
@@ -0,0 +1,166 @@
+"""Ленты RSS и Atom для всего сайта, групп и авторов.
+
+Записи лент берутся теми же запросами, что и страницы ``index``,
+``group_posts`` и ``profile``. Готовый XML хранится в кэше под
+версией области ``posts.fragments`` и собирается заново только после
+изменения поста в этой области. ETag — та же версия, поэтому
+программа чтения лент, опрашивающая сайт, получает 304 после одного
+обращения к кэшу и одного запроса к базе (группа или автор по адресу).
+"""
+from calendar import timegm
+
+from django.conf import settings as st
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.text import Truncator
+
+from core import replicas
+
+from . import fragments
+from .conditional import newest
+from .models import Group, Post, User
+
+FEED_KEY = 'feed:{}:{}:{}'
+
+
+class SiteFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов Yatube.'
+
+    def link(self, obj):
+        return reverse('posts:index')
+
+    def scope(self, obj):
+        return fragments.index_scope()
+
+    def posts(self, obj):
+        return Post.objects.select_related('author', 'group')
+
+    def items(self, obj):
+        return self.posts(obj)[:st.FEED_SIZE]
+
+    def item_title(self, post):
+        return Truncator(post.text).words(8)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', kwargs={'post_id': post.pk})
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_categories(self, post):
+        return [post.group.title] if post.group_id else []
+
+
+class GroupFeed(SiteFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description or f'Записи сообщества {group.title}.'
+
+    def link(self, group):
+        return reverse('posts:group_list', kwargs={'slug': group.slug})
+
+    def scope(self, group):
+        return fragments.group_scope(group.pk)
+
+    def posts(self, group):
+        return group.posts.select_related('author', 'group')
+
+
+class AuthorFeed(SiteFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Записи пользователя {author.username}.'
+
+    def link(self, author):
+        return reverse(
+            'posts:profile', kwargs={'username': author.username}
+        )
+
+    def scope(self, author):
+        return fragments.profile_scope(author.pk)
+
+    def posts(self, author):
+        return author.posts.select_related('author', 'group')
+
+
+def atom(feed_class):
+    """Вариант ленты в формате Atom."""
+    return type(f'Atom{feed_class.__name__}', (feed_class,), {
+        'feed_type': Atom1Feed,
+        'subtitle': feed_class.description,
+    })
+
+
+def cached_feed(feed_class):
+    """View ленты с кэшем XML по версии области и условным GET."""
+    feed = feed_class()
+    kind = 'atom' if feed.feed_type is Atom1Feed else 'rss'
+
+    @replicas.read_from_replica
+    def view(request, **kwargs):
+        obj = feed.get_object(request, **kwargs)
+        scope = feed.scope(obj)
+        version = fragments.get_version(scope)
+        etag = 'W/' + quote_etag(f'{kind}.{version}')
+        changed = fragments.changed_at(scope)
+        moments = [
+            newest(scope, lambda: feed.posts(obj).aggregate(
+                Max('pub_date'))['pub_date__max']),
+            changed,
+        ]
+        moments = [moment for moment in moments if moment is not None]
+        last_modified = (
+            timegm(max(moments).utctimetuple()) if moments else None
+        )
+        if replicas.may_be_stale(changed):
+            # Реплика могла ещё не получить изменение: не кэшируем.
+            return feed(request, **kwargs)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+        key = FEED_KEY.format(kind, scope, version)
+        cached = cache.get(key)
+        if cached is None:
+            response = feed(request, **kwargs)
+            cached = (response.content, response['Content-Type'])
+            cache.set(key, cached, st.FRAGMENT_CACHE_TIMEOUT)
+        response = HttpResponse(cached[0], content_type=cached[1])
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+    return view
+
+
+site_rss = cached_feed(SiteFeed)
+site_atom = cached_feed(atom(SiteFeed))
+group_rss = cached_feed(GroupFeed)
+group_atom = cached_feed(atom(GroupFeed))
+author_rss = cached_feed(AuthorFeed)
+author_atom = cached_feed(atom(AuthorFeed))
@@ -1,5 +1,6 @@
-from django.forms import ModelForm
+from django.forms import ModelForm, ValidationError
 
+from . import thumbnails
 from .models import Comment, Post
 
 
@@ -16,6 +17,28 @@ class PostForm(ModelForm):
             'group': 'Группа к которой относится запись'
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Картинку, отброшенную ImageUploadHandler, поле не разбирает:
+        # форма показывает причину отказа.
+        self.upload_error = None
+        upload = self.files.get('image')
+        if getattr(upload, 'upload_error', None):
+            self.files = self.files.copy()
+            self.files.pop('image')
+            self.upload_error = upload.upload_error
+
+    def clean_image(self):
+        if self.upload_error:
+            raise ValidationError(self.upload_error, code='invalid_image')
+        return self.cleaned_data['image']
+
+    def save(self, commit=True):
+        post = super().save(commit=commit)
+        if commit and 'image' in self.changed_data and post.image:
+            thumbnails.schedule(post.image.name)
+        return post
+
 
 class CommentForm(ModelForm):
     class Meta:
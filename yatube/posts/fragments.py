@@ -0,0 +1,133 @@
+"""Версионированный кэш фрагментов со списками постов.
+
+Ключ фрагмента состоит из области (лента, группа, профиль, подписки),
+номера версии области и параметров страницы. Сигналы ``Post`` увеличивают
+версию затронутых областей, поэтому фрагменты живут долго
+(``FRAGMENT_CACHE_TIMEOUT``), но устаревают сразу после изменения.
+"""
+import hashlib
+import time
+
+from django.conf import settings as st
+from django.core.cache import cache
+from django.utils import timezone
+
+from core import replicas
+
+VERSION_KEY = 'fragment_version:{}'
+CHANGED_KEY = 'fragment_changed:{}'
+
+
+def index_scope():
+    return 'index'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def profile_scope(user_id):
+    return f'profile:{user_id}'
+
+
+def follow_scope(user_id):
+    return f'follow:{user_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def relations_scope(user_id):
+    """Подписки и подписчики пользователя."""
+    return f'relations:{user_id}'
+
+
+def recommendations_scope(user_id):
+    """Рекомендации «Кого почитать» для пользователя."""
+    return f'recommendations:{user_id}'
+
+
+def _initial_version():
+    # Версия после вытеснения ключа из кэша не должна совпасть
+    # с одной из прежних, поэтому отсчёт идёт от текущего времени.
+    return int(time.time() * 1000)
+
+
+def get_versions(scopes):
+    """Версии нескольких областей одним обращением к кэшу."""
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    return [
+        found[key] if key in found else get_version(scope)
+        for key, scope in zip(keys, scopes)
+    ]
+
+
+def get_version(scope):
+    key = VERSION_KEY.format(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key, _initial_version())
+    return version
+
+
+def bump(*scopes):
+    """Делает устаревшими все фрагменты указанных областей."""
+    for scope in scopes:
+        key = VERSION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+    now = timezone.now()
+    cache.set_many(
+        {CHANGED_KEY.format(scope): now for scope in scopes}, None
+    )
+
+
+def changed_at(*scopes):
+    """Время последнего изменения областей, если кэш его помнит."""
+    moments = cache.get_many(
+        [CHANGED_KEY.format(scope) for scope in scopes]
+    ).values()
+    return max(moments, default=None)
+
+
+def post_changed(post, old_group_id=None):
+    """Сбрасывает области, в которых показывается пост."""
+    scopes = {
+        index_scope(),
+        profile_scope(post.author_id),
+        post_scope(post.pk),
+    }
+    for group_id in (post.group_id, old_group_id):
+        if group_id is not None:
+            scopes.add(group_scope(group_id))
+    # Ленты подписчиков не сбрасываются по одной: их ключ зависит
+    # от версии профиля автора (см. ``context``).
+    bump(*scopes)
+
+
+def context(scope, *related):
+    """Переменные шаблона для тега ``{% cache %}`` списка постов.
+
+    ``related`` — области, от которых список зависит помимо своей:
+    лента подписок зависит от профилей авторов, на которых подписан
+    пользователь, и новый пост сбрасывает одну версию профиля автора,
+    а не ленты всех его подписчиков.
+    """
+    timeout = st.FRAGMENT_CACHE_TIMEOUT
+    if replicas.may_be_stale(changed_at(scope, *related)):
+        # Нулевой таймаут: фрагмент рендерится, но не сохраняется.
+        timeout = 0
+    if related:
+        versions = ':'.join(map(str, get_versions([scope, *related])))
+        version = hashlib.md5(versions.encode()).hexdigest()
+    else:
+        version = get_version(scope)
+    return {
+        'fragment_key': f'{scope}:{version}',
+        'fragment_timeout': timeout,
+    }
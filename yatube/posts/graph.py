@@ -0,0 +1,97 @@
+"""Граф подписок в кэше.
+
+Для каждого пользователя в кэше лежат множества id авторов, на которых
+он подписан, и id его подписчиков. Проверка подписки — это одно
+обращение к кэшу вместо ``Follow.objects.filter(...).exists()``, а
+``is_following`` проверяет сразу всех авторов страницы.
+
+Ключ множества содержит версию области ``relations`` пользователя
+(``posts.fragments``). Сигналы ``Follow`` увеличивают её сразу и ещё
+раз после коммита: запрос, который прочитал подписки до коммита
+и сохранил их позже, пишет под старой версией, и его копию никто
+не прочитает. Множества не правятся на месте, а загружаются заново.
+Отсутствующее множество читается из основной базы: с отстающей
+реплики в кэш на ``FOLLOW_GRAPH_TIMEOUT`` попала бы устаревшая копия.
+"""
+from django.conf import settings as st
+from django.core.cache import cache
+from django.db import router, transaction
+
+from . import fragments
+from .models import Follow
+
+FOLLOWING_KEY = 'follow_graph:following:{}:{}'
+FOLLOWERS_KEY = 'follow_graph:followers:{}:{}'
+EDGES = {
+    FOLLOWING_KEY: ('user_id', 'author_id'),
+    FOLLOWERS_KEY: ('author_id', 'user_id'),
+}
+
+
+def _load(template, user_ids):
+    """Множества соседей ``user_ids``: из кэша, недостающие — из базы."""
+    # Версии читаются до базы: подписка после чтения их увеличит.
+    keys = {
+        template.format(user_id, fragments.get_version(
+            fragments.relations_scope(user_id)
+        )): user_id
+        for user_id in user_ids
+    }
+    cached = cache.get_many(keys)
+    result = {keys[key]: ids for key, ids in cached.items()}
+    missing = [user_id for user_id in user_ids if user_id not in result]
+    if missing:
+        field, neighbour = EDGES[template]
+        loaded = {user_id: set() for user_id in missing}
+        edges = Follow.objects.using(router.db_for_write(Follow)).filter(
+            **{f'{field}__in': missing}
+        ).values_list(field, neighbour)
+        for user_id, neighbour_id in edges:
+            if neighbour_id is not None:
+                loaded[user_id].add(neighbour_id)
+        loaded = {
+            user_id: frozenset(ids) for user_id, ids in loaded.items()
+        }
+        cache.set_many(
+            {key: loaded[user_id] for key, user_id in keys.items()
+             if user_id in loaded},
+            st.FOLLOW_GRAPH_TIMEOUT,
+        )
+        result.update(loaded)
+    return result
+
+
+def following(user_id):
+    """id авторов, на которых подписан пользователь."""
+    return _load(FOLLOWING_KEY, [user_id])[user_id]
+
+
+def followers(user_id):
+    """id подписчиков пользователя."""
+    return _load(FOLLOWERS_KEY, [user_id])[user_id]
+
+
+def is_following(user, authors):
+    """Подписан ли ``user`` на каждого из ``authors``: {id автора: bool}.
+
+    Авторы передаются объектами или id; для анонима всё ``False``
+    без обращения к кэшу.
+    """
+    author_ids = [getattr(author, 'pk', author) for author in authors]
+    if not user.is_authenticated:
+        return dict.fromkeys(author_ids, False)
+    followed = following(user.pk)
+    return {author_id: author_id in followed for author_id in author_ids}
+
+
+def changed(user_id, author_id):
+    """Подписка изменилась: оба множества устаревают после коммита.
+
+    Сразу версии увеличивает сам сигнал ``Follow``.
+    """
+    transaction.on_commit(lambda: forget(user_id, author_id))
+
+
+def forget(*user_ids):
+    """Сбрасывает множества после изменений в обход сигналов."""
+    fragments.bump(*(fragments.relations_scope(pk) for pk in user_ids))
@@ -0,0 +1,594 @@
+"""Массовый импорт групп, постов, комментариев и подписок из NDJSON.
+
+Каждая строка входа — JSON-объект с полем ``type``::
+
+    {"type": "group", "slug": "cats", "title": "Кошки", "description": ""}
+    {"type": "post", "id": "p1", "author": "leo", "group": "cats",
+     "text": "...", "created": "2021-05-01T10:00:00+03:00"}
+    {"type": "comment", "post": "p1", "author": "krio", "text": "..."}
+    {"type": "follow", "user": "krio", "author": "leo"}
+
+``id`` поста — его id в исходной системе, по нему на пост ссылаются
+комментарии. Выгрузка ``posts.export`` тоже подходит, если указать
+автора по умолчанию.
+
+Строки читаются пачками и разбираются (при ``workers > 1`` — в
+отдельных процессах). Авторы и группы ищутся по username и slug
+через словари в памяти, недостающие пользователи создаются без
+пароля. Пачка пишется ``bulk_create`` в одной транзакции, а id постов
+и комментариев назначаются заранее: так комментарии ссылаются на
+посты той же пачки, а после сбоя по контрольной точке видно,
+записалась ли последняя пачка. Сигналы при ``bulk_create`` не
+срабатывают, поэтому счётчики, ленты и кэш страниц обновляются
+один раз в конце (``finalize``).
+"""
+import json
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.core.validators import validate_slug
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Case, Max, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters, fragments, graph, timeline
+from .models import Comment, Follow, Group, Post, User
+
+Batch = namedtuple('Batch', 'first_line lines end_offset')
+
+STATS = ('lines', 'groups', 'users', 'posts', 'comments', 'follows', 'errors')
+# Сколько раз повторять пачку, если назначенные id успел занять
+# другой писатель.
+RETRIES = 3
+# Сколько дат записывать одним UPDATE: по три параметра на запись
+# укладываются в лимит переменных старых версий SQLite.
+DATES_BATCH = 300
+
+
+class RecordError(ValueError):
+    pass
+
+
+def _text(record, name, max_length=None, required=True):
+    value = record.get(name)
+    if value is None or value == '':
+        if required:
+            raise RecordError(f'нет поля {name}')
+        return ''
+    if not isinstance(value, str):
+        raise RecordError(f'{name} должно быть строкой')
+    if max_length is not None and len(value) > max_length:
+        raise RecordError(f'{name} длиннее {max_length} символов')
+    return value
+
+
+def _username(record, name, default=None):
+    value = record.get(name) or default
+    if not value:
+        raise RecordError(f'нет поля {name}')
+    try:
+        UnicodeUsernameValidator()(value)
+    except (ValidationError, TypeError):
+        raise RecordError(f'некорректное имя пользователя в {name}')
+    if len(value) > 150:
+        raise RecordError(f'{name} длиннее 150 символов')
+    return value
+
+
+def _moment(record, *names):
+    for name in names:
+        value = record.get(name)
+        if not value:
+            continue
+        moment = parse_datetime(value) if isinstance(value, str) else None
+        if moment is None:
+            raise RecordError(f'{name} — не дата ISO 8601')
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+    return None
+
+
+def _external_id(record, name, required):
+    value = record.get(name)
+    if value is None:
+        if required:
+            raise RecordError(f'нет поля {name}')
+        return None
+    if not isinstance(value, (str, int)) or isinstance(value, bool):
+        raise RecordError(f'{name} должно быть строкой или числом')
+    return str(value)
+
+
+def parse_record(line, default_author=None):
+    """Проверяет строку входа; возвращает (тип, данные)."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        raise RecordError('некорректный JSON')
+    if not isinstance(record, dict):
+        raise RecordError('ожидается JSON-объект')
+    kind = record.get('type')
+    if kind == 'group':
+        slug = _text(record, 'slug', 200)
+        try:
+            validate_slug(slug)
+        except ValidationError:
+            raise RecordError('некорректный slug')
+        return kind, {
+            'slug': slug,
+            'title': _text(record, 'title', 200),
+            'description': _text(record, 'description', required=False),
+        }
+    if kind == 'post':
+        group = record.get('group') or None
+        if group is not None and not isinstance(group, str):
+            raise RecordError('group должно быть строкой')
+        return kind, {
+            'id': _external_id(record, 'id', required=False),
+            'author': _username(record, 'author', default_author),
+            'group': group,
+            'text': _text(record, 'text'),
+            'created': _moment(record, 'created', 'pub_date'),
+        }
+    if kind == 'comment':
+        return kind, {
+            'post': _external_id(record, 'post', required=True),
+            'author': _username(record, 'author', default_author),
+            'text': _text(record, 'text', 2000),
+            'created': _moment(record, 'created'),
+        }
+    if kind == 'follow':
+        data = {
+            'user': _username(record, 'user'),
+            'author': _username(record, 'author', default_author),
+        }
+        if data['user'] == data['author']:
+            raise RecordError('подписка на самого себя')
+        return kind, data
+    raise RecordError(f'неизвестный type: {kind!r}')
+
+
+def parse_lines(first_line, lines, default_author=None):
+    """Разбирает пачку строк; возвращает записи и ошибки с номерами строк.
+
+    Выполняется и в процессах-обработчиках, поэтому не обращается к базе.
+    """
+    records = []
+    errors = []
+    for number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        try:
+            kind, data = parse_record(line, default_author)
+        except RecordError as error:
+            errors.append((number, str(error)))
+        else:
+            records.append((number, kind, data))
+    return records, errors
+
+
+def read_batches(file, batch_size, offset=0, first_line=1):
+    """Пачки строк бинарного файла, начиная с байта ``offset``."""
+    if offset:
+        file.seek(offset)
+    lines = []
+    for line in file:
+        lines.append(line)
+        offset += len(line)
+        if len(lines) >= batch_size:
+            yield Batch(first_line, lines, offset)
+            first_line += len(lines)
+            lines = []
+    if lines:
+        yield Batch(first_line, lines, offset)
+
+
+def parse_batches(batches, workers, default_author=None):
+    """Пары (пачка, результат разбора) в исходном порядке.
+
+    Разбор идёт в ``workers`` процессах, но вперёд берётся не больше
+    ``2 × workers`` пачек, поэтому память не зависит от размера входа.
+    """
+    if workers <= 1:
+        for batch in batches:
+            yield batch, parse_lines(
+                batch.first_line, batch.lines, default_author
+            )
+        return
+    # Дочерние процессы не должны наследовать открытые соединения.
+    connections.close_all()
+    with ProcessPoolExecutor(workers) as pool:
+        window = deque()
+        for batch in batches:
+            window.append((batch, pool.submit(
+                parse_lines, batch.first_line, batch.lines, default_author
+            )))
+            if len(window) >= workers * 2:
+                batch, future = window.popleft()
+                yield batch, future.result()
+        while window:
+            batch, future = window.popleft()
+            yield batch, future.result()
+
+
+def set_dates(model, field_name, dates):
+    """Записывает даты ``{id: дата}`` в поле с ``auto_now_add``.
+
+    ``bulk_create`` заполняет такое поле текущим временем, поэтому даты
+    дописываются после вставки: UPDATE с CASE по id на каждые
+    ``DATES_BATCH`` записей. Само поле модели не меняется, и записи
+    из других потоков получают текущее время, как обычно.
+    """
+    field = model._meta.get_field(field_name)
+    items = list(dates.items())
+    for start in range(0, len(items), DATES_BATCH):
+        chunk = items[start:start + DATES_BATCH]
+        model.objects.filter(pk__in=[pk for pk, _ in chunk]).update(**{
+            field_name: Case(
+                *(When(pk=pk, then=Value(date, output_field=field))
+                  for pk, date in chunk),
+                output_field=field,
+            ),
+        })
+
+
+def last_pks():
+    """Наибольшие id постов, комментариев и подписок перед импортом."""
+    return {
+        model.__name__.lower(): model.objects.aggregate(
+            last=Max('pk')
+        )['last'] or 0
+        for model in (Post, Comment, Follow)
+    }
+
+
+class Checkpoint:
+    """Контрольная точка импорта в файле ``path``.
+
+    Хранит смещение в файле входа, статистику и границы импорта,
+    а в ``path.posts`` — соответствие id постов исходной системы
+    и новых id. Перед фиксацией пачки в точку записывается её
+    «незавершённое» состояние; при возобновлении по id первого поста
+    или комментария пачки видно, попала ли она в базу.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.posts_path = f'{path}.posts'
+        self.state = None
+
+    def load(self):
+        """Состояние и соответствие id постов; None, если точки нет."""
+        if not os.path.exists(self.path):
+            return None, {}
+        with open(self.path, encoding='utf-8') as file:
+            self.state = json.load(file)
+        pending = self.state.pop('pending', None)
+        if pending is not None:
+            if self._committed(pending):
+                self.state.update(pending['next'])
+            else:
+                with open(self.posts_path, 'a', encoding='utf-8') as file:
+                    file.truncate(pending['posts_size'])
+            self.save()
+        posts = {}
+        if os.path.exists(self.posts_path):
+            with open(self.posts_path, encoding='utf-8') as file:
+                for line in file:
+                    external_id, pk = line.rstrip('\n').rsplit('\t', 1)
+                    posts[external_id] = int(pk)
+        return self.state, posts
+
+    @staticmethod
+    def _committed(pending):
+        if pending['post'] is not None:
+            return Post.objects.filter(pk=pending['post']).exists()
+        if pending['comment'] is not None:
+            return Comment.objects.filter(pk=pending['comment']).exists()
+        # Группы, пользователи и подписки при повторе не дублируются.
+        return False
+
+    def start(self, start):
+        self.state = {'offset': 0, 'line': 1, 'stats': {}, 'start': start}
+        with open(self.posts_path, 'w', encoding='utf-8'):
+            pass
+        self.save()
+
+    def begin(self, next_state, new_posts, first_pks):
+        """Записывает соответствия пачки до фиксации транзакции."""
+        size = os.path.getsize(self.posts_path)
+        with open(self.posts_path, 'a', encoding='utf-8') as file:
+            for external_id, pk in new_posts.items():
+                file.write(f'{external_id}\t{pk}\n')
+        self.save(pending={
+            'next': next_state, 'posts_size': size, **first_pks
+        })
+        return size
+
+    def rollback(self, size):
+        with open(self.posts_path, 'a', encoding='utf-8') as file:
+            file.truncate(size)
+        self.save()
+
+    def commit(self, next_state):
+        self.state.update(next_state)
+        self.save()
+
+    def save(self, **extra):
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({**self.state, **extra}, file)
+        os.replace(temporary, self.path)
+
+
+class Importer:
+    def __init__(self, checkpoint=None, default_author=None):
+        self.checkpoint = checkpoint
+        self.default_author = default_author
+        self.users = {}
+        self.groups = {}
+        self.posts = {}
+        self.stats = dict.fromkeys(STATS, 0)
+        self.offset = 0
+        self.line = 1
+        self.start = None
+
+    def resume(self):
+        """Продолжает импорт с контрольной точки, если она есть."""
+        state = None
+        if self.checkpoint is not None:
+            state, self.posts = self.checkpoint.load()
+        if state is None:
+            self.start = last_pks()
+            if self.checkpoint is not None:
+                self.checkpoint.start(self.start)
+            return
+        self.offset = state['offset']
+        self.line = state['line']
+        self.stats.update(state['stats'])
+        self.start = state['start']
+
+    def run(self, file, batch_size, workers=1, on_batch=None,
+            on_error=None):
+        """Импортирует файл, открытый в бинарном режиме."""
+        self.resume()
+        batches = read_batches(file, batch_size, self.offset, self.line)
+        parsed = parse_batches(batches, workers, self.default_author)
+        for batch, (records, errors) in parsed:
+            errors = self.write(batch, records, errors)
+            if on_error is not None:
+                for number, message in sorted(errors):
+                    on_error(number, message)
+            if on_batch is not None:
+                on_batch(self.stats)
+        self.finalize()
+        return self.stats
+
+    def write(self, batch, records, errors):
+        """Пишет записи пачки одной транзакцией; возвращает все ошибки."""
+        for attempt in range(RETRIES):
+            stats = dict(self.stats)
+            size = None
+            try:
+                with transaction.atomic():
+                    write_errors, new_posts, first_pks = self.create(
+                        records, stats
+                    )
+                    stats['lines'] += len(batch.lines)
+                    stats['errors'] += len(errors) + len(write_errors)
+                    next_state = {
+                        'offset': batch.end_offset,
+                        'line': batch.first_line + len(batch.lines),
+                        'stats': stats,
+                    }
+                    if self.checkpoint is not None:
+                        size = self.checkpoint.begin(
+                            next_state, new_posts, first_pks
+                        )
+            except IntegrityError:
+                # Id заняты другим писателем. Словари могли запомнить
+                # отменённых пользователей и группы: они загрузятся снова.
+                if size is not None:
+                    self.checkpoint.rollback(size)
+                self.users.clear()
+                self.groups.clear()
+                if attempt == RETRIES - 1:
+                    raise
+            else:
+                break
+        self.reset_sequences()
+        self.posts.update(new_posts)
+        self.stats = stats
+        if self.checkpoint is not None:
+            self.checkpoint.commit(next_state)
+        return errors + write_errors
+
+    def create(self, records, stats):
+        by_kind = {kind: [] for kind in ('group', 'post', 'comment', 'follow')}
+        for number, kind, data in records:
+            by_kind[kind].append((number, data))
+        errors = []
+        stats['groups'] += self.create_groups(
+            [data for _, data in by_kind['group']]
+        )
+        usernames = {
+            data[name]
+            for kind in ('post', 'comment', 'follow')
+            for _, data in by_kind[kind]
+            for name in ('author', 'user') if name in data
+        }
+        stats['users'] += self.resolve_users(usernames)
+        self.resolve_groups({
+            data['group'] for _, data in by_kind['post'] if data['group']
+        })
+        posts = []
+        new_posts = {}
+        # Даты из входа: bulk_create заменит их текущим временем.
+        dates = {}
+        next_pk = self.next_pk(Post)
+        for number, data in by_kind['post']:
+            group_id = None
+            if data['group'] is not None:
+                group_id = self.groups.get(data['group'])
+                if group_id is None:
+                    errors.append((number, f'нет группы {data["group"]}'))
+                    continue
+            if data['id'] is not None:
+                if data['id'] in self.posts or data['id'] in new_posts:
+                    errors.append((number, f'повторный id {data["id"]}'))
+                    continue
+                new_posts[data['id']] = next_pk
+            posts.append(Post(
+                pk=next_pk,
+                author_id=self.users[data['author']],
+                group_id=group_id,
+                text=data['text'],
+            ))
+            if data['created'] is not None:
+                dates[next_pk] = data['created']
+            next_pk += 1
+        Post.objects.bulk_create(posts)
+        set_dates(Post, 'pub_date', dates)
+
+        comments = []
+        dates = {}
+        next_pk = self.next_pk(Comment)
+        for number, data in by_kind['comment']:
+            post_id = new_posts.get(data['post'], self.posts.get(data['post']))
+            if post_id is None:
+                errors.append((number, f'нет поста {data["post"]}'))
+                continue
+            comments.append(Comment(
+                pk=next_pk,
+                post_id=post_id,
+                author_id=self.users[data['author']],
+                text=data['text'],
+            ))
+            if data['created'] is not None:
+                dates[next_pk] = data['created']
+            next_pk += 1
+        Comment.objects.bulk_create(comments)
+        set_dates(Comment, 'created', dates)
+
+        Follow.objects.bulk_create(
+            (
+                Follow(
+                    user_id=self.users[data['user']],
+                    author_id=self.users[data['author']],
+                )
+                for _, data in by_kind['follow']
+            ),
+            ignore_conflicts=True,
+        )
+        stats['posts'] += len(posts)
+        stats['comments'] += len(comments)
+        stats['follows'] += len(by_kind['follow'])
+        first_pks = {
+            'post': posts[0].pk if posts else None,
+            'comment': comments[0].pk if comments else None,
+        }
+        return errors, new_posts, first_pks
+
+    @staticmethod
+    def next_pk(model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def create_groups(self, groups):
+        """Создаёт новые группы; существующие slug пропускаются."""
+        unique = {}
+        for data in groups:
+            if data['slug'] not in self.groups:
+                unique.setdefault(data['slug'], data)
+        self.resolve_groups(set(unique))
+        new = [
+            Group(**data) for slug, data in unique.items()
+            if slug not in self.groups
+        ]
+        Group.objects.bulk_create(new)
+        self.resolve_groups({group.slug for group in new})
+        return len(new)
+
+    def resolve_groups(self, slugs):
+        missing = slugs - self.groups.keys()
+        if missing:
+            self.groups.update(
+                Group.objects.filter(slug__in=missing).values_list(
+                    'slug', 'pk'
+                )
+            )
+
+    def resolve_users(self, usernames):
+        """Находит id пользователей, недостающих создаёт без пароля."""
+        missing = usernames - self.users.keys()
+        if not missing:
+            return 0
+        self.users.update(
+            User.objects.filter(username__in=missing).values_list(
+                'username', 'pk'
+            )
+        )
+        missing -= self.users.keys()
+        if not missing:
+            return 0
+        password = make_password(None)
+        User.objects.bulk_create(
+            User(username=username, password=password)
+            for username in missing
+        )
+        self.users.update(
+            User.objects.filter(username__in=missing).values_list(
+                'username', 'pk'
+            )
+        )
+        return len(missing)
+
+    @staticmethod
+    def reset_sequences():
+        """После явных id последовательности (PostgreSQL) нужно сдвинуть."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [Post, Comment]
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+    def finalize(self):
+        """Счётчики, ленты подписок и версии фрагментов после импорта."""
+        counters.reconcile_all()
+        imported = Post.objects.filter(pk__gt=self.start['post'])
+        author_ids = set(imported.order_by().values_list(
+            'author_id', flat=True
+        ).distinct())
+        group_ids = set(imported.order_by().exclude(
+            group=None
+        ).values_list('group_id', flat=True).distinct())
+        new_follows = Follow.objects.filter(pk__gt=self.start['follow'])
+        follower_ids = set(new_follows.values_list('user_id', flat=True))
+        follower_ids.update(Follow.objects.filter(
+            author_id__in=author_ids
+        ).values_list('user_id', flat=True))
+        followed_ids = set(new_follows.values_list('author_id', flat=True))
+        for user_id in follower_ids:
+            timeline.rebuild(user_id)
+        graph.forget(*(follower_ids | followed_ids))
+        # Новым постам сбрасывать нечего, только старым с комментариями.
+        commented_ids = Comment.objects.filter(
+            pk__gt=self.start['comment'], post_id__lte=self.start['post']
+        ).order_by().values_list('post_id', flat=True).distinct()
+        fragments.bump(
+            fragments.index_scope(),
+            *(fragments.group_scope(pk) for pk in group_ids),
+            *(fragments.profile_scope(pk) for pk in author_ids),
+            *(fragments.relations_scope(pk)
+              for pk in follower_ids | followed_ids),
+            *(fragments.follow_scope(pk) for pk in follower_ids),
+            *(fragments.post_scope(pk) for pk in commented_ids),
+        )
@@ -0,0 +1,34 @@
+from django.conf import settings as st
+from django.core.management.base import BaseCommand
+
+from posts import blobs
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки, на которые не ссылается ни один пост.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=st.BLOB_GC_GRACE,
+            help='Не трогать файлы, изменённые за столько секунд.'
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='Сначала пересчитать ссылки по постам.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.'
+        )
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            updated = blobs.recount()
+            self.stdout.write(f'Пересчитано ссылок: {updated}')
+        removed = blobs.collect(options['grace'], options['dry_run'])
+        for name in removed:
+            self.stdout.write(name)
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(
+            self.style.SUCCESS(f'{verb} файлов: {len(removed)}')
+        )
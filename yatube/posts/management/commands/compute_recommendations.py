@@ -0,0 +1,26 @@
+from django.conf import settings as st
+from django.core.management.base import BaseCommand
+
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации «Кого почитать» для всех.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k', type=int, default=st.RECOMMENDATIONS_TOP_K,
+            help='Сколько авторов хранить для пользователя.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Пользователей в одной транзакции записи.'
+        )
+
+    def handle(self, *args, **options):
+        written = recommendations.compute(
+            options['top_k'], options['batch_size']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Сохранено рекомендаций: {written}')
+        )
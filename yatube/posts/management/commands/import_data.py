@@ -0,0 +1,82 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import STATS, Checkpoint, Importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует группы, посты, комментарии и подписки из NDJSON '
+        '(формат описан в posts/importer.py).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл NDJSON или - для stdin.')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Процессов для разбора и проверки строк.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки: при повторном запуске импорт '
+                 'продолжится с места остановки.'
+        )
+        parser.add_argument(
+            '--author',
+            help='Автор записей без поля author (например, из выгрузки '
+                 'export_posts).'
+        )
+        parser.add_argument(
+            '--max-errors', type=int, default=20,
+            help='Сколько ошибок строк выводить.'
+        )
+
+    def handle(self, *args, **options):
+        if options['path'] == '-' and options['checkpoint']:
+            raise CommandError('Из stdin нельзя продолжить импорт.')
+        checkpoint = None
+        if options['checkpoint']:
+            checkpoint = Checkpoint(options['checkpoint'])
+        importer = Importer(checkpoint, default_author=options['author'])
+        self.started = time.monotonic()
+        self.shown_errors = 0
+        self.max_errors = options['max_errors']
+        if options['path'] == '-':
+            stats = self.run(importer, sys.stdin.buffer, options)
+        else:
+            try:
+                file = open(options['path'], 'rb')
+            except OSError as error:
+                raise CommandError(error)
+            with file:
+                stats = self.run(importer, file, options)
+        self.stdout.write(self.style.SUCCESS(
+            'Импорт завершён: ' + self.format_stats(stats)
+        ))
+
+    def run(self, importer, file, options):
+        return importer.run(
+            file, options['batch_size'], options['workers'],
+            on_batch=self.progress, on_error=self.error,
+        )
+
+    def format_stats(self, stats):
+        return ', '.join(f'{name} {stats[name]}' for name in STATS)
+
+    def progress(self, stats):
+        elapsed = time.monotonic() - self.started
+        rate = stats['lines'] / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{self.format_stats(stats)} ({rate:.0f} строк/с)'
+        )
+
+    def error(self, number, message):
+        self.shown_errors += 1
+        if self.shown_errors <= self.max_errors:
+            self.stderr.write(f'Строка {number}: {message}')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.models import Follow, Timeline, User
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает материализованные ленты подписок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Пользователи, чьи ленты нужно пересобрать (по умолчанию все).'
+        )
+
+    def handle(self, *args, **options):
+        if options['usernames']:
+            user_ids = set(User.objects.filter(
+                username__in=options['usernames']
+            ).values_list('id', flat=True))
+        else:
+            user_ids = set(Follow.objects.filter(
+                user__isnull=False
+            ).values_list('user_id', flat=True))
+            user_ids |= set(Timeline.objects.values_list(
+                'user_id', flat=True
+            ).distinct())
+        for user_id in user_ids:
+            timeline.rebuild(user_id)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересобрано лент: {len(user_ids)}')
+        )
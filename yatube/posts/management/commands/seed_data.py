@@ -0,0 +1,167 @@
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts import counters, search, timeline
+from posts.importer import set_dates
+from posts.models import Comment, Follow, Group, Post, User
+
+
+def zipf_weights(count, exponent):
+    """Веса степенного распределения: k-й по популярности ~ 1 / k^s."""
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+class Command(BaseCommand):
+    help = 'Генерирует синтетические данные для нагрузочных замеров.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--follows', type=int, default=3000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель степенного распределения активности авторов.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить даты публикаций.'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Размер пачки bulk_create (по умолчанию выбирает Django).'
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            groups = self.create_groups(options['groups'])
+            weights = zipf_weights(len(users), options['skew'])
+            posts = self.create_posts(
+                options['posts'], users, groups, weights, options['days']
+            )
+            self.create_comments(options['comments'], users, posts)
+            self.create_follows(options['follows'], users, weights)
+        counters.reconcile_all()
+        follower_ids = Follow.objects.values_list(
+            'user_id', flat=True
+        ).distinct()
+        for user_id in follower_ids:
+            timeline.rebuild(user_id)
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, групп {len(groups)}, '
+            f'постов {len(posts)}, комментариев {options["comments"]}, '
+            f'подписок {Follow.objects.count()}'
+        ))
+
+    def create_users(self, count):
+        # Хэш пароля дорогой, поэтому он общий для всех пользователей.
+        password = make_password('seed-password')
+        start = User.objects.filter(
+            username__startswith='seed_user_'
+        ).count()
+        usernames = [f'seed_user_{start + i}' for i in range(count)]
+        User.objects.bulk_create(
+            (
+                User(
+                    username=username,
+                    first_name='Пользователь',
+                    last_name=username.rsplit('_', 1)[1],
+                    password=password,
+                )
+                for username in usernames
+            ),
+            batch_size=self.batch_size,
+        )
+        return list(
+            User.objects.filter(username__in=usernames).order_by('pk')
+        )
+
+    def create_groups(self, count):
+        start = Group.objects.count()
+        Group.objects.bulk_create(
+            (
+                Group(
+                    title=f'Группа {start + i}',
+                    slug=f'seed-group-{start + i}',
+                    description='Сгенерированная группа',
+                )
+                for i in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        return list(Group.objects.order_by('-pk')[:count])
+
+    def create_posts(self, count, users, groups, weights, days):
+        now = timezone.now()
+        authors = self.random.choices(users, weights=weights, k=count)
+        group_weights = zipf_weights(len(groups), 1)
+        posts = []
+        dates = []
+        for author in authors:
+            group = None
+            if groups and self.random.random() < 0.7:
+                group = self.random.choices(groups, weights=group_weights)[0]
+            posts.append(Post(
+                author=author,
+                group=group,
+                text=f'Синтетический пост {self.random.getrandbits(32)}',
+            ))
+            dates.append(now - timezone.timedelta(
+                seconds=self.random.randrange(days * 24 * 3600)
+            ))
+        Post.objects.bulk_create(posts, batch_size=self.batch_size)
+        post_ids = list(Post.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        )[:count])
+        # Посты вставлены по порядку, новейший id у последнего.
+        set_dates(Post, 'pub_date', dict(zip(reversed(post_ids), dates)))
+        return post_ids
+
+    def create_comments(self, count, users, post_ids):
+        if not post_ids:
+            return
+        # Комментарии, как и посты, распределены по степенному закону.
+        weights = zipf_weights(len(post_ids), 0.8)
+        targets = self.random.choices(post_ids, weights=weights, k=count)
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    post_id=post_id,
+                    author=self.random.choice(users),
+                    text='Синтетический комментарий',
+                )
+                for post_id in targets
+            ),
+            batch_size=self.batch_size,
+        )
+
+    def create_follows(self, count, users, weights):
+        # Популярные авторы набирают подписчиков по степенному закону.
+        cum_weights = list(itertools.accumulate(weights))
+        pairs = set()
+        attempts = 0
+        while len(pairs) < count and attempts < count * 10:
+            attempts += 1
+            user = self.random.choice(users)
+            author = self.random.choices(users, cum_weights=cum_weights)[0]
+            if user.pk != author.pk:
+                pairs.add((user.pk, author.pk))
+        Follow.objects.bulk_create(
+            (
+                Follow(user_id=user_id, author_id=author_id)
+                for user_id, author_id in pairs
+            ),
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
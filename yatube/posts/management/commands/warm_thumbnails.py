@@ -0,0 +1,41 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры для всех картинок постов в несколько процессов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество процессов.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=50,
+            help='Сколько файлов отдавать процессу за раз.'
+        )
+
+    def handle(self, *args, **options):
+        names = list(
+            Post.objects.exclude(image='').order_by()
+            .values_list('image', flat=True).distinct()
+        )
+        # Дочерние процессы не должны наследовать открытые соединения.
+        connections.close_all()
+        if options['workers'] > 1:
+            with ProcessPoolExecutor(options['workers']) as pool:
+                results = list(pool.map(
+                    thumbnails.generate, names,
+                    chunksize=options['chunk_size'],
+                ))
+        else:
+            results = [thumbnails.generate(name) for name in names]
+        failed = results.count(False)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {len(names)}, с ошибками: {failed}'
+        ))
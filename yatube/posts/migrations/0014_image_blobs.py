@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-17 18:22
+
+import core.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_refs(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    ImageBlob = apps.get_model('posts', 'ImageBlob')
+    images = (
+        Post.objects.exclude(image='').order_by()
+        .values('image').annotate(refs=Count('pk'))
+    )
+    ImageBlob.objects.bulk_create(
+        ImageBlob(name=row['image'], refs=row['refs']) for row in images
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Имя файла')),
+                ('refs', models.PositiveIntegerField(default=0, verbose_name='Ссылок')),
+            ],
+        ),
+        # Хранилище не меняет столбец, а пересоздание таблицы в SQLite
+        # удалило бы триггеры полнотекстового индекса из 0013.
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='post',
+                name='image',
+                field=models.ImageField(blank=True, storage=core.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Картинка'),
+            ),
+        ]),
+        migrations.RunPython(count_refs, migrations.RunPython.noop),
+    ]
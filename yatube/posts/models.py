@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from core.storage import blob_storage
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -17,6 +19,10 @@ class Group(models.Model):
         null=True, blank=True,
         help_text='Краткое описание группы'
     )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Постов в группе',
+        default=0, editable=False,
+    )
 
     def __str__(self):
         return self.title
@@ -41,16 +47,52 @@ class Post(models.Model):
     image = models.ImageField(
         verbose_name='Картинка',
         upload_to='posts/',
+        storage=blob_storage,
         blank=True,
     )
     pub_date = models.DateTimeField(auto_now_add=True)
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Комментариев',
+        default=0, editable=False,
+    )
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['-pub_date'], name='post_pub_date'),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='post_author_pub_date'),
+            models.Index(
+                fields=['group', '-pub_date'],
+                name='post_group_pub_date'),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Группа на момент загрузки нужна счётчикам при смене группы.
+        instance._loaded_group_id = instance.__dict__.get('group_id')
+        if 'image' in instance.__dict__:
+            # А картинка — счётчикам ссылок при её замене.
+            instance._loaded_image = instance.__dict__['image']
+        return instance
+
+
+class ImageBlob(models.Model):
+    """Файл картинки в хранилище по содержимому и число постов с ним."""
+    name = models.CharField(
+        verbose_name='Имя файла',
+        max_length=100, primary_key=True,
+    )
+    refs = models.PositiveIntegerField(verbose_name='Ссылок', default=0)
+
+    def __str__(self):
+        return self.name
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -74,6 +116,14 @@ class Comment(models.Model):
     )
     created = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created'),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -92,8 +142,108 @@ class Follow(models.Model):
     )
 
     class Meta:
+        # Индекс уникальности обслуживает поиск по (user, author),
+        # а (author, user) покрывает выборку подписчиков автора.
+        indexes = [
+            models.Index(
+                fields=['author', 'user'],
+                name='follow_author_user'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'author'],
                 name='unique_follow')
         ]
+
+
+class Timeline(models.Model):
+    """Материализованная лента подписок: запись на каждый пост
+    автора, на которого подписан пользователь.
+    """
+    user = models.ForeignKey(
+        User,
+        verbose_name='Владелец ленты',
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date'],
+                name='timeline_user_pub_date'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry')
+        ]
+
+
+class Recommendation(models.Model):
+    """Автор, которого стоит предложить пользователю; считается заранее
+    командой ``compute_recommendations``.
+    """
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Рекомендуемый автор',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    score = models.FloatField(verbose_name='Оценка')
+    mutual_follows = models.PositiveIntegerField(
+        verbose_name='Общих подписок', default=0
+    )
+    shared_groups = models.PositiveIntegerField(
+        verbose_name='Общих групп', default=0
+    )
+
+    class Meta:
+        ordering = ['-score']
+        indexes = [
+            models.Index(
+                fields=['user', '-score'],
+                name='recommendation_user_score'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_recommendation')
+        ]
+
+
+class UserCounters(models.Model):
+    """Денормализованные счётчики пользователя."""
+    user = models.OneToOneField(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='counters',
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Постов', default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Подписчиков', default=0
+    )
+    following_count = models.PositiveIntegerField(
+        verbose_name='Подписок', default=0
+    )
+
+    def __str__(self):
+        return f'Счётчики {self.user}'
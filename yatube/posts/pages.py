@@ -0,0 +1,146 @@
+"""Части страниц со списками постов, общие для ``views`` и ``async_views``.
+
+Обе версии страниц собирают ответ из этих функций и отличаются только
+порядком вызова: синхронные views вызывают их по очереди, асинхронные
+выполняют независимые шаги параллельно в пуле потоков. Поэтому правка
+страницы делается здесь, в одном месте, а не в двух копиях view.
+"""
+from django.conf import settings as st
+from django.db.models import Max, OuterRef, Subquery
+from django.shortcuts import get_object_or_404
+
+from . import fragments, graph, recommendations
+from .conditional import Validators, newest
+from .forms import CommentForm
+from .models import Comment, Post
+
+INDEX_TEMPLATE = 'posts/index.html'
+GROUP_TEMPLATE = 'posts/group_list.html'
+PROFILE_TEMPLATE = 'posts/profile.html'
+POST_TEMPLATE = 'posts/post_detail.html'
+FOLLOW_TEMPLATE = 'posts/follow.html'
+
+
+def with_relations(post_list):
+    """Посты вместе с авторами и группами, которые выводит шаблон."""
+    return post_list.select_related('author', 'group')
+
+
+def group_validators(request, group):
+    scope = fragments.group_scope(group.pk)
+    return Validators(request, [scope], newest(
+        scope, lambda: group.posts.aggregate(Max('pub_date'))['pub_date__max']
+    ))
+
+
+def profile_validators(request, author):
+    """Версии профиля; на собственном профиле и версия рекомендаций."""
+    scope = fragments.profile_scope(author.pk)
+    scopes = [scope, fragments.relations_scope(author.pk)]
+    if request.user == author:
+        scopes.append(fragments.recommendations_scope(author.pk))
+    return Validators(
+        request,
+        scopes,
+        newest(scope, lambda: author.posts.aggregate(
+            Max('pub_date'))['pub_date__max']),
+    )
+
+
+def following(user, author):
+    """Подписан ли ``user`` на автора; для гостя ``None``."""
+    if not user.is_authenticated:
+        return None
+    if user == author:
+        return False
+    return graph.is_following(user, [author])[author.pk]
+
+
+def profile_recommendations(user, author):
+    # Рекомендации видны только на собственном профиле.
+    if user != author:
+        return []
+    return recommendations.for_user(user)[:st.RECOMMENDATIONS_WIDGET_SIZE]
+
+
+def get_post(post_id):
+    """Пост с автором, группой и временем последнего комментария."""
+    last_comment = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by('-created').values('created')[:1]
+    return get_object_or_404(
+        with_relations(Post.objects.all()).annotate(
+            last_comment=Subquery(last_comment)
+        ),
+        id=post_id
+    )
+
+
+def post_validators(request, post):
+    return Validators(
+        request,
+        [
+            fragments.post_scope(post.pk),
+            fragments.profile_scope(post.author_id),
+        ],
+        max(filter(None, (post.pub_date, post.last_comment))),
+    )
+
+
+def post_comments(post):
+    return post.comments.select_related('author')
+
+
+def follow_fragment(user):
+    """Фрагмент ленты подписок с версиями профилей её авторов."""
+    return fragments.context(
+        fragments.follow_scope(user.pk),
+        *(fragments.profile_scope(pk)
+          for pk in sorted(graph.following(user.pk))),
+    )
+
+
+def index_context(post_list, page_obj, fragment):
+    return {
+        'posts': post_list,
+        'page_obj': page_obj,
+        **fragment,
+    }
+
+
+def group_context(group, page_obj, fragment):
+    return {
+        'group': group,
+        'page_obj': page_obj,
+        **fragment,
+    }
+
+
+def profile_context(author, author_counters, page_obj, following,
+                    suggestions, fragment):
+    return {
+        'author': author,
+        'post_count': author_counters.posts_count,
+        'counters': author_counters,
+        'page_obj': page_obj,
+        'following': following,
+        'recommendations': suggestions,
+        **fragment,
+    }
+
+
+def post_context(post, author_counters, comments):
+    return {
+        'form': CommentForm(),
+        'post': post,
+        'count': author_counters.posts_count,
+        'comments': comments,
+    }
+
+
+def follow_context(page_obj, fragment):
+    return {
+        'page_obj': page_obj,
+        'title': 'Лента избранного',
+        **fragment,
+    }
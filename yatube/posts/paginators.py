@@ -0,0 +1,153 @@
+"""Пагинация списков постов.
+
+Помимо стандартного ``Paginator`` со страницами ``?page=N`` есть курсорный
+режим: страница определяется ключом ``(pub_date, id)`` последнего
+показанного поста и передаётся непрозрачными токенами ``?after=`` /
+``?before=``. Такой запрос не делает ни ``OFFSET``, ни ``COUNT(*)``,
+поэтому глубина страницы на стоимость не влияет.
+Режим выбирается настройкой ``POSTS_PAGINATION``.
+"""
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.conf import settings as st
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(obj, field):
+    """Упаковывает ключ объекта в непрозрачный токен."""
+    value = getattr(obj, field)
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    raw = f'{value}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, to_python=parse_datetime):
+    """Распаковывает токен; для испорченного токена возвращает None."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.rsplit('|', 1)
+        value = to_python(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError):
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next() or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[-1], self.paginator.field)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous() or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[0], self.paginator.field)
+
+
+class CursorPaginator:
+    """Пагинатор по ключу ``(поле сортировки, id)``.
+
+    Поле сортировки берётся из ``ordering`` или ``Meta.ordering`` модели,
+    ``id`` разрешает совпадения дат.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, ordering=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        ordering = ordering or object_list.model._meta.ordering[0]
+        self.field = ordering.lstrip('-')
+        self.descending = ordering.startswith('-')
+        self.to_python = object_list.model._meta.get_field(
+            self.field
+        ).to_python
+
+    def _ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return f'{prefix}{self.field}', f'{prefix}pk'
+
+    def _seek(self, cursor, forward):
+        value, pk = cursor
+        lookup = 'lt' if self.descending == forward else 'gt'
+        return self.object_list.filter(
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def page(self, after=None, before=None):
+        """Страница после курсора ``after`` или перед курсором ``before``."""
+        after = decode_cursor(after, self.to_python) if after else None
+        before = decode_cursor(before, self.to_python) if before else None
+        if before is not None:
+            rows = list(
+                self._seek(before, forward=False)
+                .order_by(*self._ordering(reverse=True))[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            # За непустой страницей остаётся хотя бы пост из курсора.
+            return CursorPage(rows, self, bool(rows), has_previous)
+        queryset = self.object_list
+        if after is not None:
+            queryset = self._seek(after, forward=True)
+        rows = list(
+            queryset.order_by(*self._ordering())[:self.per_page + 1]
+        )
+        has_next = len(rows) > self.per_page
+        has_previous = after is not None and bool(rows)
+        return CursorPage(rows[:self.per_page], self, has_next, has_previous)
+
+
+def paginate(request, post_list, count=None):
+    """Возвращает страницу списка постов в режиме POSTS_PAGINATION.
+
+    ``count`` — заранее известное число постов (например, из
+    денормализованного счётчика), оно избавляет от ``COUNT(*)``.
+    """
+    if st.POSTS_PAGINATION == 'cursor':
+        paginator = CursorPaginator(post_list, st.PАGES)
+        return paginator.page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+    paginator = Paginator(post_list, st.PАGES)
+    if count is not None:
+        paginator.count = count
+    return paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,186 @@
+"""Полнотекстовый поиск по постам на SQLite FTS5.
+
+Индекс ``posts_post_fts`` — внешняя FTS5-таблица над ``posts_post``,
+его синхронизируют триггеры из миграции ``0013_post_search``.
+Результаты ранжируются по bm25 и листаются курсором ``(ранг, id)``,
+поэтому стоимость запроса не зависит ни от размера таблицы,
+ни от глубины страницы.
+"""
+import base64
+import binascii
+import re
+
+from django.db import connections, router
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+SEARCH_SQL = (
+    f'SELECT rowid, bm25({FTS_TABLE}), '
+    f"snippet({FTS_TABLE}, 0, char(2), char(3), '…', 12) "
+    f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s {{keyset}}'
+    f'ORDER BY bm25({FTS_TABLE}), rowid LIMIT %s'
+)
+KEYSET_SQL = (
+    f'AND (bm25({FTS_TABLE}) > %s '
+    f'OR (bm25({FTS_TABLE}) = %s AND rowid > %s)) '
+)
+
+
+def is_available():
+    # Поиск читает из той же базы, что и страницы: из реплики запроса.
+    return connections[router.db_for_read(Post)].vendor == 'sqlite'
+
+
+def build_match(query):
+    """Превращает ввод пользователя в префиксный запрос FTS5.
+
+    Каждое слово берётся в кавычки, чтобы операторы FTS5 из ввода
+    не интерпретировались, и дополняется ``*`` для поиска по префиксу.
+    """
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def encode_cursor(score, pk):
+    raw = f'{score!r}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        score, pk = raw.rsplit('|', 1)
+        return float(score), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и подсвечивает совпадения тегом ``<mark>``."""
+    html = escape(snippet)
+    html = html.replace(SNIPPET_START, '<mark>')
+    return mark_safe(html.replace(SNIPPET_END, '</mark>'))
+
+
+def filter_posts(queryset, query):
+    """Посты из ``queryset``, подходящие под запрос, без ограничения числа.
+
+    Индекс проверяется подзапросом, так что сортировку и страницы
+    задаёт сам ``queryset``, например список постов в админке.
+    """
+    match = build_match(query)
+    if not match:
+        return queryset.none()
+    if not is_available():
+        return queryset.filter(text__icontains=query)
+    # RawSQL в ``pk__in`` берётся в лишние скобки, и SQLite сравнивает
+    # id только с первой строкой подзапроса.
+    meta = queryset.model._meta
+    return queryset.extra(
+        where=[
+            f'"{meta.db_table}"."{meta.pk.column}" IN '
+            f'(SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)'
+        ],
+        params=[match],
+    )
+
+
+class SearchPage:
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def search(query, per_page, after=None):
+    """Страница результатов поиска после курсора ``after``.
+
+    У каждого поста есть атрибут ``snippet`` с подсвеченным фрагментом.
+    """
+    match = build_match(query)
+    if not match:
+        return SearchPage([], None)
+    if not is_available():
+        return _search_without_index(query, per_page, after)
+    cursor_value = decode_cursor(after) if after else None
+    params = [match]
+    keyset = ''
+    if cursor_value is not None:
+        score, pk = cursor_value
+        keyset = KEYSET_SQL
+        params += [score, score, pk]
+    params.append(per_page + 1)
+    # Посты берутся из той же базы, что и строки индекса.
+    alias = router.db_for_read(Post)
+    with connections[alias].cursor() as cursor:
+        cursor.execute(SEARCH_SQL.format(keyset=keyset), params)
+        rows = cursor.fetchall()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+    posts = Post.objects.using(alias).select_related(
+        'author', 'group'
+    ).in_bulk([row[0] for row in rows])
+    results = []
+    for pk, _, snippet in rows:
+        if pk in posts:
+            posts[pk].snippet = highlight(snippet)
+            results.append(posts[pk])
+    return SearchPage(results, next_cursor)
+
+
+def _search_without_index(query, per_page, after):
+    """Поиск подстрокой, когда индекса нет: новые посты первыми.
+
+    Ранга нет, поэтому курсор хранит нулевую оценку и id поста.
+    """
+    posts = Post.objects.select_related('author', 'group').filter(
+        text__icontains=query
+    ).order_by('-pk')
+    cursor_value = decode_cursor(after) if after else None
+    if cursor_value is not None:
+        posts = posts.filter(pk__lt=cursor_value[1])
+    posts = list(posts[:per_page + 1])
+    next_cursor = None
+    if len(posts) > per_page:
+        posts = posts[:per_page]
+        next_cursor = encode_cursor(0.0, posts[-1].pk)
+    pattern = re.compile(re.escape(query), re.IGNORECASE)
+    for post in posts:
+        snippet = pattern.sub(
+            lambda found: SNIPPET_START + found.group() + SNIPPET_END,
+            post.text,
+        )
+        post.snippet = highlight(Truncator(snippet).words(12, truncate='…'))
+    return SearchPage(posts, next_cursor)
+
+
+def rebuild():
+    """Перестраивает индекс по текущему содержимому таблицы постов."""
+    if is_available():
+        alias = router.db_for_write(Post)
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+            )
@@ -0,0 +1,97 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import blobs, counters, fragments, graph, timeline
+from .models import Comment, Follow, Group, Post
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    """Новый пост попадает в ленты подписчиков и счётчики,
+    а закэшированные списки с ним устаревают.
+    """
+    if kwargs.get('raw'):
+        return
+    if created:
+        timeline.fan_out_post(instance)
+        counters.bump_user(instance.author_id, 'posts_count', 1)
+        counters.bump_group(instance.group_id, 1)
+        blobs.acquire(instance.image.name)
+        old_group_id = None
+    else:
+        old_group_id = getattr(
+            instance, '_loaded_group_id', instance.group_id
+        )
+        if old_group_id != instance.group_id:
+            counters.bump_group(old_group_id, -1)
+            counters.bump_group(instance.group_id, 1)
+        old_image = getattr(instance, '_loaded_image', instance.image.name)
+        if old_image != instance.image.name:
+            blobs.release(old_image)
+            blobs.acquire(instance.image.name)
+    fragments.post_changed(instance, old_group_id)
+    instance._loaded_group_id = instance.group_id
+    instance._loaded_image = instance.image.name
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    fragments.post_changed(instance)
+    counters.bump_user(instance.author_id, 'posts_count', -1)
+    counters.bump_group(instance.group_id, -1)
+    blobs.release(instance.image.name)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    if not created and not kwargs.get('raw'):
+        fragments.bump(fragments.group_scope(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    if created:
+        counters.bump_post(instance.post_id, 1)
+    if instance.post_id is not None:
+        fragments.bump(fragments.post_scope(instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.bump_post(instance.post_id, -1)
+    if instance.post_id is not None:
+        fragments.bump(fragments.post_scope(instance.post_id))
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    """После подписки в ленту подтягиваются посты автора."""
+    if not created or kwargs.get('raw'):
+        return
+    if instance.user_id and instance.author_id:
+        timeline.backfill(instance.user_id, instance.author_id)
+        graph.changed(instance.user_id, instance.author_id)
+        fragments.bump(
+            fragments.follow_scope(instance.user_id),
+            fragments.relations_scope(instance.user_id),
+            fragments.relations_scope(instance.author_id),
+        )
+    counters.bump_user(instance.author_id, 'followers_count', 1)
+    counters.bump_user(instance.user_id, 'following_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    """После отписки посты автора пропадают из ленты."""
+    if instance.user_id and instance.author_id:
+        timeline.remove_author(instance.user_id, instance.author_id)
+        graph.changed(instance.user_id, instance.author_id)
+        fragments.bump(
+            fragments.follow_scope(instance.user_id),
+            fragments.relations_scope(instance.user_id),
+            fragments.relations_scope(instance.author_id),
+        )
+    counters.bump_user(instance.author_id, 'followers_count', -1)
+    counters.bump_user(instance.user_id, 'following_count', -1)
@@ -0,0 +1,46 @@
+import logging
+
+from django import template
+from django.conf import settings as st
+from sorl.thumbnail import get_thumbnail
+
+from .. import thumbnails
+
+logger = logging.getLogger(__name__)
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/picture.html')
+def responsive_image(image, alt='', sizes=None):
+    """<picture> с вариантами картинки по ширине в каждом формате."""
+    if not image:
+        return {}
+    variants = {}
+    try:
+        for size, options in thumbnails.variants():
+            variant = get_thumbnail(image, size, **options)
+            if variant.size is None:
+                # Исходника нет: sorl-thumbnail уже записал это в лог.
+                return {}
+            variants.setdefault(options['format'], []).append(variant)
+    except Exception:
+        # Как и {% thumbnail %}: битая картинка не роняет страницу.
+        logger.exception('Не удалось получить варианты %s', image)
+        return {}
+    sources = [
+        {
+            'type': thumbnails.MIME_TYPES[image_format],
+            'srcset': ', '.join(
+                f'{variant.url} {variant.width}w' for variant in ladder
+            ),
+        }
+        for image_format, ladder in variants.items()
+    ]
+    fallback = variants[thumbnails.FORMATS[-1]][-1]
+    return {
+        'sources': sources[:-1],
+        'fallback': fallback,
+        'srcset': sources[-1]['srcset'],
+        'sizes': sizes or st.IMAGE_VARIANT_SIZES,
+        'alt': alt,
+    }
@@ -0,0 +1,86 @@
+import re
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import (RequestFactory, TransactionTestCase,
+                         override_settings)
+
+from .. import async_views, views
+from ..models import Comment, Follow, Group, Post, User
+from . import test_conditional, test_views
+
+CSRF_TOKEN = re.compile(rb'name="csrfmiddlewaretoken" value="[^"]+"')
+
+
+class AsyncViewsTests(TransactionTestCase):
+    """Асинхронные варианты отдают те же страницы, что и синхронные."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='Leo_test')
+        self.reader = User.objects.create_user(username='Krio')
+        self.group = Group.objects.create(
+            title='test_title',
+            slug='test_group',
+            description='test_description',
+        )
+        Follow.objects.create(user=self.reader, author=self.user)
+        for i in range(13):
+            self.post = Post.objects.create(
+                author=self.user, group=self.group, text=f'Test_text {i}'
+            )
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+
+    def render(self, view, user, query, **kwargs):
+        cache.clear()
+        request = self.factory.get('/', query)
+        request.user = user
+        response = view(request, **kwargs)
+        return response.status_code, CSRF_TOKEN.sub(b'', response.content)
+
+    def test_pages_match_sync_views(self):
+        """Страницы совпадают для гостя и пользователя, на любой странице."""
+        pages = (
+            ('index', {}),
+            ('group_posts', {'slug': self.group.slug}),
+            ('profile', {'username': self.user.username}),
+            ('post_detail', {'post_id': self.post.pk}),
+            ('follow_index', {}),
+        )
+        for user in (AnonymousUser(), self.reader):
+            for name, kwargs in pages:
+                for query in ({}, {'page': 2}, {'page': 99}):
+                    with self.subTest(page=name, user=user, query=query):
+                        expected = self.render(
+                            getattr(views, name), user, query, **kwargs
+                        )
+                        self.assertEqual(
+                            self.render(
+                                getattr(async_views, name), user, query,
+                                **kwargs
+                            ),
+                            expected,
+                        )
+                        self.assertIn(expected[0], (200, 302))
+
+
+# Тесты страниц ещё раз на асинхронных вариантах. Без пула потоков
+# запросы идут в транзакции TestCase, как и у синхронных views.
+ASYNC_PAGES = override_settings(ASYNC_VIEWS=True, ASYNC_QUERY_WORKERS=0)
+
+
+@ASYNC_PAGES
+class AsyncPostsViewTests(test_views.PostsVievTests):
+    pass
+
+
+@ASYNC_PAGES
+class AsyncQueryBudgetTests(test_views.QueryBudgetTests):
+    pass
+
+
+@ASYNC_PAGES
+class AsyncConditionalGetTests(test_conditional.ConditionalGetTests):
+    pass
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import ImageBlob, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_GIF = SMALL_GIF[:-1] + b'\x00\x3B'
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageBlobTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, name, content):
+        return Post.objects.create(
+            author=ImageBlobTests.user,
+            text='С картинкой',
+            image=SimpleUploadedFile(
+                name=name, content=content, content_type='image/gif'
+            ),
+        )
+
+    def refs(self, name):
+        return ImageBlob.objects.get(name=name).refs
+
+    def test_same_content_stored_once(self):
+        """Одинаковые картинки хранятся одним файлом с двумя ссылками."""
+        first = self.create_post('cat.gif', SMALL_GIF)
+        second = self.create_post('copy.GIF', SMALL_GIF)
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r'^posts/\w\w/\w{64}\.gif$')
+        self.assertTrue(os.path.exists(first.image.path))
+        self.assertEqual(self.refs(first.image.name), 2)
+
+    def test_refs_follow_edit_and_delete(self):
+        """Правка и удаление поста освобождают ссылку на картинку."""
+        post = self.create_post('cat.gif', SMALL_GIF)
+        old_name = post.image.name
+        post = Post.objects.get(pk=post.pk)
+        post.image = SimpleUploadedFile(
+            name='dog.gif', content=OTHER_GIF, content_type='image/gif'
+        )
+        post.save()
+        self.assertEqual(self.refs(old_name), 0)
+        self.assertEqual(self.refs(post.image.name), 1)
+        post.delete()
+        self.assertEqual(self.refs(post.image.name), 0)
+
+    def test_collect_blobs(self):
+        """Сборщик удаляет только файлы без ссылок."""
+        kept = self.create_post('cat.gif', SMALL_GIF)
+        removed = self.create_post('dog.gif', OTHER_GIF)
+        removed.delete()
+        # Свежие файлы защищены сроком --grace.
+        call_command('collect_blobs', stdout=StringIO())
+        self.assertTrue(os.path.exists(removed.image.path))
+        ImageBlob.objects.all().delete()
+        out = StringIO()
+        call_command('collect_blobs', grace=0, recount=True, stdout=out)
+        self.assertIn(removed.image.name, out.getvalue())
+        self.assertFalse(os.path.exists(removed.image.path))
+        self.assertTrue(os.path.exists(kept.image.path))
+        self.assertEqual(self.refs(kept.image.name), 1)
@@ -0,0 +1,128 @@
+from django.conf import settings as st
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from ..models import Comment, Follow, Group, Post, User
+from .utils import QueryBudgetMixin
+
+
+class ConditionalGetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.reader = User.objects.create_user(username='Krio')
+        cls.group = Group.objects.create(
+            title='test_title',
+            slug='test_group',
+            description='test_description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Test_text'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def get_urls(self):
+        return (
+            reverse(
+                'posts:post_detail',
+                kwargs={'post_id': self.post.pk}
+            ),
+            reverse(
+                'posts:profile',
+                kwargs={'username': self.user.username}
+            ),
+            reverse(
+                'posts:group_list',
+                kwargs={'slug': self.group.slug}
+            ),
+        )
+
+    def test_repeat_visit_not_modified(self):
+        """Повторный запрос с валидаторами получает 304 без рендеринга."""
+        for url in self.get_urls():
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                # Сессия, пользователь и сам объект страницы.
+                with self.assertMaxQueries(3):
+                    response = self.authorized_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        """Клиент без ETag получает 304 по Last-Modified."""
+        for url in self.get_urls():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                )
+                self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_validators(self):
+        """Комментарий, правка поста и подписка меняют ETag страниц."""
+        post_url, profile_url, group_url = self.get_urls()
+        etags = {
+            url: self.authorized_client.get(url)['ETag']
+            for url in self.get_urls()
+        }
+        Comment.objects.create(
+            post=self.post,
+            author=self.reader,
+            text='Комментарий',
+        )
+        Follow.objects.create(
+            user=self.reader, author=self.user
+        )
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Правка'
+        post.save()
+        for url in (post_url, profile_url, group_url):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_validators_depend_on_user(self):
+        """ETag гостя не подходит авторизованному пользователю."""
+        for url in self.get_urls():
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_validators_depend_on_login(self):
+        """После повторного входа ETag прошлой сессии не подходит."""
+        for url in self.get_urls():
+            with self.subTest(url=url):
+                etag = self.authorized_client.get(url)['ETag']
+                self.authorized_client.force_login(self.reader)
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_validators_depend_on_csrf_token(self):
+        """Новый CSRF-токен делает прежний ETag недействительным."""
+        for url in self.get_urls():
+            with self.subTest(url=url):
+                etag = self.authorized_client.get(url)['ETag']
+                self.authorized_client.cookies[st.CSRF_COOKIE_NAME] = (
+                    get_random_string(64)
+                )
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
@@ -0,0 +1,97 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from .. import counters
+from ..models import Comment, Follow, Group, Post, User, UserCounters
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.reader = User.objects.create_user(username='Krio')
+        cls.group = Group.objects.create(
+            title='test_title',
+            slug='test_group',
+            description='test_description',
+        )
+        cls.other_group = Group.objects.create(
+            title='other_title',
+            slug='other_group',
+        )
+
+    def test_post_counters(self):
+        """Создание, перенос и удаление поста меняют счётчики."""
+        post = Post.objects.create(
+            author=CountersTests.user, group=CountersTests.group, text='Т'
+        )
+        self.assertEqual(counters.for_user(CountersTests.user).posts_count, 1)
+        CountersTests.group.refresh_from_db()
+        self.assertEqual(CountersTests.group.posts_count, 1)
+        post = Post.objects.get(pk=post.pk)
+        post.group = CountersTests.other_group
+        post.save()
+        CountersTests.group.refresh_from_db()
+        CountersTests.other_group.refresh_from_db()
+        self.assertEqual(CountersTests.group.posts_count, 0)
+        self.assertEqual(CountersTests.other_group.posts_count, 1)
+        post.delete()
+        CountersTests.other_group.refresh_from_db()
+        self.assertEqual(CountersTests.other_group.posts_count, 0)
+        self.assertEqual(counters.for_user(CountersTests.user).posts_count, 0)
+
+    def test_comment_and_follow_counters(self):
+        """Комментарии и подписки меняют счётчики."""
+        post = Post.objects.create(author=CountersTests.user, text='Т')
+        comment = Comment.objects.create(
+            post=post, author=CountersTests.reader, text='К'
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        Follow.objects.create(
+            user=CountersTests.reader, author=CountersTests.user
+        )
+        self.assertEqual(
+            counters.for_user(CountersTests.user).followers_count, 1
+        )
+        self.assertEqual(
+            counters.for_user(CountersTests.reader).following_count, 1
+        )
+        Follow.objects.all().delete()
+        self.assertEqual(
+            counters.for_user(CountersTests.user).followers_count, 0
+        )
+
+    def test_reconcile_command(self):
+        """Команда reconcile_counters исправляет расхождения."""
+        Post.objects.create(
+            author=CountersTests.user, group=CountersTests.group, text='Т'
+        )
+        UserCounters.objects.update(posts_count=42)
+        Group.objects.update(posts_count=42)
+        call_command('reconcile_counters', stdout=StringIO())
+        CountersTests.group.refresh_from_db()
+        self.assertEqual(CountersTests.group.posts_count, 1)
+        self.assertEqual(counters.for_user(CountersTests.user).posts_count, 1)
+
+
+class UserDeletionTests(TransactionTestCase):
+    def test_delete_user_with_posts_and_follows(self):
+        """Удаление пользователя не воскрешает его счётчики."""
+        user = User.objects.create_user(username='Leo_test')
+        reader = User.objects.create_user(username='Krio')
+        Post.objects.create(author=user, text='Т')
+        Follow.objects.create(user=reader, author=user)
+        Follow.objects.create(user=user, author=reader)
+        counters.for_user(user)
+        user.delete()
+        self.assertFalse(UserCounters.objects.filter(user_id=user.pk).exists())
+        reader_counters = counters.for_user(reader)
+        self.assertEqual(reader_counters.followers_count, 0)
+        self.assertEqual(reader_counters.following_count, 0)
@@ -0,0 +1,89 @@
+import csv
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, Post, User
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.reader = User.objects.create_user(username='Krio')
+        cls.group = Group.objects.create(
+            title='test_title',
+            slug='test_group',
+            description='test_description',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Текст, {i}'
+            )
+            for i in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.user, text='Комментарий "1"'
+        )
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Чужой'
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ExportTests.user)
+        self.reader_client = Client()
+        self.reader_client.force_login(ExportTests.reader)
+
+    def test_command_ndjson(self):
+        """Команда выгружает посты и комментарии автора по строке."""
+        out = StringIO()
+        call_command('export_posts', 'Leo_test', chunk_size=2, stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [row['type'] for row in rows], ['post'] * 5 + ['comment']
+        )
+        self.assertEqual(rows[0]['text'], 'Текст, 0')
+        self.assertEqual(rows[0]['group'], 'test_group')
+        self.assertEqual(rows[-1]['post'], ExportTests.posts[0].pk)
+
+    def test_image_url_from_field_storage(self):
+        """Адрес картинки строит хранилище поля ``image``."""
+        Post.objects.filter(pk=ExportTests.posts[0].pk).update(
+            image='posts/photo.jpg'
+        )
+        storage = FileSystemStorage(base_url='https://cdn.example/')
+        field = Post._meta.get_field('image')
+        out = StringIO()
+        with mock.patch.object(field, 'storage', storage):
+            call_command('export_posts', 'Leo_test', stdout=out)
+        row = json.loads(out.getvalue().splitlines()[0])
+        self.assertEqual(row['image'], 'https://cdn.example/posts/photo.jpg')
+
+    def test_endpoint_streams_csv(self):
+        """Эндпоинт отдаёт CSV потоком."""
+        response = self.authorized_client.get(
+            reverse('api:user_export', kwargs={'username': 'Leo_test'}),
+            {'format': 'csv'},
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1]['text'], 'Текст, 1')
+        self.assertEqual(rows[5]['text'], 'Комментарий "1"')
+
+    def test_endpoint_access(self):
+        """Выгрузку получает только сам автор, формат проверяется."""
+        url = reverse('api:user_export', kwargs={'username': 'Leo_test'})
+        self.assertEqual(Client().get(url).status_code, 401)
+        self.assertEqual(self.reader_client.get(url).status_code, 403)
+        response = self.authorized_client.get(url, {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.other = User.objects.create_user(username='Krio')
+        cls.group = Group.objects.create(
+            title='test_title',
+            slug='test_group',
+            description='test_description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Запись в группе'
+        )
+        Post.objects.create(author=cls.other, text='Запись без группы')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feeds_content(self):
+        """Ленты содержат записи своей области в нужном формате."""
+        feeds = {
+            reverse('posts:site_rss'): (
+                'application/rss+xml', ['в группе', 'без группы']),
+            reverse('posts:site_atom'): (
+                'application/atom+xml', ['в группе', 'без группы']),
+            reverse('posts:group_rss', args=['test_group']): (
+                'application/rss+xml', ['в группе']),
+            reverse('posts:author_atom', args=['Krio']): (
+                'application/atom+xml', ['без группы']),
+        }
+        for url, (content_type, texts) in feeds.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type
+                ))
+                content = response.content.decode()
+                for text in ('в группе', 'без группы'):
+                    if text in texts:
+                        self.assertIn(text, content)
+                    else:
+                        self.assertNotIn(text, content)
+        url = reverse('posts:group_rss', args=['no_group'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_feed_is_cached_until_post_changes(self):
+        """Лента берётся из кэша и обновляется после правки поста."""
+        url = reverse('posts:group_rss', args=['test_group'])
+        response = self.client.get(url)
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            cached = self.client.get(url)
+        self.assertEqual(cached.content, response.content)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        FeedTests.post.text = 'Исправленная запись'
+        FeedTests.post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Исправленная запись', response.content.decode())
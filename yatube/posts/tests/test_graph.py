@@ -0,0 +1,79 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from .. import fragments, graph
+from ..models import Follow, User
+
+
+class FollowGraphTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(3)
+        ]
+        Follow.objects.create(user=cls.user, author=cls.authors[0])
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FollowGraphTests.user)
+
+    def test_bulk_is_following_from_cache(self):
+        """Подписки на всех авторов проверяются одним запросом к базе."""
+        user, authors = FollowGraphTests.user, FollowGraphTests.authors
+        expected = {
+            authors[0].pk: True, authors[1].pk: False, authors[2].pk: False
+        }
+        with self.assertNumQueries(1):
+            self.assertEqual(graph.is_following(user, authors), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(graph.is_following(user, authors), expected)
+            self.assertEqual(
+                graph.is_following(AnonymousUser(), authors[:1]),
+                {authors[0].pk: False},
+            )
+
+    def test_follow_updates_cached_sets(self):
+        """После подписки и отписки множества загружаются заново."""
+        user, author = FollowGraphTests.user, FollowGraphTests.authors[1]
+        self.assertEqual(graph.following(user.pk), {self.authors[0].pk})
+        self.assertEqual(graph.followers(author.pk), set())
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+        self.assertIn(author.pk, graph.following(user.pk))
+        with self.assertNumQueries(0):
+            self.assertIn(author.pk, graph.following(user.pk))
+        self.assertEqual(graph.followers(author.pk), {user.pk})
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', args=[author.username])
+        )
+        self.assertNotIn(author.pk, graph.following(user.pk))
+        self.assertEqual(graph.followers(author.pk), set())
+        response = self.authorized_client.get(
+            reverse('posts:profile', args=[author.username])
+        )
+        self.assertFalse(response.context['following'])
+
+
+class FollowGraphCommitTests(TransactionTestCase):
+    def test_load_before_commit_is_not_served(self):
+        """Множество, прочитанное до коммита подписки, не используется."""
+        user = User.objects.create_user(username='Leo_test')
+        author = User.objects.create_user(username='author')
+        cache.clear()
+        with transaction.atomic():
+            Follow.objects.create(user=user, author=author)
+            # Другой запрос прочитал версию и подписки до коммита.
+            stale_key = graph.FOLLOWING_KEY.format(
+                user.pk,
+                fragments.get_version(fragments.relations_scope(user.pk)),
+            )
+            cache.set(stale_key, frozenset())
+        self.assertIn(author.pk, graph.following(user.pk))
@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..importer import Checkpoint
+from ..models import Comment, Follow, Group, Post, Timeline, User
+
+TEMP_DIR = tempfile.mkdtemp()
+
+RECORDS = [
+    {'type': 'group', 'slug': 'cats', 'title': 'Кошки'},
+    {'type': 'post', 'id': 'p1', 'author': 'leo', 'group': 'cats',
+     'text': 'Первый', 'created': '2021-05-01T10:00:00+03:00'},
+    {'type': 'post', 'id': 'p2', 'author': 'leo', 'text': 'Второй'},
+    {'type': 'comment', 'post': 'p1', 'author': 'krio', 'text': 'Ура'},
+    {'type': 'follow', 'user': 'krio', 'author': 'leo'},
+    {'type': 'post', 'id': 3, 'author': 'krio', 'text': 'Третий'},
+    {'type': 'comment', 'post': '3', 'author': 'leo', 'text': 'Ответ'},
+    {'type': 'post', 'author': 'leo', 'group': 'dogs', 'text': 'Нет группы'},
+    {'type': 'comment', 'post': 'p9', 'author': 'leo', 'text': 'Нет поста'},
+]
+
+
+class ImportDataTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.path = os.path.join(TEMP_DIR, 'input.ndjson')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for record in RECORDS:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            file.write('не JSON\n')
+        self.checkpoint = os.path.join(TEMP_DIR, 'checkpoint.json')
+        for path in (self.checkpoint, f'{self.checkpoint}.posts'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run_import(self, **options):
+        err = StringIO()
+        call_command(
+            'import_data', self.path, batch_size=3,
+            stdout=StringIO(), stderr=err, **options
+        )
+        return err.getvalue()
+
+    def assert_imported(self):
+        self.assertEqual(Post.objects.count(), 3)
+        self.assertEqual(Comment.objects.count(), 2)
+        leo = User.objects.get(username='leo')
+        krio = User.objects.get(username='krio')
+        first = Post.objects.get(text='Первый')
+        self.assertEqual(first.group, Group.objects.get(slug='cats'))
+        self.assertEqual(
+            first.pub_date.isoformat(), '2021-05-01T07:00:00+00:00'
+        )
+        self.assertEqual(first.comments.get().author, krio)
+        self.assertEqual(
+            Comment.objects.get(text='Ответ').post.text, 'Третий'
+        )
+        self.assertTrue(Follow.objects.filter(user=krio, author=leo).exists())
+        self.assertEqual(leo.counters.posts_count, 2)
+        self.assertEqual(first.group.posts_count, 1)
+        self.assertEqual(Timeline.objects.filter(user=krio).count(), 2)
+
+    def test_import_reports_bad_lines(self):
+        """Импорт создаёт записи, а ошибочные строки пропускает."""
+        errors = self.run_import()
+        self.assert_imported()
+        self.assertIn('Строка 8: нет группы dogs', errors)
+        self.assertIn('Строка 9: нет поста p9', errors)
+        self.assertIn('Строка 10: некорректный JSON', errors)
+
+    def test_workers(self):
+        """Разбор в нескольких процессах даёт тот же результат."""
+        self.run_import(workers=2)
+        self.assert_imported()
+
+    def test_resume_after_crash(self):
+        """После сбоя импорт продолжается без потерь и повторов."""
+        commit = Checkpoint.commit
+        calls = []
+
+        def crash_on_second(checkpoint, next_state):
+            calls.append(next_state)
+            if len(calls) == 2:
+                # Транзакция пачки уже зафиксирована, точка — ещё нет.
+                raise KeyboardInterrupt
+            commit(checkpoint, next_state)
+
+        with mock.patch.object(Checkpoint, 'commit', crash_on_second):
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_import(checkpoint=self.checkpoint)
+        # Вторая пачка (строки 4–6) в базе, но точка на строке 4.
+        self.assertEqual(Post.objects.count(), 3)
+        self.run_import(checkpoint=self.checkpoint)
+        self.assert_imported()
+
+    def test_import_keeps_auto_now_add(self):
+        """Импорт не отключает auto_now_add у общих полей моделей."""
+        flags = []
+        bulk_create = Post.objects.bulk_create
+
+        def check(*args, **kwargs):
+            flags.append(Post._meta.get_field('pub_date').auto_now_add)
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(Post.objects, 'bulk_create', check):
+            self.run_import()
+        self.assert_imported()
+        self.assertTrue(flags)
+        self.assertTrue(all(flags))
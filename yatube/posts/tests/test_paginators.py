@@ -0,0 +1,97 @@
+from django.conf import settings as st
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..paginators import CursorPaginator, decode_cursor, encode_cursor
+
+
+@override_settings(POSTS_PAGINATION='cursor')
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.group = Group.objects.create(
+            title='test_title',
+            slug='test_group',
+            description='test_description',
+        )
+        for i in range(st.PАGES + 5):
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group,
+                text=f'Test_text {i}',
+            )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_pages_walk_forward_and_back(self):
+        """Курсоры ведут по всем постам без пропусков и повторов."""
+        paginator = CursorPaginator(Post.objects.all(), st.PАGES)
+        first = paginator.page()
+        second = paginator.page(after=first.next_cursor)
+        self.assertEqual(len(first), st.PАGES)
+        self.assertEqual(len(second), Post.objects.count() - st.PАGES)
+        self.assertFalse(second.has_next())
+        self.assertEqual(
+            list(first) + list(second), list(Post.objects.all())
+        )
+        back = paginator.page(before=second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный токен отдаёт первую страницу."""
+        self.assertIsNone(decode_cursor('мусор'))
+        page = CursorPaginator(Post.objects.all(), st.PАGES).page(
+            after='bm90LWEtY3Vyc29y'
+        )
+        self.assertEqual(list(page), list(Post.objects.all()[:st.PАGES]))
+
+    def test_listing_views_use_cursor(self):
+        """Списки постов переключаются на курсорную пагинацию."""
+        urls = (
+            reverse('posts:index'),
+            reverse(
+                'posts:group_list',
+                kwargs={'slug': CursorPaginatorTests.group.slug}
+            ),
+            reverse(
+                'posts:profile',
+                kwargs={'username': CursorPaginatorTests.user.username}
+            ),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                page_obj = response.context['page_obj']
+                self.assertEqual(len(page_obj), st.PАGES)
+                self.assertContains(
+                    response, f'?after={page_obj.next_cursor}'
+                )
+                response = self.guest_client.get(
+                    url, {'after': page_obj.next_cursor}
+                )
+                self.assertEqual(len(response.context['page_obj']), 5)
+
+    def test_empty_pages_at_both_ends(self):
+        """За крайними постами пустая страница без курсоров."""
+        oldest = encode_cursor(Post.objects.last(), 'pub_date')
+        newest = encode_cursor(Post.objects.first(), 'pub_date')
+        paginator = CursorPaginator(Post.objects.all(), st.PАGES)
+        for page in (
+            paginator.page(after=oldest), paginator.page(before=newest)
+        ):
+            with self.subTest(page=page):
+                self.assertEqual(len(page), 0)
+                self.assertFalse(page.has_other_pages())
+                self.assertIsNone(page.next_cursor)
+                self.assertIsNone(page.previous_cursor)
+        for query in ({'after': oldest}, {'before': newest}):
+            with self.subTest(query=query):
+                response = self.guest_client.get(
+                    reverse('posts:index'), query
+                )
+                self.assertEqual(response.status_code, 200)
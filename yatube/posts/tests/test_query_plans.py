@@ -0,0 +1,72 @@
+import re
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+( AS \w+)?$')
+
+
+class QueryPlanTests(TestCase):
+    """Запросы страниц не должны читать таблицы целиком."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.reader = User.objects.create_user(username='Krio')
+        cls.group = Group.objects.create(
+            title='test_title',
+            slug='test_group',
+            description='test_description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Test_text'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(QueryPlanTests.reader)
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_views_use_indexes(self):
+        """EXPLAIN каждого запроса страниц не содержит полного скана."""
+        urls = (
+            reverse('posts:index'),
+            reverse(
+                'posts:group_list',
+                kwargs={'slug': QueryPlanTests.group.slug}
+            ),
+            reverse(
+                'posts:profile',
+                kwargs={'username': QueryPlanTests.user.username}
+            ),
+            reverse(
+                'posts:post_detail',
+                kwargs={'post_id': QueryPlanTests.post.id}
+            ),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                self.authorized_client.get(url)
+            for query in queries.captured_queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                plan = self.explain(query['sql'])
+                with self.subTest(url=url, sql=query['sql']):
+                    self.assertFalse(
+                        any(FULL_SCAN.search(step) for step in plan),
+                        f'Полный скан таблицы: {plan}'
+                    )
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, Recommendation, User
+
+
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.popular = User.objects.create_user(username='popular')
+        cls.other = User.objects.create_user(username='other')
+        cls.neighbour = User.objects.create_user(username='neighbour')
+        group = Group.objects.create(title='Кошки', slug='cats')
+        Follow.objects.create(user=cls.user, author=cls.friend)
+        for author in (cls.popular, cls.other):
+            Follow.objects.create(user=cls.friend, author=author)
+        Follow.objects.create(user=cls.neighbour, author=cls.popular)
+        for author in (cls.user, cls.neighbour):
+            Post.objects.create(author=author, group=group, text='Мяу')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(RecommendationTests.user)
+        call_command('compute_recommendations', top_k=3, stdout=StringIO())
+
+    def test_friends_of_friends_and_groups(self):
+        """Друзья друзей и соседи по группе, без своих подписок."""
+        rows = Recommendation.objects.filter(
+            user=RecommendationTests.user
+        ).values_list('author__username', 'mutual_follows', 'shared_groups')
+        self.assertEqual(
+            list(rows),
+            [('popular', 1, 0), ('other', 1, 0), ('neighbour', 0, 1)],
+        )
+        self.assertFalse(Recommendation.objects.filter(
+            user=RecommendationTests.neighbour
+        ).exclude(author__username='Leo_test').exists())
+
+    def test_widget_and_endpoint(self):
+        """Виджет профиля и API читают готовые рекомендации."""
+        url = reverse('api:recommendations')
+        self.assertEqual(Client().get(url).status_code, 401)
+        response = self.authorized_client.get(url)
+        self.assertEqual(
+            [row['username'] for row in response.json()['results']],
+            ['popular', 'other', 'neighbour'],
+        )
+        profile = reverse('posts:profile', args=['Leo_test'])
+        response = self.authorized_client.get(profile)
+        self.assertContains(response, 'Кого почитать')
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=['neighbour'])
+        )
+        response = self.authorized_client.get(profile)
+        self.assertEqual(
+            [row['username'] for row in response.context['recommendations']],
+            ['popular', 'other'],
+        )
+        response = self.authorized_client.get(
+            reverse('posts:profile', args=['popular'])
+        )
+        self.assertNotContains(response, 'Кого почитать')
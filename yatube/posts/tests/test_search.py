@@ -0,0 +1,121 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from .. import search
+from ..models import Post, User
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=text)
+            for text in (
+                'Путешествие на Байкал зимой',
+                'Рецепт пирога с <b>вишней</b>',
+                'Байкал, Байкал и снова Байкал',
+            )
+        ]
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_ranked_prefix_search(self):
+        """Поиск по префиксу находит посты и ранжирует их."""
+        page = search.search('байк', per_page=10)
+        self.assertEqual(
+            [post.pk for post in page],
+            [SearchTests.posts[2].pk, SearchTests.posts[0].pk]
+        )
+        self.assertIn('<mark>Байкал</mark>', page[0].snippet)
+
+    def test_snippet_is_escaped(self):
+        """Текст поста в подсветке экранируется."""
+        page = search.search('пирог', per_page=10)
+        self.assertIn('&lt;b&gt;', page[0].snippet)
+
+    def test_index_follows_updates(self):
+        """Правка и удаление поста сразу видны в индексе."""
+        post = SearchTests.posts[1]
+        post.text = 'Рецепт блинов'
+        post.save()
+        self.assertEqual(len(search.search('пирог', per_page=10)), 0)
+        self.assertEqual(
+            [found.pk for found in search.search('блин', per_page=10)],
+            [post.pk],
+        )
+        post.delete()
+        self.assertEqual(len(search.search('блин', per_page=10)), 0)
+
+    def test_cursor_pagination(self):
+        """Результаты листаются курсором без повторов."""
+        first = search.search('байкал', per_page=1)
+        second = search.search('байкал', per_page=1, after=first.next_cursor)
+        self.assertTrue(first.has_next())
+        self.assertFalse(second.has_next())
+        self.assertNotEqual(first[0].pk, second[0].pk)
+
+    def test_search_page(self):
+        """Страница /search/ показывает найденные посты."""
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'Байкал'}
+        )
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertContains(response, '<mark>')
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через полнотекстовый индекс."""
+        request = RequestFactory().get('/admin/posts/post/')
+        queryset, _ = site._registry[Post].get_search_results(
+            request, Post.objects.all(), 'рецепт'
+        )
+        self.assertEqual(list(queryset), [SearchTests.posts[1]])
+
+    def test_admin_search_is_not_truncated(self):
+        """Админка находит все подходящие посты, а не первую тысячу."""
+        Post.objects.bulk_create(
+            Post(author=SearchTests.user, text=f'Рецепт {i}')
+            for i in range(1000)
+        )
+        request = RequestFactory().get('/admin/posts/post/')
+        queryset, _ = site._registry[Post].get_search_results(
+            request, Post.objects.all(), 'рецепт'
+        )
+        self.assertEqual(queryset.count(), 1001)
+
+    def test_search_without_index(self):
+        """Без FTS5 поиск идёт подстрокой, а не возвращает пустоту."""
+        with mock.patch.object(search, 'is_available', return_value=False):
+            first = search.search('Байкал', per_page=1)
+            second = search.search(
+                'Байкал', per_page=1, after=first.next_cursor
+            )
+            queryset = search.filter_posts(Post.objects.all(), 'зимой')
+        self.assertEqual(
+            [post.pk for post in list(first) + list(second)],
+            [SearchTests.posts[2].pk, SearchTests.posts[0].pk],
+        )
+        self.assertFalse(second.has_next())
+        self.assertIn('<mark>Байкал</mark>', first[0].snippet)
+        self.assertEqual(
+            [post.pk for post in queryset], [SearchTests.posts[0].pk]
+        )
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO posts_post_fts(posts_post_fts) "
+                "VALUES ('delete-all')"
+            )
+        self.assertEqual(len(search.search('байкал', per_page=10)), 0)
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(search.search('байкал', per_page=10)), 2)
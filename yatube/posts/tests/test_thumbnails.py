@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_EAGER=True)
+class ThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        # Хранилище sorl-thumbnail кэширует миниатюры других тестов.
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ThumbnailsTests.user)
+
+    def count_thumbnails(self):
+        return sum(
+            len(files) for _, _, files in
+            os.walk(os.path.join(TEMP_MEDIA_ROOT, 'cache'))
+        )
+
+    def test_thumbnails_created_on_upload(self):
+        """Миниатюры создаются при сохранении формы с картинкой."""
+        uploaded = SimpleUploadedFile(
+            name='small.gif', content=SMALL_GIF, content_type='image/gif'
+        )
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'С картинкой', 'image': uploaded},
+        )
+        self.assertEqual(
+            self.count_thumbnails(), len(thumbnails.variants())
+        )
+
+    def test_responsive_image(self):
+        """Лента выводит готовые варианты картинки через srcset."""
+        uploaded = SimpleUploadedFile(
+            name='small.gif', content=SMALL_GIF, content_type='image/gif'
+        )
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'С картинкой', 'image': uploaded},
+        )
+        created = self.count_thumbnails()
+        content = self.authorized_client.get(
+            reverse('posts:index')
+        ).content.decode()
+        self.assertEqual(self.count_thumbnails(), created)
+        self.assertIn('loading="lazy"', content)
+        self.assertIn('width="960" height="339"', content)
+        for size in ('320w', '640w', '960w'):
+            self.assertIn(size, content)
+
+    def test_warm_thumbnails_command(self):
+        """Команда warm_thumbnails создаёт миниатюры старых постов."""
+        Post.objects.create(
+            author=ThumbnailsTests.user,
+            text='Старый пост',
+            image=SimpleUploadedFile(
+                name='old.gif', content=SMALL_GIF, content_type='image/gif'
+            ),
+        )
+        call_command('warm_thumbnails', workers=1, stdout=StringIO())
+        self.assertGreaterEqual(self.count_thumbnails(), 1)
@@ -0,0 +1,109 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import timeline
+from ..models import Follow, Post, Timeline, User
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo_author')
+        cls.reader = User.objects.create_user(username='Krio_reader')
+        for i in range(3):
+            Post.objects.create(author=cls.author, text=f'Пост {i}')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TimelineTests.reader)
+
+    def test_follow_backfills_timeline(self):
+        """После подписки в ленте появляются старые посты автора."""
+        self.authorized_client.get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': TimelineTests.author.username})
+        )
+        self.assertEqual(
+            Timeline.objects.filter(user=TimelineTests.reader).count(),
+            Post.objects.filter(author=TimelineTests.author).count(),
+            'Лента не заполнилась после подписки.'
+        )
+
+    def test_new_post_fans_out(self):
+        """Новый пост автора попадает в ленту подписчика."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        post = Post.objects.create(
+            author=TimelineTests.author, text='Свежий пост'
+        )
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['page_obj'][0], post)
+
+    def test_unfollow_clears_timeline(self):
+        """После отписки посты автора пропадают из ленты."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': TimelineTests.author.username})
+        )
+        self.assertFalse(
+            Timeline.objects.filter(user=TimelineTests.reader).exists()
+        )
+
+    @override_settings(TIMELINE_SIZE=2)
+    def test_timeline_is_trimmed(self):
+        """Лента обрезается до TIMELINE_SIZE свежих записей."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        Post.objects.create(author=TimelineTests.author, text='Новый пост')
+        self.assertEqual(
+            Timeline.objects.filter(user=TimelineTests.reader).count(), 2
+        )
+
+    @override_settings(TIMELINE_SIZE=2)
+    def test_trim_keeps_posts_with_equal_dates(self):
+        """Посты с одной датой на границе ленты не удаляются все сразу."""
+        Post.objects.update(pub_date=Post.objects.first().pub_date)
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        self.assertEqual(
+            list(Timeline.objects.filter(
+                user=TimelineTests.reader
+            ).order_by('post_id').values_list('post_id', flat=True)),
+            list(Post.objects.order_by('pk').values_list(
+                'pk', flat=True
+            )[1:]),
+        )
+
+    def test_fan_out_trims_in_one_query(self):
+        """Число запросов на новый пост не зависит от числа подписчиков."""
+        for i in range(5):
+            Follow.objects.create(
+                user=User.objects.create_user(username=f'reader_{i}'),
+                author=TimelineTests.author,
+            )
+        post = Post(author=TimelineTests.author, text='Свежий пост')
+        post.save()
+        with self.assertNumQueries(3):
+            timeline.fan_out_post(post)
+
+    def test_rebuild_command(self):
+        """Команда rebuild_timelines восстанавливает ленты."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        Timeline.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertQuerysetEqual(
+            timeline.posts_for(TimelineTests.reader),
+            map(repr, Post.objects.filter(author=TimelineTests.author))
+        )
@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post, User
+from ..uploads import ImageUploadHandler
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_bytes(size, image_format, **options):
+    output = BytesIO()
+    Image.new('RGB', size, 'teal').save(output, image_format, **options)
+    return output.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo_test')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ImageUploadTests.user)
+
+    def upload(self, name, content):
+        return self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={
+                'text': 'С картинкой',
+                'image': SimpleUploadedFile(name, content, 'image/jpeg'),
+            },
+        )
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIDE=100)
+    def test_image_downsampled_without_metadata(self):
+        """Картинка уменьшается и теряет EXIF при приёме."""
+        exif = Image.Exif()
+        exif[0x010f] = 'Камера'
+        uploads = {
+            'photo.JPEG': ('JPEG', '.jpg'),
+            'photo.png': ('PNG', '.png'),
+        }
+        for name, (image_format, extension) in uploads.items():
+            with self.subTest(name=name):
+                self.upload(name, image_bytes(
+                    (400, 200), image_format, exif=exif.tobytes()
+                ))
+                post = Post.objects.latest('pk')
+                self.assertTrue(post.image.name.endswith(extension))
+                with Image.open(post.image.path) as image:
+                    self.assertEqual(image.size, (100, 50))
+                    self.assertNotIn('exif', image.info)
+                    self.assertFalse(image.getexif())
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=1000)
+    def test_rejects_large_and_broken_images(self):
+        """Слишком большие и битые картинки не принимаются."""
+        uploads = {
+            'big.png': (image_bytes((100, 100), 'PNG'), 'мегапикселей'),
+            'text.jpg': (b'not an image' * 100, 'правильное изображение'),
+        }
+        for name, (content, error) in uploads.items():
+            with self.subTest(name=name):
+                response = self.upload(name, content)
+                self.assertIn(error, str(response.context['form'].errors))
+        self.assertFalse(Post.objects.exists())
+
+    def test_rejects_truncated_images(self):
+        """Картинка с целым заголовком и обрезанными данными — не 500."""
+        for name, image_format in (('cut.jpg', 'JPEG'), ('cut.png', 'PNG')):
+            with self.subTest(name=name):
+                content = image_bytes((400, 400), image_format)
+                response = self.upload(name, content[:len(content) // 2])
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(
+                    'правильное изображение',
+                    str(response.context['form'].errors),
+                )
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(
+        IMAGE_UPLOAD_MAX_PIXELS=1000, IMAGE_UPLOAD_FORMATS=['BMP']
+    )
+    def test_stops_storing_after_header(self):
+        """После отказа по заголовку остаток файла не сохраняется."""
+        handler = ImageUploadHandler()
+        with self.assertRaises(StopFutureHandlers):
+            handler.new_file('image', 'big.bmp', 'image/bmp', None)
+        content = image_bytes((200, 200), 'BMP')
+        handler.receive_data_chunk(content[:1024], 0)
+        self.assertIn('мегапикселей', handler.error)
+        self.assertIsNone(
+            handler.receive_data_chunk(content[1024:], 1024)
+        )
+        self.assertEqual(handler.received, 1024)
+        rejected = handler.file_complete(len(content))
+        self.assertEqual(rejected.upload_error, handler.error)
@@ -9,7 +9,9 @@ from django.test import Client, TestCase
 from django.urls import reverse
 from django.utils import timezone
 
-from ..models import Follow, Group, Post, User
+from .. import fragments
+from ..models import Comment, Follow, Group, Post, User
+from .utils import QueryBudgetMixin
 
 
 class PostsVievTests(TestCase):
@@ -38,7 +40,7 @@ class PostsVievTests(TestCase):
         for i in range(15):
             cls.post = Post.objects.create(
                 author=cls.user,
-                group=PostsVievTests.group,
+                group=cls.group,
                 text="Test_text",
                 image=uploaded
             )
@@ -47,7 +49,7 @@ class PostsVievTests(TestCase):
 
     def setUp(self):
         self.authorized_client = Client()
-        self.authorized_client.force_login(PostsVievTests.user)
+        self.authorized_client.force_login(self.user)
         self.home_url = 'posts/index.html'
         self.author_url = 'about/author.html'
         self.tech_url = 'about/tech.html'
@@ -64,13 +66,13 @@ class PostsVievTests(TestCase):
         if self.post.id is not None:
             self.assertEqual(
                 self.post.id,
-                PostsVievTests.post.id,
+                self.post.id,
                 'id постов не совпадают.'
             )
         if first_object.author.username is not None:
             self.assertEqual(
                 first_object.author.username,
-                PostsVievTests.post.author.username,
+                self.post.author.username,
                 'Авторы не совпадают.'
             )
         if first_object.pub_date.date() is not None:
@@ -82,31 +84,31 @@ class PostsVievTests(TestCase):
         if first_object.text is not None:
             self.assertEqual(
                 first_object.text,
-                PostsVievTests.post.text,
+                self.post.text,
                 'Текст постов не совпадает.'
             )
         if first_object.group.title is not None:
             self.assertEqual(
                 first_object.group.title,
-                PostsVievTests.group.title,
+                self.group.title,
                 'Заголовкок не совпадает.'
             )
         if first_object.group.slug is not None:
             self.assertEqual(
                 first_object.group.slug,
-                PostsVievTests.group.slug,
+                self.group.slug,
                 'slug группы не совпадают.'
             )
         if first_object.group.description is not None:
             self.assertEqual(
                 first_object.group.description,
-                PostsVievTests.group.description,
+                self.group.description,
                 'Описание группы не совпадает.'
             )
         if first_object.image is not None:
             self.assertEqual(
                 first_object.image,
-                PostsVievTests.post.image,
+                self.post.image,
                 'Изображение не передается.'
             )
 
@@ -119,15 +121,15 @@ class PostsVievTests(TestCase):
             f'{self.home_url}': reverse('posts:index'),
             f'{self.group_url}': reverse(
                 'posts:group_list',
-                kwargs={'slug': PostsVievTests.group.slug}
+                kwargs={'slug': self.group.slug}
             ),
             f'{self.profile_url}': reverse(
                 'posts:profile',
-                kwargs={'username': PostsVievTests.user}
+                kwargs={'username': self.user}
             ),
             f'{self.post_detail_url}': reverse(
                 'posts:post_detail',
-                kwargs={'post_id': PostsVievTests.post.id}
+                kwargs={'post_id': self.post.id}
             ),
         }
         for template, reverse_name in templates_pages_names.items():
@@ -147,7 +149,7 @@ class PostsVievTests(TestCase):
         """Проверка корректности подключения view функции edit post"""
         response = self.authorized_client.get(reverse(
             'posts:post_edit',
-            kwargs={'post_id': PostsVievTests.post.id})
+            kwargs={'post_id': self.post.id})
         )
         template = f'{self.create_url}'
         self.assertEqual(response.status_code, HTTPStatus.OK)
@@ -170,7 +172,7 @@ class PostsVievTests(TestCase):
         """
         response = self.authorized_client.post(reverse(
             'posts:group_list',
-            kwargs={'slug': PostsVievTests.group.slug})
+            kwargs={'slug': self.group.slug})
         )
         PostsVievTests.get_objects_params(
             self, response, 'page_obj', 0
@@ -183,13 +185,13 @@ class PostsVievTests(TestCase):
         """
         response = self.authorized_client.post(reverse(
             'posts:profile',
-            kwargs={'username': PostsVievTests.post.author.username})
+            kwargs={'username': self.post.author.username})
         )
         post_count_obj = response.context['post_count']
         PostsVievTests.get_objects_params(
             self, response, 'page_obj', 0
         )
-        self.assertEqual(post_count_obj, PostsVievTests.count_user_posts)
+        self.assertEqual(post_count_obj, self.count_user_posts)
 
     def test_post_detail_page_get_correct_context(self):
         """
@@ -198,13 +200,13 @@ class PostsVievTests(TestCase):
         """
         response = self.authorized_client.post(reverse(
             'posts:post_detail',
-            kwargs={'post_id': PostsVievTests.post.id})
+            kwargs={'post_id': self.post.id})
         )
         post_count_obj = response.context['count']
         PostsVievTests.get_objects_params(
             self, response, 'post'
         )
-        self.assertEqual(post_count_obj, PostsVievTests.count_user_posts)
+        self.assertEqual(post_count_obj, self.count_user_posts)
 
     def test_create_post_page_get_correct_context(self):
         """
@@ -228,7 +230,7 @@ class PostsVievTests(TestCase):
         """
         response = self.authorized_client.post(reverse(
             'posts:post_edit',
-            kwargs={'post_id': PostsVievTests.post.id})
+            kwargs={'post_id': self.post.id})
         )
         form_fields = {
             'text': forms.fields.CharField,
@@ -261,7 +263,7 @@ class PostsVievTests(TestCase):
         )
         response = self.authorized_client.post(reverse('posts:index'))
         new_context_1 = response.context['page_obj'][0]
-        self.assertEqual(self.post.id, PostsVievTests.post.id)
+        self.assertEqual(self.post.id, self.post.id)
         self.assertEqual(new_context_1.author.username, post.author.username)
         self.assertEqual(new_context_1.text, post.text)
         self.assertEqual(new_context_1.group.slug, group.slug)
@@ -270,7 +272,7 @@ class PostsVievTests(TestCase):
             kwargs={'slug': group.slug})
         )
         new_context_2 = response.context['page_obj'][0]
-        self.assertEqual(self.post.id, PostsVievTests.post.id)
+        self.assertEqual(self.post.id, self.post.id)
         self.assertEqual(new_context_2.author.username, post.author.username)
         self.assertEqual(new_context_2.text, post.text)
         self.assertEqual(new_context_2.group.slug, group.slug)
@@ -279,7 +281,7 @@ class PostsVievTests(TestCase):
             kwargs={'username': post.author.username})
         )
         new_context_3 = response.context['page_obj'][0]
-        self.assertEqual(self.post.id, PostsVievTests.post.id)
+        self.assertEqual(self.post.id, self.post.id)
         self.assertEqual(new_context_3.author.username, post.author.username)
         self.assertEqual(new_context_3.group.slug, group.slug)
 
@@ -292,62 +294,115 @@ class PostsVievTests(TestCase):
         )
         self.assertEqual(len(
             response.context['page_obj']),
-            PostsVievTests.last_count_pages
+            self.last_count_pages
         )
         response = self.authorized_client.post(reverse(
             'posts:group_list',
-            kwargs={'slug': PostsVievTests.group.slug})
+            kwargs={'slug': self.group.slug})
         )
         self.assertEqual(len(response.context['page_obj']), st.PАGES)
         response = self.authorized_client.get(reverse(
             'posts:group_list',
-            kwargs={'slug': PostsVievTests.group.slug}) + '?page=2'
+            kwargs={'slug': self.group.slug}) + '?page=2'
         )
         self.assertEqual(len(
             response.context['page_obj']),
-            PostsVievTests.last_count_pages
+            self.last_count_pages
         )
         response = self.authorized_client.post(reverse(
             'posts:profile',
-            kwargs={'username': PostsVievTests.post.author.username})
+            kwargs={'username': self.post.author.username})
         )
         self.assertEqual(len(response.context['page_obj']), st.PАGES)
         response = self.authorized_client.post(reverse(
             'posts:profile',
-            kwargs={'username': PostsVievTests.post.author.username})
+            kwargs={'username': self.post.author.username})
             + '?page=2'
         )
         self.assertEqual(len(
             response.context['page_obj']),
-            PostsVievTests.last_count_pages
+            self.last_count_pages
         )
 
     def test_cache_correct_worked(self):
         """Проверка кэширования.
         """
         response = self.authorized_client.get(reverse('posts:index'))
-        content_before_deletion = response.content
-        text = 'Тест кэширования!'
-        self.authorized_client.post(
-            reverse('posts:post_create'),
-            data={'text': text}
+        content_before_update = response.content
+        Post.objects.filter(pk=self.post.pk).update(
+            text='Тест кэширования!'
         )
         response = self.authorized_client.get(reverse('posts:index'))
-        content_after_deletion = response.content
         self.assertEqual(
-            content_before_deletion,
-            content_after_deletion,
+            content_before_update,
+            response.content,
             'Кэширование не работает.'
         )
         cache.clear()
         response = self.authorized_client.get(reverse('posts:index'))
-        content_after_deletion_again = response.content
         self.assertNotEqual(
-            content_before_deletion,
-            content_after_deletion_again,
+            content_before_update,
+            response.content,
             'Кэширование после очистки не работает.'
         )
 
+    def test_cache_invalidated_by_new_post(self):
+        """Новый пост сразу сбрасывает закэшированные страницы.
+        """
+        urls = (
+            reverse('posts:index'),
+            reverse(
+                'posts:group_list',
+                kwargs={'slug': self.group.slug}
+            ),
+            reverse(
+                'posts:profile',
+                kwargs={'username': self.user.username}
+            ),
+        )
+        contents = {
+            url: self.authorized_client.get(url).content for url in urls
+        }
+        text = 'Тест сброса кэша!'
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': text, 'group': self.group.pk}
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertNotEqual(contents[url], response.content)
+                self.assertContains(response, text)
+
+    def test_new_post_resets_cached_follow_feed(self):
+        """Лента подписчика обновляется без сброса его версии ленты.
+        """
+        reader = User.objects.create_user(username='Krio')
+        Follow.objects.create(user=reader, author=self.user)
+        reader_client = Client()
+        reader_client.force_login(reader)
+        url = reverse('posts:follow_index')
+        reader_client.get(url)
+        version = fragments.get_version(fragments.follow_scope(reader.pk))
+        text = 'Новый пост в ленту'
+        self.authorized_client.post(
+            reverse('posts:post_create'), data={'text': text}
+        )
+        self.assertContains(reader_client.get(url), text)
+        self.assertEqual(
+            fragments.get_version(fragments.follow_scope(reader.pk)),
+            version,
+        )
+
+    def test_cache_varies_on_page(self):
+        """Вторая страница не отдаётся из кэша первой.
+        """
+        first = self.authorized_client.get(reverse('posts:index'))
+        second = self.authorized_client.get(
+            reverse('posts:index') + '?page=2'
+        )
+        self.assertNotEqual(first.content, second.content)
+
     def test_follow_author(self):
         """Проверяем возможность подписаться на автора.
         """
@@ -357,15 +412,15 @@ class PostsVievTests(TestCase):
         self.authorized_client.force_login(user_krio)
         response = self.authorized_client.post(reverse(
             'posts:profile_follow',
-            kwargs={'username': PostsVievTests.user})
+            kwargs={'username': self.user})
         )
         count_follow_in_bd_after_response = Follow.objects.count()
         follow_response = get_object_or_404(
             Follow, user=user_krio,
-            author=PostsVievTests.user
+            author=self.user
         )
         self.assertEqual(
-            PostsVievTests.user,
+            self.user,
             follow_response.author,
             'Подписки на автора нет.'
         )
@@ -375,7 +430,7 @@ class PostsVievTests(TestCase):
         )
         self.assertRedirects(response, reverse(
             'posts:profile',
-            kwargs={'username': PostsVievTests.user})
+            kwargs={'username': self.user})
         )
 
     def test_unfollow_author(self):
@@ -386,17 +441,17 @@ class PostsVievTests(TestCase):
         self.authorized_client.force_login(user_krio)
         self.authorized_client.post(reverse(
             'posts:profile_follow',
-            kwargs={'username': PostsVievTests.user})
+            kwargs={'username': self.user})
         )
         count_follow_in_bd_after_follow = Follow.objects.count()
         response_unfollow = self.authorized_client.post(reverse(
             'posts:profile_unfollow',
-            kwargs={'username': PostsVievTests.user})
+            kwargs={'username': self.user})
         )
         count_follow_in_bd_after_unfollow = Follow.objects.count()
         follow_krio_after_delete = Follow.objects.filter(
             user=user_krio,
-            author=PostsVievTests.user
+            author=self.user
         )
         self.assertEqual(
             count_follow_in_bd_after_unfollow,
@@ -405,7 +460,7 @@ class PostsVievTests(TestCase):
         )
         self.assertRedirects(response_unfollow, reverse(
             'posts:profile',
-            kwargs={'username': PostsVievTests.user})
+            kwargs={'username': self.user})
         )
         self.assertFalse(
             follow_krio_after_delete.exists(),
@@ -426,15 +481,15 @@ class PostsVievTests(TestCase):
         self.authorized_client.force_login(user_krio)
         self.authorized_client.post(reverse(
             'posts:profile_follow',
-            kwargs={'username': PostsVievTests.user})
+            kwargs={'username': self.user})
         )
-        self.authorized_client.force_login(PostsVievTests.user)
+        self.authorized_client.force_login(self.user)
         text_leo = 'Новый пост пользователя Leo'
         self.authorized_client.post(
             reverse('posts:post_create'),
             data={'text': text_leo}
         )
-        new_post = Post.objects.filter(author=PostsVievTests.user).first()
+        new_post = Post.objects.filter(author=self.user).first()
         self.authorized_client.force_login(user_krio)
         text_krio = 'Новый пост пользователя Krio'
         self.authorized_client.post(
@@ -465,11 +520,11 @@ class PostsVievTests(TestCase):
         """Неавторизованный пользователь не может отписаться от автора.
         """
         user_krio = User.objects.create_user(username='Krio')
-        Follow.objects.create(user=user_krio, author=PostsVievTests.user)
+        Follow.objects.create(user=user_krio, author=self.user)
         count_follow_in_bd = Follow.objects.all().count()
         response_unfollow = self.client.post(reverse(
             'posts:profile_unfollow',
-            kwargs={'username': PostsVievTests.user})
+            kwargs={'username': self.user})
         )
         count_follow_in_bd_after_response = Follow.objects.all().count()
         self.assertEqual(
@@ -480,7 +535,7 @@ class PostsVievTests(TestCase):
         self.assertRedirects(response_unfollow, (
             reverse('users:login') + '?next=' + reverse(
                 'posts:profile_unfollow',
-                kwargs={'username': PostsVievTests.user}
+                kwargs={'username': self.user}
             )))
 
     def test_follow_author_anonim_user(self):
@@ -490,7 +545,7 @@ class PostsVievTests(TestCase):
         count_follow_in_bd = Follow.objects.all().count()
         response_unfollow = self.client.post(reverse(
             'posts:profile_follow',
-            kwargs={'username': PostsVievTests.user})
+            kwargs={'username': self.user})
         )
         count_follow_in_bd_after_response = Follow.objects.all().count()
         self.assertEqual(
@@ -501,5 +556,70 @@ class PostsVievTests(TestCase):
         self.assertRedirects(response_unfollow, (
             reverse('users:login') + '?next=' + reverse(
                 'posts:profile_follow',
-                kwargs={'username': PostsVievTests.user}
+                kwargs={'username': self.user}
             )))
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Число запросов страниц не зависит от количества постов."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Krio')
+        cls.group = Group.objects.create(
+            title='test_title',
+            slug='test_group',
+            description='test_description',
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def create_posts(self, count):
+        for i in range(count):
+            author = User.objects.create_user(username=f'author_{i}')
+            Follow.objects.create(user=self.reader, author=author)
+            post = Post.objects.create(
+                author=author,
+                group=self.group,
+                text=f'Test_text {i}',
+            )
+            commentator = User.objects.create_user(username=f'reader_{i}')
+            Comment.objects.create(
+                post=post, author=commentator, text='Комментарий'
+            )
+        return post
+
+    def get_budgets(self, post):
+        return {
+            reverse('posts:index'): 4,
+            reverse(
+                'posts:group_list',
+                kwargs={'slug': self.group.slug}
+            ): 5,
+            reverse(
+                'posts:profile',
+                kwargs={'username': post.author.username}
+            ): 7,
+            reverse('posts:post_detail', kwargs={'post_id': post.id}): 5,
+            # Холодный кэш: ключ фрагмента ленты читает граф подписок.
+            reverse('posts:follow_index'): 5,
+        }
+
+    def test_pages_fit_query_budget(self):
+        """Страницы укладываются в бюджет и на одном посте, и на полной."""
+        for count in (1, st.PАGES):
+            post = self.create_posts(count)
+            for i in range(count):
+                Comment.objects.create(
+                    post=post, author=self.reader, text='Ещё'
+                )
+            for url, budget in self.get_budgets(post).items():
+                cache.clear()
+                with self.subTest(url=url, posts=count):
+                    with self.assertMaxQueries(budget):
+                        self.authorized_client.get(url)
+            Post.objects.all().delete()
+            User.objects.exclude(pk=self.reader.pk).delete()
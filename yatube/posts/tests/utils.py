@@ -0,0 +1,21 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """Проверка бюджета SQL-запросов для TestCase."""
+
+    @contextmanager
+    def assertMaxQueries(self, num, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        queries = '\n'.join(
+            query['sql'] for query in context.captured_queries
+        )
+        self.assertLessEqual(
+            executed, num,
+            f'Выполнено {executed} запросов при бюджете {num}:\n{queries}'
+        )
@@ -0,0 +1,85 @@
+"""Варианты картинок постов и их предварительная генерация.
+
+Тег ``{% responsive_image %}`` (``posts.templatetags.post_images``)
+выводит для картинки лестницу ширин ``IMAGE_VARIANT_WIDTHS`` в каждом
+формате из ``FORMATS``, а браузер по ``srcset`` и ``sizes`` выбирает
+самый лёгкий подходящий вариант. Если вариант уже создан, тег только
+читает его адрес из key-value хранилища sorl-thumbnail, поэтому ресайз
+выполняется не в запросе, а фоновой задачей из очереди ``thumbnails``.
+"""
+import logging
+
+from django.conf import settings as st
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.base import EXTENSIONS
+from sorl.thumbnail.images import ImageFile
+
+from tasks.queue import task
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Пропорции картинки в ленте, как у прежней миниатюры 960x339.
+ASPECT_RATIO = 339 / 960
+MIME_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+    'PNG': 'image/png',
+    'JPEG': 'image/jpeg',
+}
+
+
+def _can_encode(image_format):
+    Image.init()
+    return image_format in Image.SAVE and image_format in EXTENSIONS
+
+
+# Форматы, которые умеют записать и Pillow, и sorl-thumbnail. Последний
+# идёт в <img> для браузеров без поддержки остальных.
+FORMATS = tuple(
+    image_format for image_format in st.IMAGE_VARIANT_FORMATS
+    if _can_encode(image_format)
+) or ('JPEG',)
+
+
+def geometry(width):
+    return f'{width}x{round(width * ASPECT_RATIO)}'
+
+
+def variants():
+    """Геометрии и параметры всех вариантов, которые выводят шаблоны."""
+    return [
+        (geometry(width), {'crop': 'center', 'format': image_format})
+        for image_format in FORMATS
+        for width in st.IMAGE_VARIANT_WIDTHS
+    ]
+
+
+def source(name):
+    # Ключ варианта включает хранилище исходника: тот же, что у шаблонов.
+    return ImageFile(name, Post._meta.get_field('image').storage)
+
+
+def generate(name):
+    """Создаёт все варианты для файла ``name`` из хранилища картинок."""
+    image = source(name)
+    try:
+        for size, options in variants():
+            get_thumbnail(image, size, **options)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', name)
+        return False
+    return True
+
+
+@task(queue='thumbnails')
+def generate_task(name):
+    if not generate(name):
+        raise RuntimeError(f'Не удалось создать миниатюры для {name}')
+
+
+def schedule(name):
+    """Ставит генерацию миниатюр в очередь фоновых задач."""
+    generate_task.delay(name)
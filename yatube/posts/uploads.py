@@ -0,0 +1,161 @@
+"""Потоковый приём картинок постов.
+
+``ImageUploadHandler`` стоит первым в ``FILE_UPLOAD_HANDLERS`` и
+забирает себе поля из ``IMAGE_UPLOAD_FIELDS``. Данные пишутся в
+``SpooledTemporaryFile``: до ``FILE_UPLOAD_MAX_MEMORY_SIZE`` в памяти,
+дальше на диск. Как только пришёл заголовок, Pillow читает из него
+формат и размеры без декодирования пикселей, и слишком большая по
+байтам или пикселям картинка отбрасывается, не дожидаясь конца
+загрузки. Принятая картинка один раз уменьшается до
+``IMAGE_UPLOAD_MAX_SIDE`` и пересохраняется без EXIF и прочих
+метаданных. Причину отказа показывает ``PostForm``.
+"""
+import os
+import tempfile
+from io import BytesIO
+
+from django.conf import settings as st
+from django.core.files.uploadedfile import (InMemoryUploadedFile,
+                                            UploadedFile)
+from django.core.files.uploadhandler import (FileUploadHandler,
+                                             StopFutureHandlers)
+from PIL import Image, ImageOps
+
+# Сколько байт ждать заголовка: у JPEG перед размерами бывает EXIF.
+HEADER_LIMIT = 512 * 1024
+IMAGE_UPLOAD_FIELDS = ('image',)
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+INVALID_IMAGE = (
+    'Загрузите правильное изображение. Файл, который вы '
+    'загрузили, поврежден или не является изображением.'
+)
+
+
+class RejectedUpload(UploadedFile):
+    """Пустой файл вместо отброшенной загрузки с текстом ошибки."""
+    def __init__(self, name, error):
+        super().__init__(BytesIO(), name, size=0)
+        self.upload_error = error
+
+
+class ImageUploadHandler(FileUploadHandler):
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        if field_name not in IMAGE_UPLOAD_FIELDS:
+            self.file = None
+            return
+        self.file = tempfile.SpooledTemporaryFile(
+            max_size=st.FILE_UPLOAD_MAX_MEMORY_SIZE,
+            dir=st.FILE_UPLOAD_TEMP_DIR,
+        )
+        self.received = 0
+        self.image_format = None
+        self.error = None
+        if (self.content_length or 0) > st.IMAGE_UPLOAD_MAX_BYTES:
+            self.error = self.too_large()
+        # Остальные обработчики этот файл не получат.
+        raise StopFutureHandlers
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.file is None:
+            return raw_data
+        if self.error:
+            return None
+        self.received += len(raw_data)
+        if self.received > st.IMAGE_UPLOAD_MAX_BYTES:
+            self.error = self.too_large()
+            self.file.close()
+            return None
+        self.file.write(raw_data)
+        if self.image_format is None:
+            self.check_header()
+        return None
+
+    def file_complete(self, file_size):
+        if self.file is None:
+            return None
+        if not self.error and self.image_format is None:
+            self.error = INVALID_IMAGE
+        if self.error:
+            self.file.close()
+            return RejectedUpload(self.file_name, self.error)
+        try:
+            return normalize(self.file, self.field_name, self.file_name)
+        except (OSError, SyntaxError, ValueError,
+                Image.DecompressionBombError):
+            # Заголовок был цел, а сами пиксели обрезаны или испорчены.
+            return RejectedUpload(self.file_name, INVALID_IMAGE)
+        finally:
+            self.file.close()
+
+    def too_large(self):
+        limit = st.IMAGE_UPLOAD_MAX_BYTES // (1024 * 1024)
+        return f'Файл больше {limit} МБ.'
+
+    def check_header(self):
+        """Проверяет формат и размеры, как только их можно прочитать."""
+        self.file.seek(0)
+        try:
+            with Image.open(self.file) as image:
+                image_format = image.format
+                width, height = image.size
+        except Image.DecompressionBombError:
+            image_format, width, height = '', 0, 0
+            self.error = self.too_many_pixels()
+        except (OSError, SyntaxError, ValueError):
+            # Заголовок ещё не пришёл целиком.
+            if self.received >= HEADER_LIMIT:
+                self.error = 'Не удалось прочитать заголовок изображения.'
+            return
+        finally:
+            self.file.seek(0, os.SEEK_END)
+        if self.error:
+            return
+        if image_format not in st.IMAGE_UPLOAD_FORMATS:
+            self.error = 'Поддерживаются форматы {}.'.format(
+                ', '.join(st.IMAGE_UPLOAD_FORMATS)
+            )
+        elif width * height > st.IMAGE_UPLOAD_MAX_PIXELS:
+            self.error = self.too_many_pixels()
+        else:
+            self.image_format = image_format
+
+    def too_many_pixels(self):
+        limit = st.IMAGE_UPLOAD_MAX_PIXELS / 1000000
+        return f'Изображение больше {limit:g} мегапикселей.'
+
+
+def normalize(file, field_name, name):
+    """Картинка не больше ``IMAGE_UPLOAD_MAX_SIDE`` и без метаданных.
+
+    Анимации сохраняются как есть: кадры пришлось бы пересобирать.
+    """
+    file.seek(0)
+    output = BytesIO()
+    with Image.open(file) as image:
+        image_format = image.format
+        if getattr(image, 'is_animated', False):
+            file.seek(0)
+            output.write(file.read())
+        else:
+            max_side = st.IMAGE_UPLOAD_MAX_SIDE
+            # JPEG декодируется сразу в уменьшенном масштабе.
+            image.draft(image.mode, (max_side, max_side))
+            icc_profile = image.info.get('icc_profile')
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_side, max_side))
+            # Без явного exif PNG записывает EXIF из image.info.
+            options = {'optimize': True, 'exif': b''}
+            if icc_profile:
+                options['icc_profile'] = icc_profile
+            if image_format in ('JPEG', 'WEBP'):
+                options['quality'] = st.IMAGE_UPLOAD_QUALITY
+            image.save(output, image_format, **options)
+    base, extension = os.path.splitext(os.path.basename(name))
+    name = base + EXTENSIONS.get(image_format, extension)
+    size = output.tell()
+    output.seek(0)
+    return InMemoryUploadedFile(
+        output, field_name, name, Image.MIME.get(image_format), size, None
+    )
+
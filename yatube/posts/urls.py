@@ -1,16 +1,38 @@
 from django.urls import path
 
-from . import views
+from . import async_views, feeds, views
 
 app_name = 'posts'
 
-urlpatterns = [path('', views.index, name='index'),
-               path('group/<slug:slug>/',
-               views.group_posts, name='group_list'),
-               path('profile/<str:username>/', views.profile, name='profile'),
+# Страницы со списками постов в синхронном или асинхронном варианте
+# выбирает async_views.variant по настройке ASYNC_VIEWS.
+urlpatterns = [path('', async_views.variant(views.index), name='index'),
+               path(
+                   'group/<slug:slug>/',
+                   async_views.variant(views.group_posts),
+                   name='group_list'),
+               path(
+                   'profile/<str:username>/',
+                   async_views.variant(views.profile), name='profile'),
+               path('feeds/rss/', feeds.site_rss, name='site_rss'),
+               path('feeds/atom/', feeds.site_atom, name='site_atom'),
+               path(
+                   'group/<slug:slug>/rss/',
+                   feeds.group_rss, name='group_rss'),
+               path(
+                   'group/<slug:slug>/atom/',
+                   feeds.group_atom, name='group_atom'),
+               path(
+                   'profile/<str:username>/rss/',
+                   feeds.author_rss, name='author_rss'),
+               path(
+                   'profile/<str:username>/atom/',
+                   feeds.author_atom, name='author_atom'),
                path(
                    'posts/<int:post_id>/',
-                   views.post_detail, name='post_detail'),
+                   async_views.variant(views.post_detail),
+                   name='post_detail'),
+               path('search/', views.post_search, name='search'),
                path('create/', views.post_create, name='post_create'),
                path(
                    'posts/<int:post_id>/edit/',
@@ -21,7 +43,10 @@ urlpatterns = [path('', views.index, name='index'),
                path(
                    'posts/<int:post_id>/comment/',
                    views.add_comment, name='add_comment'),
-               path('follow/', views.follow_index, name='follow_index'),
+               path(
+                   'follow/',
+                   async_views.variant(views.follow_index),
+                   name='follow_index'),
                path(
                    'profile/<str:username>/follow/',
                    views.profile_follow,
@@ -1,78 +1,94 @@
 from django.conf import settings as st
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.replicas import pin_to_primary, read_from_replica
+
+from . import counters, fragments, pages, search, timeline
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .paginators import paginate
 
 
+@read_from_replica
 def index(request):
-    post_list = Post.objects.select_related('group').all()
-    paginator = Paginator(post_list, st.PАGES)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    template = 'posts/index.html'
-    context = {
-        'posts': post_list,
-        'page_obj': page_obj,
-    }
-    return render(request, template, context)
+    post_list = pages.with_relations(Post.objects.all())
+    page_obj = paginate(request, post_list)
+    context = pages.index_context(
+        post_list, page_obj, fragments.context(fragments.index_scope())
+    )
+    return render(request, pages.INDEX_TEMPLATE, context)
 
 
+@read_from_replica
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, st.PАGES)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    template = 'posts/group_list.html'
-    context = {
-        'group': group,
-        'page_obj': page_obj,
-    }
-    return render(request, template, context)
+    validators = pages.group_validators(request, group)
+    not_modified = validators.not_modified(request)
+    if not_modified:
+        return not_modified
+    post_list = pages.with_relations(group.posts.all())
+    page_obj = paginate(request, post_list, count=group.posts_count)
+    context = pages.group_context(
+        group, page_obj, fragments.context(fragments.group_scope(group.pk))
+    )
+    return validators.apply(render(request, pages.GROUP_TEMPLATE, context))
 
 
+@read_from_replica
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    user_posts = Post.objects.filter(author=author)
-    count_user_posts = user_posts.count()
-    paginator = Paginator(user_posts, st.PАGES)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user, author=author
-        ).exists()
-    else:
-        following = None
-    template = 'posts/profile.html'
-    context = {
-        'author': author,
-        'post_count': count_user_posts,
-        'page_obj': page_obj,
-        'following': following,
-    }
-    return render(request, template, context)
+    validators = pages.profile_validators(request, author)
+    not_modified = validators.not_modified(request)
+    if not_modified:
+        return not_modified
+    user_posts = pages.with_relations(author.posts.all())
+    author_counters = counters.for_user(author)
+    page_obj = paginate(
+        request, user_posts, count=author_counters.posts_count
+    )
+    context = pages.profile_context(
+        author,
+        author_counters,
+        page_obj,
+        pages.following(request.user, author),
+        pages.profile_recommendations(request.user, author),
+        fragments.context(fragments.profile_scope(author.pk)),
+    )
+    return validators.apply(render(request, pages.PROFILE_TEMPLATE, context))
 
 
+@read_from_replica
 def post_detail(request, post_id):
-    template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, id=post_id)
-    count = Post.objects.filter(author_id=post.author).count()
-    form = CommentForm()
-    comments = post.comments.all()
+    post = pages.get_post(post_id)
+    validators = pages.post_validators(request, post)
+    not_modified = validators.not_modified(request)
+    if not_modified:
+        return not_modified
+    context = pages.post_context(
+        post, counters.for_user(post.author), pages.post_comments(post)
+    )
+    return validators.apply(render(request, pages.POST_TEMPLATE, context))
+
+
+@read_from_replica
+def post_search(request):
+    """Полнотекстовый поиск по постам.
+    """
+    query = request.GET.get('q', '').strip()
+    page_obj = search.search(
+        query, st.PАGES, after=request.GET.get('after')
+    )
+    template = 'posts/search.html'
     context = {
-        'form': form,
-        'post': post,
-        'count': count,
-        'comments': comments,
+        'query': query,
+        'page_obj': page_obj,
     }
     return render(request, template, context)
 
 
 @login_required
+@pin_to_primary
 def post_create(request):
     template = 'posts/create_post.html'
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -85,6 +101,7 @@ def post_create(request):
 
 
 @login_required
+@pin_to_primary
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
     post = get_object_or_404(Post, id=post_id)
@@ -104,6 +121,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@pin_to_primary
 def post_delete(request, post_id):
     template = 'posts/delete_post.html'
     post = get_object_or_404(Post, id=post_id)
@@ -114,6 +132,7 @@ def post_delete(request, post_id):
 
 
 @login_required
+@pin_to_primary
 def add_comment(request, post_id):
     template = 'posts:post_detail'
     post = get_object_or_404(Post, id=post_id)
@@ -127,25 +146,20 @@ def add_comment(request, post_id):
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
     """Посты авторов, на которых подписан текущий пользователь.
     """
-    news = Post.objects.filter(
-        author__following__user=request.user
-    ).order_by('-pub_date')
-    paginator = Paginator(news, st.PАGES)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    title = 'Лента избранного'
-    template = 'posts/follow.html'
-    context = {
-        'page_obj': page_obj,
-        'title': title,
-    }
-    return render(request, template, context)
+    news = timeline.posts_for(request.user)
+    page_obj = paginate(request, news)
+    context = pages.follow_context(
+        page_obj, pages.follow_fragment(request.user)
+    )
+    return render(request, pages.FOLLOW_TEMPLATE, context)
 
 
 @login_required
+@pin_to_primary
 def profile_follow(request, username):
     """ Функция подписки на автора.
     """
@@ -160,6 +174,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@pin_to_primary
 def profile_unfollow(request, username):
     """ Функция отписки от автора.
     """
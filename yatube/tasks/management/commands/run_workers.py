@@ -0,0 +1,111 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.conf import settings as st
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tasks import queue
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи в пуле процессов. Число одновременно '
+        'выполняемых задач каждой очереди ограничено TASK_QUEUES.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queues',
+            help='Очереди через запятую (по умолчанию все из TASK_QUEUES).'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда готовых задач не останется.'
+        )
+        parser.add_argument(
+            '--inline', action='store_true',
+            help='Выполнять задачи в этом же процессе, без пула.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        names = options['queues'].split(',') if options['queues'] else None
+        self.limits = {
+            name: limit for name, limit in st.TASK_QUEUES.items()
+            if names is None or name in names
+        }
+        unknown = set(names or ()) - set(self.limits)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные очереди: {", ".join(sorted(unknown))}'
+            )
+        self.worker = queue.worker_name()
+        self.poll_interval = options['poll_interval']
+        self.burst = options['burst']
+        if options['inline']:
+            done = self.run_inline()
+        else:
+            done = self.run_pool()
+        self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {done}'))
+
+    def claim_all(self, busy):
+        """Забирает задачи всех очередей в пределах их лимитов."""
+        claimed = []
+        for name, limit in self.limits.items():
+            free = limit - max(queue.running(name), busy.get(name, 0))
+            claimed += [
+                (name, task_id)
+                for task_id in queue.claim(name, free, self.worker)
+            ]
+        return claimed
+
+    def run_inline(self):
+        done = 0
+        while True:
+            queue.requeue_stale()
+            claimed = self.claim_all({})
+            if not claimed:
+                if self.burst:
+                    return done
+                time.sleep(self.poll_interval)
+            for _, task_id in claimed:
+                done += queue.execute(task_id)
+
+    def run_pool(self):
+        done = 0
+        running = {}
+        pool = ProcessPoolExecutor(
+            sum(self.limits.values()), initializer=django.setup
+        )
+        try:
+            while True:
+                queue.requeue_stale()
+                busy = {}
+                for name in running.values():
+                    busy[name] = busy.get(name, 0) + 1
+                claimed = self.claim_all(busy)
+                # Дочерние процессы не должны наследовать соединения.
+                connections.close_all()
+                for name, task_id in claimed:
+                    running[pool.submit(queue.execute, task_id)] = name
+                if not running:
+                    if self.burst:
+                        return done
+                    time.sleep(self.poll_interval)
+                    continue
+                finished, _ = wait(
+                    running, timeout=self.poll_interval,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in finished:
+                    running.pop(future)
+                    done += future.result()
+        except KeyboardInterrupt:
+            return done
+        finally:
+            pool.shutdown(wait=True)
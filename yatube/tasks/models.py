@@ -0,0 +1,50 @@
+from django.db import models
+
+
+class Task(models.Model):
+    """Задача в очереди. Выполненные задачи из таблицы удаляются."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    queue = models.CharField(verbose_name='Очередь', max_length=50)
+    name = models.CharField(verbose_name='Функция', max_length=200)
+    args = models.TextField(verbose_name='Аргументы', default='[]')
+    kwargs = models.TextField(
+        verbose_name='Именованные аргументы', default='{}'
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=10, choices=STATUSES, default=QUEUED,
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='Попыток', default=0
+    )
+    max_attempts = models.PositiveIntegerField(
+        verbose_name='Максимум попыток', default=3
+    )
+    run_at = models.DateTimeField(verbose_name='Запустить не раньше')
+    locked_by = models.CharField(
+        verbose_name='Обработчик', max_length=100, blank=True
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Взята в работу', null=True, blank=True
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_at']
+        indexes = [
+            models.Index(
+                fields=['queue', 'status', 'run_at'],
+                name='task_queue_status_run_at'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} [{self.queue}]'
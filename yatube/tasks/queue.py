@@ -0,0 +1,155 @@
+"""Фоновые задачи с очередью в базе данных.
+
+Функция, обёрнутая декоратором ``@task``, ставится в очередь вызовом
+``.delay(*args, **kwargs)``: в таблицу ``tasks_task`` пишется строка
+с путём к функции и аргументами в JSON. Строка появляется в той же
+транзакции, что и данные запроса, поэтому при откате задача
+не выполнится. Задачи выполняет команда ``run_workers``,
+а при ``TASKS_EAGER`` они выполняются сразу при вызове ``.delay``.
+"""
+import json
+import os
+import socket
+import traceback
+
+from django.conf import settings as st
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+
+class BackgroundTask:
+    def __init__(self, func, queue, max_attempts):
+        self.func = func
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.__doc__ = func.__doc__
+
+    def __repr__(self):
+        return f'<BackgroundTask {self.name}>'
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Ставит вызов в очередь; при TASKS_EAGER выполняет его сразу."""
+        if st.TASKS_EAGER:
+            return self.func(*args, **kwargs)
+        return Task.objects.create(
+            queue=self.queue,
+            name=self.name,
+            args=json.dumps(args, cls=DjangoJSONEncoder),
+            kwargs=json.dumps(kwargs, cls=DjangoJSONEncoder),
+            max_attempts=self.max_attempts,
+            run_at=timezone.now(),
+        )
+
+
+def task(func=None, *, queue='default', max_attempts=3):
+    """Делает функцию фоновой задачей: ``@task`` или ``@task(queue=...)``.
+
+    Аргументы задачи должны сериализоваться в JSON.
+    """
+    if queue not in st.TASK_QUEUES:
+        raise ValueError(f'Очередь {queue} не описана в TASK_QUEUES')
+
+    def decorator(func):
+        return BackgroundTask(func, queue, max_attempts)
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def retry_delay(attempts):
+    """Пауза перед повтором: TASK_RETRY_DELAY, 2×, 4× и т.д. секунд."""
+    return timezone.timedelta(
+        seconds=st.TASK_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim(queue, limit, worker):
+    """Забирает до ``limit`` готовых задач очереди; возвращает их id.
+
+    Задачу забирает тот обработчик, чей ``UPDATE ... WHERE status =
+    'queued'`` изменил строку, поэтому блокировки строк не нужны
+    и схема работает и на SQLite.
+    """
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    candidates = list(
+        Task.objects.filter(
+            queue=queue, status=Task.QUEUED, run_at__lte=now
+        ).values_list('pk', flat=True)[:limit]
+    )
+    claimed = []
+    for pk in candidates:
+        updated = Task.objects.filter(pk=pk, status=Task.QUEUED).update(
+            status=Task.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(pk)
+    return claimed
+
+
+def running(queue):
+    return Task.objects.filter(queue=queue, status=Task.RUNNING).count()
+
+
+def execute(task_id):
+    """Выполняет забранную задачу. Вызывается в процессе-обработчике."""
+    task = Task.objects.filter(pk=task_id, status=Task.RUNNING).first()
+    if task is None:
+        return False
+    try:
+        func = import_string(task.name)
+        func(*json.loads(task.args), **json.loads(task.kwargs))
+    except Exception:
+        fail(task, traceback.format_exc())
+        return False
+    task.delete()
+    return True
+
+
+def fail(task, error):
+    if task.attempts >= task.max_attempts:
+        Task.objects.filter(pk=task.pk).update(
+            status=Task.FAILED, last_error=error, locked_by=''
+        )
+        return
+    Task.objects.filter(pk=task.pk).update(
+        status=Task.QUEUED,
+        run_at=timezone.now() + retry_delay(task.attempts),
+        last_error=error,
+        locked_by='',
+    )
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи обработчиков, которые не ответили
+    за TASK_LOCK_TIMEOUT секунд (например, процесс был убит).
+    """
+    stale = Task.objects.filter(
+        status=Task.RUNNING,
+        locked_at__lt=timezone.now() - timezone.timedelta(
+            seconds=st.TASK_LOCK_TIMEOUT
+        ),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, last_error='Превышено время выполнения'
+    )
+    return failed + stale.update(
+        status=Task.QUEUED, run_at=timezone.now(), locked_by=''
+    )
@@ -0,0 +1,105 @@
+from io import StringIO
+
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import User
+
+from .. import queue
+from ..models import Task
+
+calls = []
+
+
+@queue.task
+def remember(value):
+    calls.append(value)
+
+
+@queue.task(max_attempts=2)
+def flaky(value):
+    calls.append(value)
+    if calls.count(value) == 1:
+        raise RuntimeError('Первая попытка')
+
+
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def run_workers(self):
+        call_command('run_workers', burst=True, inline=True, stdout=StringIO())
+
+    def test_delay_enqueues_and_worker_runs(self):
+        """Задача из очереди выполняется и удаляется из таблицы."""
+        remember.delay('тест')
+        self.assertEqual(calls, [])
+        task = Task.objects.get()
+        self.assertEqual(task.name, 'tasks.tests.test_queue.remember')
+        self.run_workers()
+        self.assertEqual(calls, ['тест'])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode(self):
+        """При TASKS_EAGER задача выполняется сразу."""
+        remember.delay(1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_retry_with_backoff(self):
+        """Упавшая задача повторяется после паузы, а затем падает совсем."""
+        flaky.delay('x')
+        self.run_workers()
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.QUEUED)
+        self.assertEqual(task.attempts, 1)
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertIn('Первая попытка', task.last_error)
+        Task.objects.update(run_at=timezone.now())
+        self.run_workers()
+        self.assertEqual(calls, ['x', 'x'])
+        self.assertFalse(Task.objects.exists())
+
+        Task.objects.create(
+            queue='default', name='tasks.tests.test_queue.missing',
+            max_attempts=1, run_at=timezone.now(),
+        )
+        self.run_workers()
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_queue_concurrency_limit(self):
+        """Обработчик не забирает задач больше лимита очереди."""
+        for i in range(5):
+            remember.delay(i)
+        worker = queue.worker_name()
+        self.assertEqual(len(queue.claim('default', 2, worker)), 2)
+        self.assertEqual(queue.running('default'), 2)
+        Task.objects.filter(status=Task.RUNNING).update(
+            locked_at=timezone.now() - timezone.timedelta(days=1)
+        )
+        self.assertEqual(queue.requeue_stale(), 2)
+        self.assertEqual(queue.running('default'), 0)
+
+    def test_password_reset_email_is_queued(self):
+        """Письмо сброса пароля отправляется фоновой задачей."""
+        User.objects.create_user(
+            username='Leo_test', email='leo@test.ru', password='pass'
+        )
+        self.client.post(
+            reverse('users:password_reset'), {'email': 'leo@test.ru'}
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Task.objects.get().queue, 'email')
+        self.run_workers()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['leo@test.ru'])
+
+
+    def test_unknown_queue(self):
+        """Команда отказывается работать с неизвестной очередью."""
+        with self.assertRaises(CommandError):
+            call_command('run_workers', queues='nope', stdout=StringIO())
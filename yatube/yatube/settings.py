@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -39,10 +40,13 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'tasks.apps.TasksConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,16 +76,53 @@ TEMPLATES = [
     },
 ]
 
+TEST_RUNNER = 'core.testing.TestRunner'
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
+ASGI_APPLICATION = 'yatube.asgi.application'
+
+# Асинхронные варианты страниц со списками постов (posts/async_views.py)
+# и размер пула потоков, в котором они выполняют запросы ORM; при 0
+# запросы идут по очереди в потоке запроса.
+ASYNC_VIEWS = False
+ASYNC_QUERY_WORKERS = 16
+# Сколько запросов ASGI-мост обрабатывает одновременно.
+ASGI_THREADS = 32
 
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами, прагмы не повторяются.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Выполняются для каждого нового соединения SQLite (core.db).
+# WAL: читатели не ждут писателя; NORMAL в WAL не теряет целостность,
+# только последние транзакции при отключении питания.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# Реплики только для чтения — псевдонимы из DATABASES. Страницы
+# со списками и страница поста читают из них (core.replicas).
+# Локально реплики можно заменить копиями файла базы, которые
+# обновляет команда sync_replicas.
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+# Сколько секунд после записи клиент читает из default.
+REPLICA_PIN_SECONDS = 5
+# Реплики, отставшие сильнее, пропускаются.
+REPLICA_MAX_LAG = 30
+# Сколько секунд помнить отставание, измеренное командой replica_lag.
+REPLICA_LAG_TIMEOUT = 60
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -123,13 +164,95 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 PАGES = 10
 
+TIMELINE_SIZE = 1000
+
+# Режим пагинации списков постов: "page" (?page=N) или "cursor" (?after=).
+POSTS_PAGINATION = 'page'
+
+# Размер страницы JSON API по умолчанию и предел для ?limit= и ?ids=.
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# Строк за один запрос к базе при выгрузке постов автора.
+EXPORT_CHUNK_SIZE = 2000
+# Число записей в лентах RSS и Atom.
+FEED_SIZE = 20
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
-
-CACHES = {
-    'default': {
+# Сколько секунд файл без ссылок живёт до удаления командой collect_blobs.
+BLOB_GC_GRACE = 60 * 60
+
+# Картинки постов принимаются потоком с проверкой заголовка, остальные
+# файлы — стандартными обработчиками Django.
+FILE_UPLOAD_HANDLERS = [
+    'posts.uploads.ImageUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+IMAGE_UPLOAD_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+IMAGE_UPLOAD_MAX_BYTES = 20 * 1024 * 1024
+IMAGE_UPLOAD_MAX_PIXELS = 40 * 1000 * 1000
+# Длинная сторона оригинала после приёма и качество пересохранения.
+IMAGE_UPLOAD_MAX_SIDE = 1920
+IMAGE_UPLOAD_QUALITY = 85
+# Ширины вариантов картинок постов и форматы в порядке предпочтения;
+# форматы, которые не умеет записать Pillow, пропускаются.
+IMAGE_VARIANT_WIDTHS = (320, 640, 960)
+IMAGE_VARIANT_FORMATS = ('AVIF', 'WEBP', 'JPEG')
+# Ширина картинки на экране для атрибута sizes.
+IMAGE_VARIANT_SIZES = '(min-width: 768px) 75vw, 100vw'
+
+# Фоновые задачи: очередь -> сколько задач из неё выполняется
+# одновременно. Задачи выполняет команда run_workers, а при
+# TASKS_EAGER они выполняются сразу при постановке в очередь.
+TASK_QUEUES = {
+    'default': 2,
+    'thumbnails': 2,
+    'email': 1,
+}
+TASKS_EAGER = False
+# Пауза перед первым повтором упавшей задачи; дальше она удваивается.
+TASK_RETRY_DELAY = 10
+TASK_LOCK_TIMEOUT = 60 * 10
+
+# Кэш общий для всех процессов хоста: файл SQLite в режиме WAL
+# (core.cache.SQLiteCache). 'locmem' — отдельный кэш в памяти
+# каждого процесса, как было раньше.
+# Тесты получают отдельный файл во временном каталоге (core.testing).
+CACHE_BACKEND = 'sqlite'
+CACHE_LOCATION = os.environ.get(
+    'YATUBE_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache.sqlite3')
+)
+
+CACHE_BACKENDS = {
+    'sqlite': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': CACHE_LOCATION,
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+            'ACCESS_RESOLUTION': 1,
+        },
+    },
+    'locmem': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    },
 }
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+
+# Метрики запросов: гистограммы копятся в процессе и периодически
+# сбрасываются в METRICS_DIR, откуда их читает команда dump_metrics.
+METRICS_ENABLED = True
+METRICS_DIR = os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+METRICS_FLUSH_INTERVAL = 60
+
+# Фрагменты со списками постов сбрасываются сигналами, а не по времени.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+# Сколько живут в кэше множества подписок и подписчиков.
+FOLLOW_GRAPH_TIMEOUT = 60 * 60 * 24
+# Сколько авторов хранит compute_recommendations и показывает виджет.
+RECOMMENDATIONS_TOP_K = 20
+RECOMMENDATIONS_WIDGET_SIZE = 5
@@ -18,6 +18,8 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import health, metrics_view
+
 handler404 = "core.views.page_not_found"
 handler500 = 'core.views.server_error'
 handler403 = 'core.views.permission_denied'
@@ -29,6 +31,9 @@ urlpatterns = [path('', include('posts.urls')),
                path('auth/', include('users.urls', namespace='users')),
                path('auth/', include('django.contrib.auth.urls')),
                path('about/', include('about.urls', namespace='about')),
+               path('api/v1/', include('api.urls', namespace='api')),
+               path('metrics/', metrics_view, name='metrics'),
+               path('health/', health, name='health'),
                ]
 
 if settings.DEBUG: